@@ -27,3 +27,17 @@ from .models import DeviceToken
 class DeviceTokenAdmin(admin.ModelAdmin):
     list_display = ("user", "token", "created_at")
     search_fields = ("user__username", "user__email", "token")
+
+from .models import PushOutbox
+
+@admin.register(PushOutbox)
+class PushOutboxAdmin(admin.ModelAdmin):
+    list_display = ("user", "title", "status", "created_at", "sent_at")
+    search_fields = ("user__username", "user__email", "title")
+    list_filter = ("status",)
+
+from .models import ReminderRun
+
+@admin.register(ReminderRun)
+class ReminderRunAdmin(admin.ModelAdmin):
+    list_display = ("started_at", "finished_at", "last_user_id", "pushes_sent", "emails_sent")
@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from django.apps import AppConfig
 
 
@@ -7,21 +9,13 @@ class AccountsConfig(AppConfig):
 
     def ready(self):
         import accounts.signals  # noqa: F401
-        
-        import sys
-        import os
-        
-        # Check if we are running as a server (WSGI) or runserver, 
-        # and not a management command like migrate or createsuperuser
-        is_server = False
-        if 'manage.py' in sys.argv:
-            if 'runserver' in sys.argv:
-                if os.environ.get('RUN_MAIN') == 'true':
-                    is_server = True
-        else:
-            # We are likely running under WSGI/production
-            is_server = True
-            
-        if is_server:
-            from .scheduler import start_auto_reminders
-            start_auto_reminders()
+        from core.scheduler import scheduler
+        from .services import REMINDER_GRACE, REMINDER_SCHEDULE, dispatch_daily_reminders, drain_push_outbox
+
+        # Interrupted runs are resumed by the next scheduled one.
+        scheduler.register(
+            "daily_reminders", REMINDER_SCHEDULE, dispatch_daily_reminders,
+            grace=REMINDER_GRACE, lease=timedelta(hours=1),
+        )
+        # Retries pushes that failed and rows whose drainer died.
+        scheduler.register("drain_push_outbox", "*/5 * * * *", drain_push_outbox, lease=timedelta(minutes=10))
@@ -0,0 +1,26 @@
+"""Deliver queued push notifications outside the web process."""
+import time
+
+from django.core.management.base import BaseCommand
+
+from accounts.services import drain_push_outbox
+
+
+class Command(BaseCommand):
+    help = "Send pending push outbox rows (use when PUSH_OUTBOX_WORKERS = 0)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep polling for new rows instead of exiting when the outbox is empty.",
+        )
+        parser.add_argument("--interval", type=float, default=2.0, help="Polling interval in seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            sent = drain_push_outbox()
+            if sent:
+                self.stdout.write(self.style.SUCCESS(f"Processed {sent} push notification(s)."))
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
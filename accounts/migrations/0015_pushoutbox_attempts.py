@@ -0,0 +1,22 @@
+# Generated by Django 6.1.2 on 2026-10-17 01:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("accounts", "0014_reminderrun"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="pushoutbox",
+            name="attempts",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="pushoutbox",
+            name="claimed_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
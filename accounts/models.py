@@ -152,3 +152,58 @@ class Notification(models.Model):
 
     def __str__(self):
         return f"Notification for {self.user.username}: {self.title}"
+
+
+class PushOutbox(models.Model):
+    """A push notification waiting to be delivered to one user's devices.
+
+    Rows are written inside the transaction that caused them and sent after
+    it commits (``accounts.services.drain_push_outbox``), so request latency
+    never depends on push delivery. A row that could not be delivered goes
+    back to pending until it has used up ``PUSH_MAX_ATTEMPTS``.
+    """
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sending", "Sending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="push_outbox")
+    title = models.CharField(max_length=255)
+    body = models.TextField()
+    data = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    # Set by the drainer that claimed the row, so concurrent drains don't overlap.
+    claim = models.UUIDField(null=True, blank=True, db_index=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"Push to {self.user.username}: {self.title} ({self.status})"
+
+
+class ReminderRun(models.Model):
+    """Progress of one daily reminder dispatch, checkpointed after each chunk of users.
+
+    An interrupted run is resumed from ``last_user_id`` by the next dispatch
+    (``accounts.services.dispatch_daily_reminders``).
+    """
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_user_id = models.PositiveBigIntegerField(default=0)
+    pushes_sent = models.PositiveIntegerField(default=0)
+    emails_sent = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    def __str__(self):
+        state = "finished" if self.finished_at else f"at user {self.last_user_id}"
+        return f"Reminder run {self.started_at:%Y-%m-%d %H:%M} ({state})"
@@ -0,0 +1,302 @@
+"""Accounts services — the push notification outbox and the daily reminder dispatcher."""
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import escape, strip_tags
+
+from config.firebase import PushMessage, SENT, FAILED, send_many
+from core.scheduler import CronSchedule
+from .models import DeviceToken, Notification, PushOutbox, ReminderRun
+
+
+def notify_users(users, title, body, data=None):
+    """Record an in-app notification for each user and queue the matching push.
+
+    Both are bulk-inserted in the caller's transaction; the pushes go out once
+    it commits, so nothing here waits on the network.
+    """
+    data = data or {}
+    users = list(users)
+    if not users:
+        return
+    Notification.objects.bulk_create(
+        [Notification(user=user, title=title, message=body, data=data) for user in users]
+    )
+    queue_push(users, title, body, data)
+
+
+def queue_push(users, title, body, data=None):
+    """Write one outbox row per user and drain them after commit."""
+    rows = PushOutbox.objects.bulk_create(
+        [PushOutbox(user=user, title=title, body=body, data=data or {}) for user in users]
+    )
+    enqueue_push_outbox([row.pk for row in rows])
+
+
+# ---------------------------------------------------------------------------
+# Delivery
+# ---------------------------------------------------------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Process-wide worker pool, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PUSH_OUTBOX_WORKERS,
+                thread_name_prefix="push-outbox",
+            )
+        return _executor
+
+
+def enqueue_push_outbox(ids):
+    """Hand the rows to the in-process pool once they are committed.
+
+    With ``PUSH_OUTBOX_WORKERS = 0`` rows stay pending until the
+    ``process_push_outbox`` command picks them up.
+    """
+    if ids and settings.PUSH_OUTBOX_WORKERS > 0:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, ids))
+
+
+def _run_in_thread(ids):
+    close_old_connections()
+    try:
+        drain_push_outbox(ids)
+    finally:
+        close_old_connections()
+
+
+def drain_push_outbox(ids=None):
+    """Send pending outbox rows (all of them, or just ``ids``). Returns how many were claimed.
+
+    Rows are claimed with a conditional UPDATE stamping a fresh claim id, so
+    concurrent drainers never send the same row twice; a claim older than
+    ``PUSH_CLAIM_TIMEOUT`` (its drainer died) can be taken over. Each row is
+    settled from its devices' outcomes: sent if any device got it, failed if
+    the user has no registered device left, otherwise back to pending for a
+    retry until ``PUSH_MAX_ATTEMPTS`` is reached.
+    """
+    now = timezone.now()
+    claimable = PushOutbox.objects.filter(
+        Q(status="pending")
+        | Q(status="sending", claimed_at__lt=now - timedelta(seconds=settings.PUSH_CLAIM_TIMEOUT))
+    )
+    if ids is not None:
+        claimable = claimable.filter(pk__in=ids)
+    claim = uuid.uuid4()
+    if not claimable.update(status="sending", claim=claim, claimed_at=now, attempts=F("attempts") + 1):
+        return 0
+
+    rows = list(PushOutbox.objects.filter(claim=claim))
+    tokens = {}
+    for user_id, token in DeviceToken.objects.filter(
+        user_id__in={row.user_id for row in rows}
+    ).values_list("user_id", "token"):
+        tokens.setdefault(user_id, []).append(token)
+
+    targets = [(row, token) for row in rows for token in tokens.get(row.user_id, [])]
+    results = send_many(PushMessage(token, row.title, row.body, row.data) for row, token in targets)
+    outcomes = {}
+    for (row, _), result in zip(targets, results):
+        outcomes.setdefault(row.pk, set()).add(result)
+
+    settled = {"sent": [], "failed": [], "retry": [], "given_up": []}
+    for row in rows:
+        row_outcomes = outcomes.get(row.pk, set())
+        if SENT in row_outcomes:
+            settled["sent"].append(row.pk)
+        elif FAILED not in row_outcomes:  # no devices, or all of them unregistered
+            settled["failed"].append(row.pk)
+        elif row.attempts < settings.PUSH_MAX_ATTEMPTS:
+            settled["retry"].append(row.pk)
+        else:
+            settled["given_up"].append(row.pk)
+
+    finished = timezone.now()
+    updates = {
+        "sent": dict(status="sent", error="", sent_at=finished),
+        "failed": dict(status="failed", error="No registered devices."),
+        "retry": dict(status="pending", error="Delivery failed; will retry."),
+        "given_up": dict(status="failed", error="Delivery failed; out of attempts."),
+    }
+    for outcome, pks in settled.items():
+        if pks:
+            PushOutbox.objects.filter(pk__in=pks, claim=claim).update(claim=None, **updates[outcome])
+    return len(rows)
+
+
+# ---------------------------------------------------------------------------
+# Daily reminders
+# ---------------------------------------------------------------------------
+REMINDER_SUBJECT = "Time to update your Espere expenses!"
+REMINDER_PUSH_BODY = "Don't forget to log your expenses for today to keep your budget on track!"
+# Stand-in rendered into the email once and swapped for each recipient's name.
+_USERNAME_PLACEHOLDER = "@@USERNAME@@"
+
+# 10 AM and 10 PM; a run missed by more than REMINDER_GRACE is dropped
+# rather than sent at an odd time.
+REMINDER_SCHEDULE = "0 10,22 * * *"
+REMINDER_GRACE = timedelta(hours=2)
+
+
+def reminder_resume_window():
+    """How old an unfinished run may be and still be resumed.
+
+    The longest gap between two scheduled runs plus the grace, so the next
+    scheduled dispatch (even a late one) picks up an interrupted run; older
+    runs are abandoned.
+    """
+    schedule = CronSchedule(REMINDER_SCHEDULE)
+    first = at = schedule.next_after(timezone.now())
+    gap = timedelta(0)
+    while at - first < timedelta(days=8):
+        following = schedule.next_after(at)
+        gap = max(gap, following - at)
+        at = following
+    return gap + REMINDER_GRACE
+
+
+def reminder_recipients():
+    return User.objects.filter(is_active=True, userprofile__email_reminders=True)
+
+
+def _id_chunks(qs, after, size):
+    """Yield id lists of ``qs`` in ascending order, starting after ``after``."""
+    while True:
+        ids = list(qs.filter(id__gt=after).order_by("id").values_list("id", flat=True)[:size])
+        if not ids:
+            return
+        yield ids
+        after = ids[-1]
+
+
+class _ReminderSender:
+    """Sends one chunk of reminders: batched pushes, then email for users not reached.
+
+    The email is rendered once; each worker thread keeps one mail connection
+    open for the whole run.
+    """
+
+    def __init__(self):
+        html = render_to_string(
+            "accounts/email/daily_reminder.html", {"user": {"username": _USERNAME_PLACEHOLDER}}
+        )
+        self.html, self.text = html, strip_tags(html)
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = get_connection(fail_silently=True)
+            connection.open()
+            self._local.connection = connection
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+
+    def send(self, ids):
+        """Returns ``(pushes_sent, emails_sent)`` for the users in ``ids``."""
+        users = list(
+            User.objects.filter(id__in=ids).order_by("id")
+            .only("id", "username", "email").prefetch_related("device_tokens")
+        )
+        targets = [(user.id, dt.token) for user in users for dt in user.device_tokens.all()]
+        results = send_many(
+            PushMessage(token, REMINDER_SUBJECT, REMINDER_PUSH_BODY, {"action": "open_dashboard"})
+            for _, token in targets
+        )
+        pushed = {user_id for (user_id, _), result in zip(targets, results) if result == SENT}
+
+        emails = []
+        for user in users:
+            if user.id in pushed or not user.email:
+                continue
+            email = EmailMultiAlternatives(
+                REMINDER_SUBJECT,
+                self.text.replace(_USERNAME_PLACEHOLDER, user.username),
+                settings.DEFAULT_FROM_EMAIL,
+                [user.email],
+                connection=self._connection(),
+            )
+            email.attach_alternative(self.html.replace(_USERNAME_PLACEHOLDER, escape(user.username)), "text/html")
+            emails.append(email)
+        sent = self._connection().send_messages(emails) if emails else 0
+        return len(pushed), sent or 0
+
+    def send_in_thread(self, ids):
+        close_old_connections()
+        try:
+            return self.send(ids)
+        finally:
+            close_old_connections()
+
+
+def dispatch_daily_reminders(chunk_size=None, workers=None, fresh=False):
+    """Send the daily reminder to every opted-in user; returns the ReminderRun,
+    with ``resumed_after`` set to the user id it resumed from, if any.
+
+    Users are streamed in id order, ``chunk_size`` at a time, and up to
+    ``workers`` chunks are sent concurrently. The run is checkpointed after
+    each chunk (in id order), so a dispatch that dies part way is picked up
+    by the next one unless ``fresh`` is set or the run is too old.
+    """
+    chunk_size = chunk_size or settings.REMINDER_CHUNK_SIZE
+    workers = workers or settings.REMINDER_WORKERS
+
+    run = ReminderRun.objects.filter(
+        finished_at__isnull=True, started_at__gte=timezone.now() - reminder_resume_window()
+    ).first()
+    if run is None or fresh:
+        run = ReminderRun.objects.create()
+    # Where this dispatch picked up an interrupted run (None for a new run).
+    run.resumed_after = run.last_user_id or None
+
+    def checkpoint(last_id, result):
+        run.last_user_id = last_id
+        run.pushes_sent += result[0]
+        run.emails_sent += result[1]
+        run.save(update_fields=["last_user_id", "pushes_sent", "emails_sent"])
+
+    sender = _ReminderSender()
+    chunks = _id_chunks(reminder_recipients(), run.last_user_id, chunk_size)
+    try:
+        if workers <= 1:
+            for ids in chunks:
+                checkpoint(ids[-1], sender.send(ids))
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="reminders") as pool:
+                in_flight = deque()
+                for ids in chunks:
+                    in_flight.append((ids[-1], pool.submit(sender.send_in_thread, ids)))
+                    if len(in_flight) >= workers * 2:
+                        last_id, future = in_flight.popleft()
+                        checkpoint(last_id, future.result())
+                while in_flight:
+                    last_id, future = in_flight.popleft()
+                    checkpoint(last_id, future.result())
+    finally:
+        sender.close()
+
+    run.finished_at = timezone.now()
+    run.save(update_fields=["finished_at"])
+    return run
@@ -3,13 +3,16 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.contrib.auth.models import User
 from .models import UserProfile
-from core.utils.cache import invalidate_user_cache
+from core.utils.cache import invalidate_user_cache, bump_group_versions
 
 
 @receiver(post_save, sender=User)
-def create_user_profile(sender, instance, created, **kwargs):
+def create_user_profile(sender, instance, created, update_fields=None, **kwargs):
     if created:
         UserProfile.objects.get_or_create(user=instance)
+    elif update_fields is None or set(update_fields) - {"last_login"}:
+        invalidate_user_cache(instance.id)
+        bump_group_versions(groupmember__user=instance)
 
 
 @receiver(post_save, sender=UserProfile)
@@ -17,3 +20,5 @@ def invalidate_cache_on_profile_change(sender, instance, **kwargs):
     """Invalidate the user's cache whenever their profile changes."""
     if hasattr(instance, 'user') and instance.user:
         invalidate_user_cache(instance.user.id)
+        # Names and avatars show up in every group the user belongs to.
+        bump_group_versions(groupmember__user_id=instance.user_id)
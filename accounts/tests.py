@@ -1,3 +1,56 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from config.firebase import LocMemBackend, PushMessage, SENT, INVALID, send_many
+from .models import DeviceToken, ReminderRun
+from .services import dispatch_daily_reminders
+
+
+@override_settings(PUSH_BACKEND="config.firebase.LocMemBackend", PUSH_BATCH_SIZE=2, REMINDER_WORKERS=1)
+class PushDeliveryTest(TestCase):
+    def setUp(self):
+        LocMemBackend.outbox = []
+        LocMemBackend.invalid_tokens = {"stale"}
+        self.user = User.objects.create_user(username="alice", email="alice@example.com", password="pw")
+
+    def test_send_many_batches_and_prunes_unregistered_tokens(self):
+        DeviceToken.objects.create(user=self.user, token="stale")
+        DeviceToken.objects.create(user=self.user, token="fresh")
+        messages = [PushMessage(t, "Hi", "Body", None) for t in ("a", "stale", "b", "fresh", "c")]
+
+        results = send_many(messages)
+
+        self.assertEqual(results, [SENT, INVALID, SENT, SENT, SENT])
+        self.assertEqual([m.token for m in LocMemBackend.outbox], ["a", "b", "fresh", "c"])
+        self.assertEqual(list(DeviceToken.objects.values_list("token", flat=True)), ["fresh"])
+
+    def test_daily_reminders_fall_back_to_email(self):
+        bob = User.objects.create_user(username="bob", email="bob@example.com", password="pw")
+        DeviceToken.objects.create(user=self.user, token="alice-phone")
+
+        call_command("send_daily_reminders", stdout=StringIO())
+
+        self.assertEqual([m.token for m in LocMemBackend.outbox], ["alice-phone"])
+        self.assertEqual([m.to for m in mail.outbox], [["bob@example.com"]])
+        self.assertIn("Hi bob,", mail.outbox[0].body)
+
+    def test_interrupted_reminder_run_resumes_after_checkpoint(self):
+        bob = User.objects.create_user(username="bob", email="bob@example.com", password="pw")
+        carol = User.objects.create_user(username="carol", email="carol@example.com", password="pw")
+        interrupted = ReminderRun.objects.create(last_user_id=self.user.id, emails_sent=1)
+        # Interrupted by the previous scheduled run, twelve hours ago.
+        ReminderRun.objects.filter(pk=interrupted.pk).update(started_at=timezone.now() - timedelta(hours=12))
+
+        run = dispatch_daily_reminders(chunk_size=1)
+
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [bob.email, carol.email])
+        self.assertEqual((run.emails_sent, run.last_user_id), (3, carol.id))
+        self.assertEqual(run.resumed_after, self.user.id)
+        self.assertIsNotNone(run.finished_at)
+        self.assertEqual(ReminderRun.objects.count(), 1)
@@ -4,13 +4,47 @@ Uses Django's built-in Token model pattern without DRF dependency.
 """
 import hashlib
 import secrets
+import threading
+import time
 from datetime import timedelta
 
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
 from django.utils import timezone
 
 
+class _TouchTracker:
+    """Process-local record of when each token's ``last_used`` was last written,
+    so the column is touched at most once per API_TOKEN_TOUCH_INTERVAL instead
+    of on every request."""
+
+    MAX_ENTRIES = 10000
+
+    def __init__(self):
+        self._touched = {}
+        self._lock = threading.Lock()
+
+    def should_touch(self, token_id):
+        """True (and the clock restarts) if ``last_used`` is due for a write."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._touched.get(token_id)
+            if last is not None and now - last < settings.API_TOKEN_TOUCH_INTERVAL:
+                return False
+            if len(self._touched) >= self.MAX_ENTRIES:
+                self._touched.clear()
+            self._touched[token_id] = now
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._touched.clear()
+
+
+token_touches = _TouchTracker()
+
+
 class APIToken(models.Model):
     """Simple token model for API authentication."""
     key = models.CharField(max_length=64, unique=True, db_index=True)
@@ -32,11 +66,20 @@ class APIToken(models.Model):
 
     @classmethod
     def get_user_from_token(cls, key):
-        """Return the user for a valid token, or None."""
-        try:
-            token = cls.objects.select_related("user").get(key=key)
-            token.last_used = timezone.now()
-            token.save(update_fields=["last_used"])
-            return token.user
-        except cls.DoesNotExist:
+        """Return the user for a valid token, or None.
+
+        The token is looked up on every request, so a revocation applies at
+        once in every process; ``last_used`` is written with a single UPDATE
+        at most once per API_TOKEN_TOUCH_INTERVAL.
+        """
+        token = cls.objects.select_related("user").filter(key=key).first()
+        if token is None:
             return None
+        if token_touches.should_touch(token.pk):
+            cls.objects.filter(pk=token.pk).update(last_used=timezone.now())
+        return token.user
+
+    @classmethod
+    def revoke(cls, key):
+        """Delete the token; later requests with it are rejected everywhere."""
+        cls.objects.filter(key=key).delete()
@@ -0,0 +1,38 @@
+"""Response compression for the API."""
+import re
+
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # optional; gzip is always available
+    brotli = None
+
+re_accepts_br = re.compile(r"\bbr\b")
+
+
+class APICompressionMiddleware(GZipMiddleware):
+    """Compress ``/api/`` responses with brotli when installed and accepted,
+    otherwise gzip. HTML pages are left alone (they carry CSRF tokens)."""
+
+    def process_response(self, request, response):
+        if not request.path.startswith("/api/"):
+            return response
+        if brotli is None or not re_accepts_br.search(request.META.get("HTTP_ACCEPT_ENCODING", "")):
+            return super().process_response(request, response)
+
+        if response.streaming or response.has_header("Content-Encoding") or len(response.content) < 200:
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+        compressed = brotli.compress(response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        response.headers["Content-Encoding"] = "br"
+        # The bytes differ from the uncompressed representation.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        return response
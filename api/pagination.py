@@ -0,0 +1,108 @@
+"""Keyset (cursor) pagination helpers for the JSON API.
+
+A cursor is an opaque, URL-safe token encoding the sort key of the last
+item on the previous page. Fetching the next page is a range scan on that
+key, so every page costs the same regardless of how deep the client is.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(*values):
+    """Pack sort-key values (datetimes, ints, strings) into an opaque token."""
+    raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token, size):
+    """Inverse of ``encode_cursor``; raises InvalidCursor on anything malformed."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Invalid cursor.")
+    return values
+
+
+def keyset_after(fields, values):
+    """Q selecting rows strictly after ``values`` in descending ``fields`` order.
+
+    For fields (a, b, c) this is ``a < x OR (a = x AND b < y) OR (a = x AND b = y AND c < z)``.
+    """
+    q = Q()
+    for i, field in enumerate(fields):
+        clause = Q(**{f"{field}__lt": values[i]})
+        for prev, value in zip(fields[:i], values[:i]):
+            clause &= Q(**{prev: value})
+        q |= clause
+    return q
+
+
+def encode_timestamp(ts):
+    """Opaque token for a point in time (used as the delta sync token)."""
+    return encode_cursor(ts)
+
+
+def decode_timestamp(token):
+    (value,) = decode_cursor(token, 1)
+    try:
+        ts = parse_datetime(str(value))
+    except ValueError:
+        ts = None
+    if ts is None:
+        raise InvalidCursor("Invalid sync token.")
+    return ts
+
+
+# ---------------------------------------------------------------------------
+# Newest-first rows ordered by (date, created_at, id): transactions, split
+# expenses and settlements.
+# ---------------------------------------------------------------------------
+DATED_ORDER = ("-date", "-created_at", "-id")
+_DATED_KEY = ("date", "created_at", "id")
+
+
+def dated_cursor(obj):
+    return encode_cursor(obj.date, obj.created_at, obj.id)
+
+
+def dated_after(qs, token):
+    """Restrict ``qs`` (already in DATED_ORDER) to rows after ``token``."""
+    date, created_at, pk = decode_cursor(token, 3)
+    try:
+        date, created_at = parse_datetime(str(date)), parse_datetime(str(created_at))
+    except ValueError:
+        raise InvalidCursor("Invalid cursor.")
+    if date is None or created_at is None or not isinstance(pk, int):
+        raise InvalidCursor("Invalid cursor.")
+    return qs.filter(keyset_after(_DATED_KEY, (date, created_at, pk)))
+
+
+def keyset_page(qs, token, per_page):
+    """One page of ``qs`` (in DATED_ORDER) after ``token``: ``(rows, next_cursor)``."""
+    if token:
+        qs = dated_after(qs, token)
+    rows = list(qs[:per_page + 1])
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        return rows, dated_cursor(rows[-1])
+    return rows, None
+
+
+def page_size(request, default=50):
+    """``per_page`` from the query string, clamped to [1, MAX_PAGE_SIZE]."""
+    try:
+        return min(max(int(request.GET.get("per_page", default)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return default
@@ -0,0 +1,35 @@
+"""Compact JSON responses for large API payloads.
+
+Clients opt in with ``?compact=1``: the body is encoded without whitespace
+(with orjson when it is installed), amounts are numbers rather than
+strings, and repeated objects such as categories are sent once per response
+and referenced by id.
+"""
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+
+def wants_compact(request):
+    return request.GET.get("compact", "") in ("1", "true")
+
+
+def dumps(data):
+    """Encode ``data`` as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(data, default=DjangoJSONEncoder().default)
+    return json.dumps(
+        data, cls=DjangoJSONEncoder, separators=(",", ":"), ensure_ascii=False
+    ).encode()
+
+
+class CompactJsonResponse(HttpResponse):
+    def __init__(self, data, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data), **kwargs)
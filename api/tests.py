@@ -0,0 +1,350 @@
+import gzip
+import json
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from transactions.models import Budget, Category, Transaction
+from .authentication import APIToken, token_touches
+
+
+class APITestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password')
+        token = APIToken.generate_token(self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {token.key}'}
+
+    def api_get(self, name, params=None, **kwargs):
+        headers = {k: kwargs.pop(k) for k in list(kwargs) if k.startswith('HTTP_')}
+        return self.client.get(reverse(f'api:{name}', kwargs=kwargs or None), params or {}, **self.auth, **headers)
+
+
+class TransactionCursorTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        # Pairs share a timestamp so the (created_at, id) tie-breakers matter.
+        for i in range(7):
+            Transaction.objects.create(
+                user=self.user, amount=Decimal('1.00') + i, type='expense',
+                date=now - timedelta(hours=i // 2),
+            )
+
+    def test_walks_full_history_without_gaps(self):
+        seen, cursor = [], ''
+        while cursor is not None:
+            data = self.api_get('transaction_list', {'all': '1', 'cursor': cursor, 'per_page': 3, 'count': '0'}).json()
+            self.assertNotIn('total', data)
+            seen += [t['id'] for t in data['transactions']]
+            cursor = data['next_cursor']
+
+        expected = list(Transaction.objects.order_by('-date', '-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_first_page_has_totals(self):
+        data = self.api_get('transaction_list', {'all': '1', 'cursor': '', 'per_page': 5}).json()
+        self.assertEqual(data['total'], 7)
+        self.assertTrue(data['has_next'])
+        self.assertIn('total_spend', data)
+
+    def test_rejects_garbage_cursor(self):
+        resp = self.api_get('transaction_list', {'cursor': 'not-a-cursor'})
+        self.assertEqual(resp.status_code, 400)
+
+
+class SyncTest(APITestCase):
+    def backdate(self):
+        """Age every row past the token's overlap window."""
+        past = timezone.now() - timedelta(hours=1)
+        Transaction.objects.update(created_at=past, updated_at=past)
+        Budget.objects.update(created_at=past, updated_at=past)
+
+    def test_delta_contains_only_changes_and_deletions(self):
+        kept = Transaction.objects.create(user=self.user, amount=Decimal('5.00'), type='expense')
+        doomed = Transaction.objects.create(user=self.user, amount=Decimal('7.00'), type='expense')
+        self.backdate()
+
+        first = self.api_get('sync').json()
+        self.assertTrue(first['reset'])
+        self.assertEqual(len(first['changed']['transactions']), 2)
+
+        doomed_id = doomed.pk
+        doomed.delete()
+        added = Transaction.objects.create(user=self.user, amount=Decimal('9.00'), type='income')
+
+        delta = self.api_get('sync', {'since': first['token']}).json()
+        self.assertFalse(delta['reset'])
+        self.assertEqual([t['id'] for t in delta['changed']['transactions']], [added.id])
+        self.assertEqual(delta['deleted'], {'transactions': [doomed_id]})
+        self.assertNotIn(kept.id, [t['id'] for t in delta['changed']['transactions']])
+
+    def test_token_overlaps_recent_writes(self):
+        recent = Transaction.objects.create(user=self.user, amount=Decimal('5.00'), type='expense')
+        token = self.api_get('sync').json()['token']
+        delta = self.api_get('sync', {'since': token}).json()
+        self.assertEqual([t['id'] for t in delta['changed']['transactions']], [recent.id])
+
+    def test_budgets_follow_deleted_and_moved_expenses(self):
+        food = Category.objects.create(name='Food', user=self.user)
+        this_month = timezone.localdate().replace(day=1)
+        last_month = (this_month - timedelta(days=1)).replace(day=1)
+        current = Budget.objects.create(user=self.user, category=food, amount=Decimal('50'), month=this_month)
+        previous = Budget.objects.create(user=self.user, category=food, amount=Decimal('50'), month=last_month)
+        tz = timezone.get_current_timezone()
+        lunch = Transaction.objects.create(
+            user=self.user, amount=Decimal('8.00'), type='expense', category=food,
+            date=datetime.combine(last_month.replace(day=15), time(12), tzinfo=tz),
+        )
+        dinner = Transaction.objects.create(
+            user=self.user, amount=Decimal('9.00'), type='expense', category=food,
+            date=datetime.combine(last_month.replace(day=16), time(12), tzinfo=tz),
+        )
+        self.backdate()
+        token = self.api_get('sync').json()['token']
+
+        lunch.delete()
+        delta = self.api_get('sync', {'since': token}).json()
+        self.assertEqual([b['id'] for b in delta['changed']['budgets']], [previous.id])
+        self.assertEqual(delta['changed']['budgets'][0]['spent'], '9.00')
+
+        self.backdate()
+        token = self.api_get('sync').json()['token']
+        dinner.date = timezone.now()
+        dinner.save()
+        delta = self.api_get('sync', {'since': token}).json()
+        budgets = {b['id']: b['spent'] for b in delta['changed']['budgets']}
+        self.assertEqual(budgets, {current.id: '9.00', previous.id: '0'})
+
+    def test_rejects_garbage_token(self):
+        self.assertEqual(self.api_get('sync', {'since': '!!'}).status_code, 400)
+
+
+class BatchTest(APITestCase):
+    def post_batch(self, operations):
+        return self.client.post(
+            reverse('api:batch'), json.dumps({'operations': operations}),
+            content_type='application/json', **self.auth,
+        )
+
+    def test_replays_queue_in_order_with_dedupe(self):
+        existing = Transaction.objects.create(
+            user=self.user, amount=Decimal('4.00'), type='expense', local_id='a',
+        )
+        resp = self.post_batch([
+            {'op': 'create', 'type': 'transaction', 'local_id': 'a', 'data': {'amount': '4', 'type': 'expense'}},
+            {'op': 'create', 'type': 'transaction', 'local_id': 'b', 'data': {'amount': '6', 'type': 'expense'}},
+            {'op': 'create', 'type': 'transaction', 'local_id': 'b', 'data': {'amount': '6', 'type': 'expense'}},
+            {'op': 'update', 'type': 'transaction', 'local_id': 'b', 'data': {'notes': 'lunch'}},
+            {'op': 'create', 'type': 'transaction', 'data': {'amount': '-1', 'type': 'expense'}},
+            {'op': 'delete', 'type': 'budget', 'id': 999},
+        ])
+        self.assertEqual(resp.status_code, 200)
+        results = resp.json()['results']
+        self.assertEqual([r['status'] for r in results], [200, 201, 200, 200, 400, 404])
+        self.assertEqual(results[0]['id'], existing.id)
+        self.assertEqual(results[2]['id'], results[1]['id'])
+
+        created = Transaction.objects.get(local_id='b')
+        self.assertEqual(created.notes, 'lunch')
+        self.assertEqual(self.user.monthly_rollups.get(type='expense').total, Decimal('10.00'))
+
+    def test_duplicate_reports_failure_of_first_create(self):
+        from unittest import mock
+        op = {'op': 'create', 'type': 'transaction', 'local_id': 'c', 'data': {'amount': '5', 'type': 'expense'}}
+        with mock.patch('api.views.bulk_create_transactions', side_effect=Exception('UNIQUE constraint failed: secret')):
+            with self.assertLogs('api.views', 'ERROR'):
+                resp = self.post_batch([op, dict(op)])
+
+        results = resp.json()['results']
+        self.assertEqual([r['status'] for r in results], [500, 500])
+        self.assertNotIn('already_existed', results[1])
+        self.assertEqual(results[1]['error'], 'Could not apply this operation.')
+        self.assertNotIn('secret', resp.content.decode())
+        self.assertEqual([r['index'] for r in results], [0, 1])
+
+    def test_budget_update_edits_by_id(self):
+        food = Category.objects.create(name='Food', user=self.user)
+        rent = Category.objects.create(name='Rent', user=self.user)
+        budget = Budget.objects.create(
+            user=self.user, category=food, amount=Decimal('50'), month=timezone.localdate().replace(day=1),
+        )
+        results = self.post_batch([
+            {'op': 'update', 'type': 'budget', 'id': budget.id, 'data': {'category_id': rent.id, 'amount': '80'}},
+            {'op': 'update', 'type': 'budget', 'id': 999, 'data': {'amount': '1'}},
+        ]).json()['results']
+
+        self.assertEqual([r['status'] for r in results], [200, 404])
+        self.assertEqual(results[0]['id'], budget.id)
+        budget.refresh_from_db()
+        self.assertEqual((budget.category, budget.amount), (rent, Decimal('80')))
+        self.assertEqual(Budget.objects.filter(user=self.user).count(), 1)
+
+    def test_rejects_empty_batch(self):
+        self.assertEqual(self.post_batch([]).status_code, 400)
+
+
+class TokenLookupTest(TestCase):
+    def setUp(self):
+        token_touches.clear()
+        self.user = User.objects.create_user(username='alice', password='password')
+        self.token = APIToken.generate_token(self.user)
+
+    def test_last_used_write_is_coalesced(self):
+        with self.assertNumQueries(2):  # token + user, last_used UPDATE
+            self.assertEqual(APIToken.get_user_from_token(self.token.key), self.user)
+        with self.assertNumQueries(1):  # token + user only
+            self.assertEqual(APIToken.get_user_from_token(self.token.key), self.user)
+
+    def test_revoke_applies_immediately(self):
+        APIToken.get_user_from_token(self.token.key)
+        APIToken.revoke(self.token.key)
+        self.assertIsNone(APIToken.get_user_from_token(self.token.key))
+
+
+class ReportCompareTest(APITestCase):
+    def test_compare_years(self):
+        Transaction.objects.create(user=self.user, amount=Decimal('20.00'), type='income')
+        year = timezone.localdate().year
+        data = self.api_get('reports_compare', {'years': f'{year - 1},{year}'}).json()
+        self.assertEqual([r['year'] for r in data['years']], [year - 1, year])
+        self.assertEqual(data['years'][1]['income'], 20.0)
+
+        self.assertEqual(self.api_get('reports_compare', {'years': 'soon'}).status_code, 400)
+
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class VersionedCacheTest(APITestCase):
+    def test_write_moves_dashboard_to_new_version(self):
+        first = self.api_get('dashboard').json()
+        with self.assertNumQueries(2):  # token user and data version only
+            self.assertEqual(self.api_get('dashboard').json()['total_balance'], first['total_balance'])
+
+        Transaction.objects.create(user=self.user, amount=Decimal('40.00'), type='income')
+        self.assertEqual(Decimal(self.api_get('dashboard').json()['total_balance']), Decimal('40.00'))
+
+
+class ConditionalGetTest(APITestCase):
+    def test_unchanged_data_returns_304_before_building(self):
+        etag = self.api_get('dashboard')['ETag']
+        with self.assertNumQueries(2):  # token user, data versions
+            resp = self.api_get('dashboard', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+
+        Transaction.objects.create(user=self.user, amount=Decimal('5.00'), type='expense')
+        resp = self.api_get('dashboard', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp['ETag'], etag)
+
+    def test_group_etag_follows_group_version(self):
+        from split_expense.models import Group, GroupMember
+        from split_expense.services import create_expense
+
+        group = Group.objects.create(name='Trip', created_by=self.user)
+        GroupMember.objects.create(group=group, user=self.user, is_accepted=True)
+        etag = self.api_get('split_group_detail', pk=group.pk)['ETag']
+        self.assertEqual(self.api_get('split_group_detail', pk=group.pk, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        create_expense(group, self.user, Decimal('30.00'), 'Taxi', 'equal')
+        self.assertEqual(self.api_get('split_group_detail', pk=group.pk, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+        stranger = User.objects.create_user(username='mallory', password='password')
+        token = APIToken.generate_token(stranger)
+        resp = self.client.get(
+            reverse('api:split_group_detail', kwargs={'pk': group.pk}),
+            HTTP_AUTHORIZATION=f'Bearer {token.key}', HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(resp.status_code, 404)
+
+
+class CompactResponseTest(APITestCase):
+    def test_compact_transactions_share_a_category_table(self):
+        from transactions.models import Category
+
+        food = Category.objects.create(name='Food', user=self.user)
+        for amount in ('1.50', '2.25'):
+            Transaction.objects.create(user=self.user, amount=Decimal(amount), type='expense', category=food)
+
+        resp = self.api_get('transaction_list', {'compact': '1'}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        data = json.loads(gzip.decompress(resp.content))
+        self.assertEqual(data['categories'], {str(food.id): {'name': 'Food', 'icon': 'category', 'color': '#C8E64A'}})
+        self.assertEqual(sorted(t['amount'] for t in data['transactions']), [1.5, 2.25])
+        self.assertEqual({t['category'] for t in data['transactions']}, {food.id})
+
+        plain = self.api_get('transaction_list').json()
+        self.assertEqual(plain['transactions'][0]['category']['name'], 'Food')
+
+
+class SplitGroupDetailQueryTest(APITestCase):
+    def test_query_count_does_not_grow_with_expenses(self):
+        from split_expense.models import Group, GroupMember
+        from split_expense.services import create_expense, create_settlement
+
+        group = Group.objects.create(name='Trip', created_by=self.user)
+        friends = [User.objects.create_user(username=f'friend{i}', password='password') for i in range(3)]
+        for member in [self.user, *friends]:
+            GroupMember.objects.create(group=group, user=member, is_accepted=True)
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as ctx:
+                resp = self.api_get('split_group_detail', pk=group.pk)
+            self.assertEqual(resp.status_code, 200)
+            return len(ctx.captured_queries)
+
+        create_expense(group, self.user, Decimal('40.00'), 'Dinner', 'equal')
+        count_queries()  # warm the token cache
+        few = count_queries()
+        for i in range(5):
+            create_expense(group, friends[i % 3], Decimal('12.00'), f'Taxi {i}', 'equal')
+        create_settlement(group, friends[0], self.user, Decimal('5.00'))
+        self.assertEqual(count_queries(), few)
+
+
+class SplitHistoryTest(APITestCase):
+    def setUp(self):
+        super().setUp()
+        from split_expense.models import Group, GroupMember
+        from split_expense.services import create_expense, create_settlement
+
+        self.friend = User.objects.create_user(username='bob', password='password')
+        self.group = Group.objects.create(name='Flat', created_by=self.user)
+        for member in (self.user, self.friend):
+            GroupMember.objects.create(group=self.group, user=member, is_accepted=True)
+        for i in range(5):
+            create_expense(self.group, self.friend, Decimal('10.00'), f'Groceries {i}', 'equal')
+        create_settlement(self.group, self.user, self.friend, Decimal('5.00'))
+
+    def test_expenses_are_paged_by_cursor(self):
+        seen, cursor = [], ''
+        while cursor is not None:
+            data = self.api_get('split_expense_create', {'cursor': cursor, 'per_page': 2}, pk=self.group.pk).json()
+            seen += data['expenses']
+            cursor = data['next_cursor']
+        self.assertEqual([e['description'] for e in seen], [f'Groceries {i}' for i in range(4, -1, -1)])
+        self.assertEqual(seen[0]['my_share'], '5.00')
+        self.assertEqual(seen[0]['paid_by'], {'id': self.friend.id, 'display_name': 'bob'})
+
+        detail = self.api_get('split_group_detail', pk=self.group.pk).json()['group']
+        self.assertNotIn('recent_expenses', detail)
+
+    def test_settlements_and_membership(self):
+        data = self.api_get('split_settlement_list', pk=self.group.pk).json()
+        self.assertEqual([s['amount'] for s in data['settlements']], ['5.00'])
+        self.assertIsNone(data['next_cursor'])
+
+        outsider = User.objects.create_user(username='eve', password='password')
+        token = APIToken.generate_token(outsider)
+        resp = self.client.get(
+            reverse('api:split_settlement_list', kwargs={'pk': self.group.pk}),
+            HTTP_AUTHORIZATION=f'Bearer {token.key}',
+        )
+        self.assertEqual(resp.status_code, 404)
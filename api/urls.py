@@ -22,9 +22,14 @@ urlpatterns = [
     path("contact/captcha/", ContactCaptchaAPIView.as_view(), name="contact_captcha"),
     path("contact/submit/", ContactSubmitAPIView.as_view(), name="contact_submit"),
 
+    # Delta sync
+    path("sync/", views.SyncAPIView.as_view(), name="sync"),
+    path("batch/", views.BatchAPIView.as_view(), name="batch"),
+
     # Dashboard & Reports
     path("dashboard/", views.DashboardAPIView.as_view(), name="dashboard"),
     path("reports/", views.ReportAPIView.as_view(), name="reports"),
+    path("reports/compare/", views.ReportCompareAPIView.as_view(), name="reports_compare"),
 
     # Transactions
     path("transactions/", views.TransactionListAPIView.as_view(), name="transaction_list"),
@@ -48,6 +53,7 @@ urlpatterns = [
     path("split/groups/<int:pk>/", views.SplitGroupDetailAPIView.as_view(), name="split_group_detail"),
     path("split/groups/<int:pk>/expenses/", views.SplitExpenseCreateAPIView.as_view(), name="split_expense_create"),
     path("split/groups/<int:group_pk>/expenses/<int:pk>/", views.SplitExpenseDetailAPIView.as_view(), name="split_expense_detail"),
+    path("split/groups/<int:pk>/settlements/", views.SplitSettlementListAPIView.as_view(), name="split_settlement_list"),
     path("split/groups/<int:pk>/settle/", views.SplitSettleAPIView.as_view(), name="split_settle"),
     path("split/groups/<int:pk>/members/", views.SplitAddMemberAPIView.as_view(), name="split_add_member"),
     path("split/groups/<int:pk>/remind/", views.SplitReminderAPIView.as_view(), name="split_remind"),
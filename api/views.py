@@ -3,26 +3,47 @@ API views for Espere — all JSON endpoints consumed by the Flutter app.
 
 No DRF dependency — uses plain Django views with JSON responses.
 """
+import hashlib
 import json
+import logging
 from datetime import datetime, date, timedelta
 from decimal import Decimal, InvalidOperation
 
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from django.db.models import Sum, Q
+from django.db import transaction as db_transaction
+from django.db.models import OuterRef, Subquery, Sum, Q
 from django.http import JsonResponse
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime, parse_date
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from django.core.exceptions import ValidationError
 from django.conf import settings
+from django.core.cache import cache
 
 from accounts.models import UserProfile
+from core.models import Tombstone
+from core.utils.cache import user_cache_key, get_data_versions, SHARED_VERSION_ID
 from transactions.models import Transaction, Category, Budget, SavingsGoal
+from transactions.services import (
+    get_dashboard_summary, rollup_totals, shift_month, bulk_create_transactions,
+    compute_spent_for, carry_forward_budgets,
+)
 from .authentication import APIToken
 from .decorators import api_login_required, parse_json_body
+from .pagination import (
+    InvalidCursor, encode_timestamp, decode_timestamp, DATED_ORDER, keyset_page, page_size,
+)
+from .responses import CompactJsonResponse, wants_compact
+
+logger = logging.getLogger(__name__)
+
+# Seconds a versioned payload stays cached; any write moves the user to a
+# new data version, so this only bounds how long dead entries linger.
+API_CACHE_TIMEOUT = 1800
 
 
 # ---------------------------------------------------------------------------
@@ -68,6 +89,40 @@ def _transaction_to_dict(txn, currency_symbol="₹"):
     }
 
 
+def _transactions_payload(transactions, currency_symbol, compact=False):
+    """The ``transactions`` list for a response, plus its category table in compact mode.
+
+    Compact rows carry numeric amounts and a category id; each category used
+    is sent once under ``categories`` (keyed by id), and payment method
+    labels once under ``payment_methods``.
+    """
+    if not compact:
+        return {"transactions": [_transaction_to_dict(t, currency_symbol) for t in transactions]}
+
+    categories, rows = {}, []
+    for txn in transactions:
+        if txn.category_id is not None and str(txn.category_id) not in categories:
+            categories[str(txn.category_id)] = {
+                "name": txn.category.name,
+                "icon": txn.category.icon,
+                "color": txn.category.color,
+            }
+        rows.append({
+            "id": txn.id,
+            "amount": float(txn.amount),
+            "type": txn.type,
+            "category": txn.category_id,
+            "date": txn.date.isoformat(),
+            "payment_method": txn.payment_method,
+            "notes": txn.notes,
+        })
+    return {
+        "transactions": rows,
+        "categories": categories,
+        "payment_methods": dict(Transaction.PAYMENT_CHOICES),
+    }
+
+
 def _saving_goal_to_dict(g):
     """Serialize a SavingsGoal instance."""
     return {
@@ -105,6 +160,41 @@ def _category_to_dict(cat):
     }
 
 
+def _budget_to_dict(b):
+    """Serialize a Budget instance with its spending for the month."""
+    return {
+        "id": b.id,
+        "category": _category_to_dict(b.category),
+        "amount": str(b.amount),
+        "month": b.month.isoformat(),
+        "spent": str(b.get_spent()),
+        "percentage": b.get_percentage(),
+        "is_exceeded": b.is_exceeded(),
+    }
+
+
+def _etag(*parts):
+    return hashlib.sha1("|".join(map(str, parts)).encode()).hexdigest()[:24]
+
+
+def _user_etag(request, *args, **kwargs):
+    """ETag for a payload built from the caller's own data.
+
+    Cheap enough to run before the view: one DataVersion read covering the
+    caller and the shared rows (system categories). The local date is
+    folded in for views whose defaults (month, year) depend on it.
+    """
+    user = request.api_user
+    request.data_version, shared_version = get_data_versions(user.id, SHARED_VERSION_ID)
+    return _etag(
+        request.get_full_path(), user.id, timezone.localdate(), request.data_version, shared_version,
+    )
+
+
+def _dashboard_etag(request, *args, **kwargs):
+    return _etag(_user_etag(request), _get_greeting())
+
+
 def _get_greeting():
     """Return time-based greeting."""
     hour = timezone.localtime().hour
@@ -143,6 +233,50 @@ def _parse_api_datetime(value):
     return timezone.now()
 
 
+def _clean_transaction_data(data, user, partial=False):
+    """Validate a transaction payload; returns ``(fields, errors)``.
+
+    With ``partial`` (updates) only the keys present in ``data`` are
+    returned and ``amount``/``type`` are not required.
+    """
+    fields, errors = {}, {}
+
+    if not partial or "amount" in data:
+        try:
+            fields["amount"] = Decimal(str(data.get("amount", "")))
+            if not partial and fields["amount"] <= 0:
+                errors["amount"] = "Amount must be positive."
+        except (InvalidOperation, ValueError):
+            errors["amount"] = "Invalid amount."
+
+    txn_type = data.get("type", "")
+    if txn_type in ("income", "expense"):
+        fields["type"] = txn_type
+    elif not partial:
+        errors["type"] = "Type must be 'income' or 'expense'."
+
+    if (partial and "category_id" in data) or (not partial and data.get("category_id")):
+        try:
+            fields["category"] = Category.objects.get(
+                Q(id=data["category_id"]) & (Q(is_system=True) | Q(user=user))
+            )
+        except (Category.DoesNotExist, ValueError, TypeError):
+            errors["category"] = "Invalid category."
+    elif not partial:
+        fields["category"] = None
+
+    if not partial or "date" in data:
+        fields["date"] = _parse_api_datetime(data.get("date"))
+    if not partial or "payment_method" in data:
+        fields["payment_method"] = data.get("payment_method", "cash")
+    if not partial or "notes" in data:
+        fields["notes"] = data.get("notes", "")
+    if not partial and data.get("local_id"):
+        fields["local_id"] = str(data["local_id"])
+
+    return fields, errors
+
+
 # ---------------------------------------------------------------------------
 # Auth Endpoints
 # ---------------------------------------------------------------------------
@@ -191,7 +325,7 @@ class LogoutAPIView(View):
     def post(self, request):
         auth_header = request.META.get("HTTP_AUTHORIZATION", "")
         token_key = auth_header[7:].strip()
-        APIToken.objects.filter(key=token_key).delete()
+        APIToken.revoke(token_key)
         return JsonResponse({"message": "Logged out successfully."})
 
 
@@ -436,70 +570,38 @@ class DashboardAPIView(View):
     """GET /api/dashboard/ — aggregated dashboard data."""
 
     @method_decorator(api_login_required)
+    @method_decorator(condition(etag_func=_dashboard_etag))
     def get(self, request):
         user = request.api_user
         today = timezone.localdate()
-        month_start = today.replace(day=1)
 
-        # Monthly stats — ensure we include everything in the current month
-        month_txns = Transaction.objects.filter(
-            user=user, date__year=today.year, date__month=today.month
+        key = user_cache_key(
+            user.id, "api-dashboard", today.isoformat(), version=getattr(request, "data_version", None)
         )
-        income = month_txns.filter(type="income").aggregate(t=Sum("amount"))["t"] or Decimal("0")
-        expenses = month_txns.filter(type="expense").aggregate(t=Sum("amount"))["t"] or Decimal("0")
-
-        # All-time balance
-        all_income = Transaction.objects.filter(user=user, type="income").aggregate(t=Sum("amount"))["t"] or Decimal("0")
-        all_expenses = Transaction.objects.filter(user=user, type="expense").aggregate(t=Sum("amount"))["t"] or Decimal("0")
-        total_balance = all_income - all_expenses
+        data = cache.get(key)
+        if data is None:
+            data = self._build(user, today)
+            cache.set(key, data, API_CACHE_TIMEOUT)
+        return JsonResponse({"greeting": _get_greeting(), **data})
+
+    @staticmethod
+    def _build(user, today):
+        summary = get_dashboard_summary(user, today)
+        income = summary["monthly_income"]
+        expenses = summary["monthly_expenses"]
 
         # Recent transactions
         recent = Transaction.objects.filter(user=user).select_related("category")[:5]
         profile, _ = UserProfile.objects.get_or_create(user=user)
         currency_symbol = profile.get_currency_symbol()
 
-        # Chart data: expenses by category
-        cat_data = (
-            month_txns.filter(type="expense")
-            .values("category__name", "category__color")
-            .annotate(total=Sum("amount"))
-            .order_by("-total")[:8]
-        )
-        pie_labels = [d["category__name"] or "Other" for d in cat_data]
-        pie_values = [float(d["total"]) for d in cat_data]
-        pie_colors = [d["category__color"] or "#6366f1" for d in cat_data]
-
-        # Chart data: monthly income vs expense (last 6 months)
-        bar_labels, bar_income, bar_expense = [], [], []
-        for i in range(5, -1, -1):
-            m = (today.month - i - 1) % 12 + 1
-            y = today.year - ((today.month - i - 1) < 0)
-            if today.month - i <= 0:
-                y = today.year - 1
-                m = 12 + (today.month - i)
-            month_label = date(y, m, 1).strftime("%b")
-            bar_labels.append(month_label)
-            mtxns = Transaction.objects.filter(user=user, date__year=y, date__month=m)
-            bar_income.append(float(mtxns.filter(type="income").aggregate(t=Sum("amount"))["t"] or 0))
-            bar_expense.append(float(mtxns.filter(type="expense").aggregate(t=Sum("amount"))["t"] or 0))
-
-        # Chart data: 30-day spending trend
-        line_labels, line_values = [], []
-        for i in range(29, -1, -1):
-            d = today - timedelta(days=i)
-            daily = Transaction.objects.filter(
-                user=user, type="expense", date__date=d
-            ).aggregate(t=Sum("amount"))["t"] or 0
-            line_labels.append(d.strftime("%d"))
-            line_values.append(float(daily))
-
         # Budget warnings and overall monthly budget
         current_budgets = Budget.objects.filter(user=user, month__year=today.year, month__month=today.month).select_related("category")
         budget_warnings = []
         monthly_budget_limit = Decimal("0")
         monthly_budget_spent = Decimal("0")
         
-        for b in current_budgets:
+        for b in compute_spent_for(current_budgets):
             spent = b.get_spent()
             monthly_budget_limit += b.amount
             monthly_budget_spent += spent
@@ -511,12 +613,13 @@ class DashboardAPIView(View):
                 })
 
         # Insights
-        insights = _generate_insights(user, today, income, expenses)
+        insights = _generate_insights(
+            user, today, income, expenses, prev_expenses=summary["prev_month_expenses"]
+        )
 
-        return JsonResponse({
-            "greeting": _get_greeting(),
+        return {
             "user": _user_profile_data(user),
-            "total_balance": str(total_balance),
+            "total_balance": str(summary["total_balance"]),
             "monthly_income": str(income),
             "monthly_expenses": str(expenses),
             "monthly_savings": str(income - expenses),
@@ -524,17 +627,17 @@ class DashboardAPIView(View):
             "monthly_budget_spent": str(monthly_budget_spent),
             "currency_symbol": currency_symbol,
             "recent_transactions": [_transaction_to_dict(t, currency_symbol) for t in recent],
-            "pie_labels": pie_labels,
-            "pie_values": pie_values,
-            "pie_colors": pie_colors,
-            "bar_labels": bar_labels,
-            "bar_income": bar_income,
-            "bar_expense": bar_expense,
-            "line_labels": line_labels,
-            "line_values": line_values,
+            "pie_labels": summary["pie_labels"],
+            "pie_values": summary["pie_values"],
+            "pie_colors": summary["pie_colors"],
+            "bar_labels": summary["bar_labels"],
+            "bar_income": summary["bar_income"],
+            "bar_expense": summary["bar_expense"],
+            "line_labels": summary["line_labels"],
+            "line_values": summary["line_values"],
             "budget_warnings": budget_warnings,
             "insights": insights,
-        })
+        }
 
 
 @method_decorator(csrf_exempt, name="dispatch")
@@ -542,45 +645,70 @@ class ReportAPIView(View):
     """GET /api/reports/ — yearly report data."""
 
     @method_decorator(api_login_required)
+    @method_decorator(condition(etag_func=_user_etag))
     def get(self, request):
-        from reports.views import ReportsView
         user = request.api_user
         today = timezone.localdate()
         year = int(request.GET.get("year", today.year))
 
-        # Re-use the logic from ReportsView but return JSON
-        view = ReportsView()
-        request.user = user  # Ensure request.user is set for the view
-        view.request = request
-        ctx = view.get_context_data(year=year)
+        key = user_cache_key(
+            user.id, "api-report", year, version=getattr(request, "data_version", None)
+        )
+        data = cache.get(key)
+        if data is None:
+            data = self._build(user, year)
+            cache.set(key, data, API_CACHE_TIMEOUT)
+        return JsonResponse(data)
+
+    @staticmethod
+    def _build(user, year):
+        from reports.services import build_yearly_report
+        report = build_yearly_report(user, year)
+        return {
+            "selected_year": year,
+            "currency_symbol": user.userprofile.get_currency_symbol() if hasattr(user, 'userprofile') else "$",
+            "annual_income": str(report["annual_income"]),
+            "annual_expenses": str(report["annual_expenses"]),
+            "annual_net": str(report["annual_net"]),
+            "monthly_summary": report["monthly_summary"],
+            "top_categories": report["top_categories"],
+            "bar_labels": report["bar_labels"],
+            "bar_income": report["bar_income"],
+            "bar_expense": report["bar_expense"],
+            "pie_labels": report["pie_labels"],
+            "pie_values": report["pie_values"],
+            "pie_colors": report["pie_colors"],
+            "pie_icons": report["pie_icons"],
+            "savings_trend": report["savings_trend"],
+        }
+
+
+class ReportCompareAPIView(View):
+    """GET /api/reports/compare/?years=2023,2024,2025 — year-over-year totals."""
 
+    @method_decorator(api_login_required)
+    def get(self, request):
+        from reports.services import compare_years, parse_compare_years
+        user = request.api_user
+        try:
+            years = parse_compare_years(request.GET.get("years"))
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        comparison = compare_years(user, years)
         return JsonResponse({
-            "selected_year": ctx["selected_year"],
             "currency_symbol": user.userprofile.get_currency_symbol() if hasattr(user, 'userprofile') else "$",
-            "annual_income": str(ctx["annual_income"]),
-            "annual_expenses": str(ctx["annual_expenses"]),
-            "annual_net": str(ctx["annual_net"]),
-            "monthly_summary": ctx["monthly_summary"],
-            "top_categories": ctx["top_categories"],
-            "bar_labels": json.loads(ctx["monthly_labels"]),
-            "bar_income": json.loads(ctx["monthly_income_data"]),
-            "bar_expense": json.loads(ctx["monthly_expense_data"]),
-            "pie_labels": json.loads(ctx["cat_labels"]),
-            "pie_values": json.loads(ctx["cat_values"]),
-            "pie_colors": json.loads(ctx["cat_colors"]),
-            "pie_icons": json.loads(ctx["cat_icons"]),
-            "savings_trend": json.loads(ctx["savings_data"]),
+            "labels": comparison["labels"],
+            "years": comparison["years"],
         })
 
 
-def _generate_insights(user, today, current_income, current_expenses):
+def _generate_insights(user, today, current_income, current_expenses, prev_expenses=None):
     """Generate smart financial insight messages."""
     insights = []
-    prev_start = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
-    prev_end = today.replace(day=1) - timedelta(days=1)
-    prev_expenses = Transaction.objects.filter(
-        user=user, type="expense", date__date__gte=prev_start, date__date__lte=prev_end
-    ).aggregate(t=Sum("amount"))["t"] or Decimal("0")
+    if prev_expenses is None:
+        month_start = today.replace(day=1)
+        _, prev_expenses = rollup_totals(user, shift_month(month_start, -1), month_start)
 
     if prev_expenses > 0 and current_expenses > 0:
         change = ((current_expenses - prev_expenses) / prev_expenses) * 100
@@ -643,11 +771,65 @@ class TransactionListAPIView(View):
                 today = timezone.localdate()
                 qs = qs.filter(date__year=today.year, date__month=today.month)
 
-        # Calculate statistics
+        profile, _ = UserProfile.objects.get_or_create(user=user)
+        cs = profile.get_currency_symbol()
+
+        cursor = request.GET.get("cursor")
+        if cursor is not None:
+            return self._cursor_page(request, qs, cursor, cs, show_all, month_param)
+
+        # Pagination
+        page = int(request.GET.get("page", 1))
+        per_page = int(request.GET.get("per_page", 50))
+        if show_all:
+            per_page = 5000  # Emulate fetching all time transactions
+        total = qs.count()
+        offset = (page - 1) * per_page
+        transactions = qs[offset:offset + per_page]
+
+        compact = wants_compact(request)
+        data = {
+            **_transactions_payload(transactions, cs, compact),
+            "currency_symbol": cs,
+            "total": total,
+            "page": page,
+            "per_page": per_page,
+            "has_next": offset + per_page < total,
+            **self._stats(qs, show_all, month_param),
+        }
+        return CompactJsonResponse(data) if compact else JsonResponse(data)
+
+    def _cursor_page(self, request, qs, cursor, cs, show_all, month_param):
+        """Keyset pagination: pass ``cursor=`` for the first page, then each
+        response's ``next_cursor``. ``count=0`` skips the total count; the
+        summary figures are only computed for the first page.
+        """
+        per_page = page_size(request)
+        try:
+            transactions, next_cursor = keyset_page(qs.order_by(*DATED_ORDER), cursor, per_page)
+        except InvalidCursor as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        compact = wants_compact(request)
+        data = {
+            **_transactions_payload(transactions, cs, compact),
+            "currency_symbol": cs,
+            "per_page": per_page,
+            "has_next": next_cursor is not None,
+            "next_cursor": next_cursor,
+        }
+        if request.GET.get("count", "1") != "0":
+            data["total"] = qs.count()
+        if not cursor:
+            data.update(self._stats(qs, show_all, month_param))
+        return CompactJsonResponse(data) if compact else JsonResponse(data)
+
+    @staticmethod
+    def _stats(qs, show_all, month_param):
+        """Spend/income summary figures for the filtered list."""
         qs_expenses = qs.filter(type="expense")
         qs_incomes = qs.filter(type="income")
         
-        from django.db.models import Sum
         total_spend = qs_expenses.aggregate(t=Sum("amount"))["t"] or Decimal("0")
         total_income = qs_incomes.aggregate(t=Sum("amount"))["t"] or Decimal("0")
         
@@ -679,73 +861,34 @@ class TransactionListAPIView(View):
                 _, days_in_month = calendar.monthrange(target_month.year, target_month.month)
                 avg_daily = total_spend / days_in_month
 
-        # Pagination
-        page = int(request.GET.get("page", 1))
-        per_page = int(request.GET.get("per_page", 50))
-        if show_all:
-            per_page = 5000  # Emulate fetching all time transactions
-        total = qs.count()
-        offset = (page - 1) * per_page
-        transactions = qs[offset:offset + per_page]
-
-        profile, _ = UserProfile.objects.get_or_create(user=user)
-        cs = profile.get_currency_symbol()
-
-        return JsonResponse({
-            "transactions": [_transaction_to_dict(t, cs) for t in transactions],
-            "currency_symbol": cs,
-            "total": total,
-            "page": page,
-            "per_page": per_page,
-            "has_next": offset + per_page < total,
+        return {
             "total_spend": str(total_spend),
             "total_income": str(total_income),
             "today_spend": str(today_spend),
             "avg_daily": str(avg_daily),
-        })
+        }
 
     @method_decorator(api_login_required)
     def post(self, request):
         data = parse_json_body(request)
         user = request.api_user
 
-        errors = {}
-        amount_str = data.get("amount", "")
-        try:
-            amount = Decimal(str(amount_str))
-            if amount <= 0:
-                errors["amount"] = "Amount must be positive."
-        except (InvalidOperation, ValueError):
-            errors["amount"] = "Invalid amount."
-
-        txn_type = data.get("type", "")
-        if txn_type not in ("income", "expense"):
-            errors["type"] = "Type must be 'income' or 'expense'."
-
-        category_id = data.get("category_id")
-        category = None
-        if category_id:
-            try:
-                category = Category.objects.get(
-                    Q(id=category_id) & (Q(is_system=True) | Q(user=user))
-                )
-            except Category.DoesNotExist:
-                errors["category"] = "Invalid category."
-
+        fields, errors = _clean_transaction_data(data, user)
         if errors:
             return JsonResponse({"errors": errors}, status=400)
 
-        txn = Transaction.objects.create(
-            user=user,
-            amount=amount,
-            type=txn_type,
-            category=category,
-            date=_parse_api_datetime(data.get("date")),
-            payment_method=data.get("payment_method", "cash"),
-            notes=data.get("notes", ""),
-        )
-
         profile, _ = UserProfile.objects.get_or_create(user=user)
+
+        # De-duplication check for replayed offline creates
+        if fields.get("local_id"):
+            existing = Transaction.objects.filter(user=user, local_id=fields["local_id"]).first()
+            if existing:
+                return JsonResponse({
+                    "transaction": _transaction_to_dict(existing, profile.get_currency_symbol()),
+                    "already_existed": True,
+                }, status=200)
+
+        txn = Transaction.objects.create(user=user, **fields)
         return JsonResponse(
             {"transaction": _transaction_to_dict(txn, profile.get_currency_symbol())},
             status=201,
@@ -774,31 +917,12 @@ class TransactionDetailAPIView(View):
             return JsonResponse({"error": "Transaction not found."}, status=404)
 
         data = parse_json_body(request)
+        fields, errors = _clean_transaction_data(data, request.api_user, partial=True)
+        if errors:
+            return JsonResponse({"errors": errors}, status=400)
 
-        if "amount" in data:
-            try:
-                txn.amount = Decimal(str(data["amount"]))
-            except (InvalidOperation, ValueError):
-                return JsonResponse({"errors": {"amount": "Invalid amount."}}, status=400)
-
-        if "type" in data and data["type"] in ("income", "expense"):
-            txn.type = data["type"]
-
-        if "category_id" in data:
-            try:
-                txn.category = Category.objects.get(
-                    Q(id=data["category_id"]) & (Q(is_system=True) | Q(user=request.api_user))
-                )
-            except Category.DoesNotExist:
-                return JsonResponse({"errors": {"category": "Invalid category."}}, status=400)
-
-        if "date" in data:
-            txn.date = _parse_api_datetime(data["date"])
-        if "payment_method" in data:
-            txn.payment_method = data["payment_method"]
-        if "notes" in data:
-            txn.notes = data["notes"]
-
+        for name, value in fields.items():
+            setattr(txn, name, value)
         txn.save()
         profile, _ = UserProfile.objects.get_or_create(user=request.api_user)
         return JsonResponse({"transaction": _transaction_to_dict(txn, profile.get_currency_symbol())})
@@ -824,6 +948,7 @@ class CategoryListAPIView(View):
        POST /api/categories/ — create a user category."""
 
     @method_decorator(api_login_required)
+    @method_decorator(condition(etag_func=_user_etag))
     def get(self, request):
         user = request.api_user
         categories = Category.objects.filter(Q(is_system=True) | Q(user=user))
@@ -908,6 +1033,7 @@ class BudgetListAPIView(View):
     """GET /api/budgets/ — list budgets with spent info."""
 
     @method_decorator(api_login_required)
+    @method_decorator(condition(etag_func=_user_etag))
     def get(self, request):
         user = request.api_user
         budgets = Budget.objects.filter(user=user).select_related("category")
@@ -918,37 +1044,16 @@ class BudgetListAPIView(View):
             try:
                 y, m = map(int, month_param.split("-"))
                 month_date = date(y, m, 1)
-                
-                # Auto carry-forward logic
-                exists = budgets.filter(month__year=y, month__month=m).exists()
-                if not exists:
-                    last_budget = Budget.objects.filter(user=user, month__lt=month_date).order_by("-month").first()
-                    if last_budget:
-                        last_month = last_budget.month
-                        past_budgets = Budget.objects.filter(user=user, month__year=last_month.year, month__month=last_month.month)
-                        for pb in past_budgets:
-                            Budget.objects.create(
-                                user=user,
-                                category=pb.category,
-                                amount=pb.amount,
-                                month=month_date
-                            )
-                
+
+                # Auto carry-forward (normally done ahead of time by the
+                # carry_forward_budgets command; a no-op read if so)
+                carry_forward_budgets(month_date, user_ids=[user.id])
+
                 budgets = budgets.filter(month__year=y, month__month=m)
             except ValueError:
                 pass
 
-        data = []
-        for b in budgets:
-            data.append({
-                "id": b.id,
-                "category": _category_to_dict(b.category),
-                "amount": str(b.amount),
-                "month": b.month.isoformat(),
-                "spent": str(b.get_spent()),
-                "percentage": b.get_percentage(),
-                "is_exceeded": b.is_exceeded(),
-            })
+        data = [_budget_to_dict(b) for b in compute_spent_for(budgets)]
         profile, _ = UserProfile.objects.get_or_create(user=user)
         return JsonResponse({
             "budgets": data,
@@ -985,15 +1090,7 @@ class BudgetListAPIView(View):
             defaults={"amount": amount},
         )
         return JsonResponse({
-            "budget": {
-                "id": budget.id,
-                "category": _category_to_dict(budget.category),
-                "amount": str(budget.amount),
-                "month": budget.month.isoformat(),
-                "spent": str(budget.get_spent()),
-                "percentage": budget.get_percentage(),
-                "is_exceeded": budget.is_exceeded(),
-            }
+            "budget": _budget_to_dict(budget),
         }, status=201 if created else 200)
 
 
@@ -1020,6 +1117,7 @@ class SavingsListAPIView(View):
     """GET /api/savings/ — list savings goals."""
 
     @method_decorator(api_login_required)
+    @method_decorator(condition(etag_func=_user_etag))
     def get(self, request):
         user = request.api_user
         goals = SavingsGoal.objects.filter(user=user)
@@ -1236,11 +1334,40 @@ class SplitGroupListAPIView(View):
             }
         }, status=201)
 
+def _group_membership(user, pk):
+    """The caller's GroupMember row if they may read group ``pk``, else None."""
+    membership = GroupMember.objects.select_related("group").filter(group_id=pk, user=user).first()
+    if membership is None or not (membership.is_accepted or membership.group.created_by_id == user.id):
+        return None
+    return membership
+
+
+def _user_ref(user):
+    """Lightweight user reference for list rows."""
+    return {"id": user.id, "display_name": _display_name(user)}
+
+
+def _group_etag(request, pk):
+    """ETag from the group's version; None (no ETag) for non-members."""
+    version = (
+        GroupMember.objects.filter(group_id=pk, user=request.api_user)
+        .values_list("group__version", flat=True).first()
+    )
+    if version is None:
+        return None
+    return _etag(request.get_full_path(), request.api_user.id, version)
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class SplitGroupDetailAPIView(View):
-    """GET /api/split/groups/<id>/"""
+    """GET /api/split/groups/<id>/ — group summary: members, balances and debts.
+
+    Expense and settlement history are paged separately, see
+    SplitExpenseCreateAPIView.get and SplitSettlementListAPIView.
+    """
 
     @method_decorator(api_login_required)
+    @method_decorator(condition(etag_func=_group_etag))
     def get(self, request, pk):
         user = request.api_user
         try:
@@ -1248,7 +1375,7 @@ class SplitGroupDetailAPIView(View):
         except GroupMember.DoesNotExist:
             return JsonResponse({"error": "Group not found"}, status=404)
             
-        if not membership.is_accepted and membership.group.created_by != user:
+        if not membership.is_accepted and membership.group.created_by_id != user.id:
             return JsonResponse({
                 "error": "Invitation pending",
                 "is_pending": True,
@@ -1260,60 +1387,28 @@ class SplitGroupDetailAPIView(View):
             }, status=403)
             
         group = membership.group
-        
+        user_data = _UserDataMemo(request)
+
         # members
+        members = list(GroupMember.objects.filter(group=group).select_related("user", "user__userprofile"))
         members_data = []
-        for gm in GroupMember.objects.filter(group=group).select_related("user", "user__userprofile"):
-            u_data = get_user_data(request, gm.user)
+        for gm in members:
+            u_data = dict(user_data(gm.user))
             u_data["net_balance"] = str(gm.net_balance)
             members_data.append(u_data)
-            
-        # expenses
-        expenses_data = []
-        for ex in Expense.objects.filter(group=group).select_related("paid_by", "created_by").order_by("-date", "-created_at")[:50]:
-            splits = []
-            for sp in ex.splits.all().select_related("user"):
-                splits.append({
-                    **get_user_data(request, sp.user),
-                    "user_id": sp.user.id,
-                    "amount": str(sp.amount_owed),
-                    "value": str(sp.percentage) if ex.split_type == 'percentage' else str(sp.amount_owed)
-                })
-
-            expenses_data.append({
-                "id": ex.id,
-                "description": ex.description,
-                "amount": str(ex.amount),
-                "paid_by": get_user_data(request, ex.paid_by),
-                "created_by_id": ex.created_by.id if ex.created_by else ex.paid_by.id,
-                "split_type": ex.split_type,
-                "date": ex.date.isoformat(),
-                "splits": splits,
-            })
 
         # simplified debts
-        debts = calculate_simplified_debts(group)
+        debts = calculate_simplified_debts(group, members)
         debts_data = []
         for d in debts:
             debts_data.append({
-                "from_user": get_user_data(request, d["from"])["display_name"],
+                "from_user": user_data(d["from"])["display_name"],
                 "from_user_id": d["from"].id,
-                "to_user": get_user_data(request, d["to"])["display_name"],
+                "to_user": user_data(d["to"])["display_name"],
                 "to_user_id": d["to"].id,
                 "amount": str(d["amount"]),
             })
 
-        # settlements
-        settlements_data = []
-        for s in Settlement.objects.filter(group=group).select_related("paid_by", "paid_to").order_by("-date")[:20]:
-            settlements_data.append({
-                "id": s.id,
-                "paid_by": get_user_data(request, s.paid_by)["display_name"],
-                "paid_to": get_user_data(request, s.paid_to)["display_name"],
-                "amount": str(s.amount),
-                "date": s.date.isoformat(),
-            })
-
         return JsonResponse({
             "group": {
                 "id": group.id,
@@ -1323,9 +1418,7 @@ class SplitGroupDetailAPIView(View):
                 "created_by_id": group.created_by_id,
                 "my_net_balance": str(membership.net_balance),
                 "members": members_data,
-                "recent_expenses": expenses_data,
                 "simplified_debts": debts_data,
-                "settlements": settlements_data,
             }
         })
 
@@ -1374,9 +1467,123 @@ class SplitGroupDetailAPIView(View):
         return JsonResponse({"status": "ok"})
 
 
+class _OperationError(Exception):
+    """Validation failure carrying the HTTP status to report."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def _parse_split_expense(data, user, expense=None):
+    """Validate an expense payload into ``create_expense``/``update_expense`` kwargs.
+
+    When editing, missing fields fall back to ``expense`` and per-member
+    splits are optional. Raises _OperationError.
+    """
+    description = data.get("description", expense.description if expense else "").strip()
+    if expense is None and not description:
+        raise _OperationError("Description is required.")
+
+    try:
+        amount = Decimal(str(data.get("amount", expense.amount if expense else "0")))
+    except (InvalidOperation, ValueError):
+        raise _OperationError("Invalid amount.")
+    if expense is None and amount <= 0:
+        raise _OperationError("Amount must be positive.")
+
+    split_type = data.get("split_type", expense.split_type if expense else "equal")
+    paid_by_user = expense.paid_by if expense else user
+    paid_by_id = data.get("paid_by")
+    if paid_by_id:
+        try:
+            paid_by_user = User.objects.get(id=paid_by_id)
+        except User.DoesNotExist:
+            raise _OperationError("paid_by user not found.", 404)
+
+    # Build splits_data for exact/percentage
+    splits_data = None
+    if split_type in ("exact", "percentage"):
+        raw_splits = data.get("splits", [])
+        if not raw_splits and expense is None:
+            raise _OperationError("Per-member split values are required.")
+        if raw_splits:
+            users = {
+                str(u.id): u
+                for u in User.objects.filter(id__in=[s.get("user_id") for s in raw_splits])
+            }
+            splits_data = []
+            for s in raw_splits:
+                member_user = users.get(str(s.get("user_id")))
+                if member_user is None:
+                    raise _OperationError(f"User {s.get('user_id')} not found.", 404)
+                try:
+                    val_dec = Decimal(str(s.get("value", 0)) or "0")
+                except Exception:
+                    raise _OperationError(f"Invalid value for user {member_user.id}")
+                splits_data.append({"user": member_user, "value": val_dec})
+
+    expense_date = expense.date if expense else None
+    date_str = data.get("date")
+    if date_str:
+        from dateutil.parser import parse as parse_date
+        try:
+            expense_date = parse_date(date_str)
+        except Exception:
+            pass
+
+    return {
+        "paid_by": paid_by_user,
+        "amount": amount,
+        "description": description,
+        "split_type": split_type,
+        "splits_data": splits_data,
+        "date": expense_date,
+    }
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class SplitExpenseCreateAPIView(View):
-    """POST /api/split/groups/<id>/expenses/ — add an expense."""
+    """GET /api/split/groups/<id>/expenses/ — expense history, newest first.
+       POST /api/split/groups/<id>/expenses/ — add an expense."""
+
+    @method_decorator(api_login_required)
+    @method_decorator(condition(etag_func=_group_etag))
+    def get(self, request, pk):
+        user = request.api_user
+        if _group_membership(user, pk) is None:
+            return JsonResponse({"error": "Group not found."}, status=404)
+
+        my_share = ExpenseSplit.objects.filter(expense=OuterRef("pk"), user=user).values("amount_owed")[:1]
+        qs = (
+            Expense.objects.filter(group_id=pk)
+            .select_related("paid_by")
+            .annotate(my_share=Subquery(my_share))
+            .order_by(*DATED_ORDER)
+        )
+        try:
+            expenses, next_cursor = keyset_page(qs, request.GET.get("cursor"), page_size(request))
+        except InvalidCursor as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        return JsonResponse({
+            "expenses": [
+                {
+                    "id": ex.id,
+                    "description": ex.description,
+                    "amount": str(ex.amount),
+                    "split_type": ex.split_type,
+                    "date": ex.date.isoformat(),
+                    "paid_by": _user_ref(ex.paid_by),
+                    "created_by_id": ex.created_by_id or ex.paid_by_id,
+                    # SQLite drops the scale of subquery decimals, so restore it.
+                    "my_share": f"{ex.my_share:.2f}" if ex.my_share is not None else None,
+                }
+                for ex in expenses
+            ],
+            "next_cursor": next_cursor,
+        })
 
     @method_decorator(api_login_required)
     def post(self, request, pk):
@@ -1392,43 +1599,10 @@ class SplitExpenseCreateAPIView(View):
             return JsonResponse({"error": "You must accept the invitation first."}, status=403)
 
         group = membership.group
-        description = data.get("description", "").strip()
-        if not description:
-            return JsonResponse({"error": "Description is required."}, status=400)
-
         try:
-            amount = Decimal(str(data.get("amount", "0")))
-            if amount <= 0:
-                return JsonResponse({"error": "Amount must be positive."}, status=400)
-        except (InvalidOperation, ValueError):
-            return JsonResponse({"error": "Invalid amount."}, status=400)
-
-        split_type = data.get("split_type", "equal")
-        paid_by_id = data.get("paid_by")
-        paid_by_user = user
-        if paid_by_id:
-            try:
-                paid_by_user = User.objects.get(id=paid_by_id)
-            except User.DoesNotExist:
-                return JsonResponse({"error": "paid_by user not found."}, status=404)
-
-        # Build splits_data for exact/percentage
-        splits_data = None
-        if split_type in ("exact", "percentage"):
-            raw_splits = data.get("splits", [])
-            if not raw_splits:
-                return JsonResponse({"error": "Per-member split values are required."}, status=400)
-            splits_data = []
-            for s in raw_splits:
-                try:
-                    member_user = User.objects.get(id=s["user_id"])
-                except User.DoesNotExist:
-                    return JsonResponse({"error": f"User {s.get('user_id')} not found."}, status=404)
-                try:
-                    val_dec = Decimal(str(s.get("value", 0)) or "0")
-                except Exception:
-                    return JsonResponse({"error": f"Invalid value for user {member_user.id}"}, status=400)
-                splits_data.append({"user": member_user, "value": val_dec})
+            args = _parse_split_expense(data, user)
+        except _OperationError as e:
+            return JsonResponse({"error": e.message}, status=e.status)
 
         # De-duplication check
         local_id = data.get("local_id")
@@ -1445,27 +1619,8 @@ class SplitExpenseCreateAPIView(View):
                     "already_existed": True
                 }, status=200)
 
-        date_str = data.get("date")
-        expense_date = None
-        if date_str:
-            from dateutil.parser import parse as parse_date
-            try:
-                expense_date = parse_date(date_str)
-            except Exception:
-                pass
-
         try:
-            expense = create_expense(
-                group=group,
-                paid_by=paid_by_user,
-                created_by=user,
-                amount=amount,
-                description=description,
-                split_type=split_type,
-                splits_data=splits_data,
-                local_id=local_id,
-                date=expense_date
-            )
+            expense = create_expense(group=group, created_by=user, local_id=local_id, **args)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=400)
 
@@ -1527,50 +1682,14 @@ class SplitExpenseDetailAPIView(View):
         if user.id != owner_id:
              return JsonResponse({"error": "Permission denied. You can only edit your own entries."}, status=403)
 
-        description = data.get("description", expense.description).strip()
         try:
-            amount = Decimal(str(data.get("amount", expense.amount)))
-        except (InvalidOperation, ValueError):
-            return JsonResponse({"error": "Invalid amount."}, status=400)
-            
-        split_type = data.get("split_type", expense.split_type)
-        
-        splits_data = None
-        if split_type in ("exact", "percentage"):
-            raw_splits = data.get("splits", [])
-            if raw_splits:
-                splits_data = []
-                for s in raw_splits:
-                    try:
-                        member_user = User.objects.get(id=s["user_id"])
-                        try:
-                            val_dec = Decimal(str(s.get("value", 0)) or "0")
-                        except Exception:
-                            return JsonResponse({"error": f"Invalid value for user {member_user.id}"}, status=400)
-                        splits_data.append({"user": member_user, "value": val_dec})
-                    except User.DoesNotExist:
-                        return JsonResponse({"error": f"User {s.get('user_id')} not found."}, status=404)
-        
-        paid_by_user = expense.paid_by
-        paid_by_id = data.get("paid_by")
-        if paid_by_id:
-            try:
-                paid_by_user = User.objects.get(id=paid_by_id)
-            except User.DoesNotExist:
-                return JsonResponse({"error": "paid_by user not found."}, status=404)
-
-        date_str = data.get("date")
-        expense_date = expense.date
-        if date_str:
-            from dateutil.parser import parse as parse_date
-            try:
-                expense_date = parse_date(date_str)
-            except Exception:
-                pass
+            args = _parse_split_expense(data, user, expense)
+        except _OperationError as e:
+            return JsonResponse({"error": e.message}, status=e.status)
 
         from split_expense.services import update_expense
         try:
-            new_exp = update_expense(expense, paid_by_user, amount, description, split_type, splits_data, date=expense_date)
+            new_exp = update_expense(expense, **args)
             return JsonResponse({
                 "expense": {
                     "id": new_exp.id,
@@ -1599,6 +1718,36 @@ class SplitExpenseDetailAPIView(View):
             return JsonResponse({"error": str(e)}, status=400)
 
 
+class SplitSettlementListAPIView(View):
+    """GET /api/split/groups/<id>/settlements/ — settlement history, newest first."""
+
+    @method_decorator(api_login_required)
+    @method_decorator(condition(etag_func=_group_etag))
+    def get(self, request, pk):
+        if _group_membership(request.api_user, pk) is None:
+            return JsonResponse({"error": "Group not found."}, status=404)
+
+        qs = Settlement.objects.filter(group_id=pk).select_related("paid_by", "paid_to").order_by(*DATED_ORDER)
+        try:
+            settlements, next_cursor = keyset_page(qs, request.GET.get("cursor"), page_size(request))
+        except InvalidCursor as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        return JsonResponse({
+            "settlements": [
+                {
+                    "id": st.id,
+                    "paid_by": _user_ref(st.paid_by),
+                    "paid_to": _user_ref(st.paid_to),
+                    "amount": str(st.amount),
+                    "date": st.date.isoformat(),
+                }
+                for st in settlements
+            ],
+            "next_cursor": next_cursor,
+        })
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class SplitSettleAPIView(View):
     """POST /api/split/groups/<id>/settle/ — settle a debt."""
@@ -1772,25 +1921,18 @@ class SplitReminderAPIView(View):
         push_body_text = f"Just a reminder regarding your balance of {amount}. Please settle up!"
         
         # Try pushing notification first
-        pushed = False
-        from accounts.models import DeviceToken
-        from config.firebase import send_push_notification
+        from config.firebase import push_to_users
         
-        tokens = DeviceToken.objects.filter(user=user_to_remind)
-        if tokens.exists():
-            for dt in tokens:
-                success = send_push_notification(
-                    token=dt.token, 
-                    title=subject, 
-                    body=push_body_text,
-                    data={
-                        "action": "open_split_group",
-                        "group_id": str(group.id),
-                        "group_name": group.name,
-                    }
-                )
-                if success:
-                    pushed = True
+        pushed = bool(push_to_users(
+            [user_to_remind.id],
+            title=subject,
+            body=push_body_text,
+            data={
+                "action": "open_split_group",
+                "group_id": str(group.id),
+                "group_name": group.name,
+            }
+        ))
 
         print(f"[DEBUG FCM API] Push notification successful: {pushed}")
         if not pushed:
@@ -1826,11 +1968,30 @@ class SplitReminderAPIView(View):
         msg = "Push notification sent" if pushed else "Reminder email sent"
         return JsonResponse({"message": f"{msg} to {user_to_remind.username}."})
 
+
+class _UserDataMemo:
+    """``get_user_data`` memoized per user id for the length of one request."""
+
+    def __init__(self, request):
+        self.request = request
+        self._cache = {}
+
+    def __call__(self, user):
+        data = self._cache.get(user.id)
+        if data is None:
+            data = self._cache[user.id] = get_user_data(self.request, user)
+        return data
+
+
+def _display_name(user):
+    return f"{user.first_name} {user.last_name}".strip() or user.username
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 def get_user_data(request, user):
     """Helper to serialize user with full name and avatar."""
     name = f"{user.first_name} {user.last_name}".strip()
-    display_name = name if name else user.username
+    display_name = _display_name(user)
     
     avatar_url = None
     try:
@@ -2065,3 +2226,453 @@ class SplitTokenInviteAPIView(View):
             
         except GroupInvitation.DoesNotExist:
             return JsonResponse({"error": "Invalid or expired invitation token."}, status=404)
+
+
+# ---------------------------------------------------------------------------
+# Delta Sync
+# ---------------------------------------------------------------------------
+
+def _split_expense_to_dict(ex):
+    """Compact Expense serialization for sync (users by id only)."""
+    return {
+        "id": ex.id,
+        "group_id": ex.group_id,
+        "description": ex.description,
+        "amount": str(ex.amount),
+        "paid_by_id": ex.paid_by_id,
+        "created_by_id": ex.created_by_id or ex.paid_by_id,
+        "split_type": ex.split_type,
+        "date": ex.date.isoformat(),
+        "local_id": ex.local_id,
+        "splits": [
+            {
+                "user_id": sp.user_id,
+                "amount": str(sp.amount_owed),
+                "value": str(sp.percentage) if ex.split_type == 'percentage' else str(sp.amount_owed),
+            }
+            for sp in ex.splits.all()
+        ],
+    }
+
+
+def _split_settlement_to_dict(s):
+    return {
+        "id": s.id,
+        "group_id": s.group_id,
+        "paid_by_id": s.paid_by_id,
+        "paid_to_id": s.paid_to_id,
+        "amount": str(s.amount),
+        "date": s.date.isoformat(),
+        "local_id": s.local_id,
+    }
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class SyncAPIView(View):
+    """GET /api/sync/?since=<token> — rows created, updated or deleted since ``token``.
+
+    Omit ``since`` (or send an expired token) to get a full snapshot with
+    ``reset: true``. Store the returned ``token`` and send it next time.
+    The token trails the read by SYNC_TOKEN_OVERLAP_SECONDS, so recent rows
+    and deletions may be repeated between calls; clients should upsert and
+    ignore deletions of rows they no longer have.
+    """
+
+    @method_decorator(api_login_required)
+    def get(self, request):
+        user = request.api_user
+        now = timezone.now()
+        horizon = now - timedelta(days=settings.SYNC_TOMBSTONE_RETENTION_DAYS)
+
+        since = None
+        token = request.GET.get("since", "")
+        if token:
+            try:
+                since = decode_timestamp(token)
+            except InvalidCursor as e:
+                return JsonResponse({"error": str(e)}, status=400)
+            if since < horizon:
+                since = None  # tombstones may be gone; start over
+
+        def changed(qs):
+            return qs if since is None else qs.filter(updated_at__gte=since)
+
+        group_ids = list(
+            GroupMember.objects.filter(user=user)
+            .filter(Q(is_accepted=True) | Q(group__created_by=user))
+            .values_list("group_id", flat=True)
+        )
+
+        profile, _ = UserProfile.objects.get_or_create(user=user)
+        cs = profile.get_currency_symbol()
+
+        txns = list(changed(Transaction.objects.filter(user=user)).select_related("category"))
+        tombstones = []
+        if since is not None:
+            tombstones = list(Tombstone.objects.filter(
+                Q(user_id=user.id) | Q(group_id__in=group_ids) | Q(model="categories", user_id=None),
+                deleted_at__gte=since,
+            ).values_list("model", "object_id", "month"))
+
+        # Budget "spent" depends on expenses, so the months of new and
+        # deleted expenses are resent along with budgets edited directly.
+        # An edited transaction may have left a month we can't see any more
+        # (or changed type), so any edit resends every budget.
+        budgets = Budget.objects.filter(user=user).select_related("category")
+        if since is not None and not any(t.created_at < since for t in txns):
+            touched = {timezone.localdate(t.date).replace(day=1) for t in txns if t.type == "expense"}
+            touched.update(month for model, _, month in tombstones if model == "transactions" and month)
+            budgets = budgets.filter(Q(updated_at__gte=since) | Q(month__in=touched))
+
+        data = {
+            "token": encode_timestamp(now - timedelta(seconds=settings.SYNC_TOKEN_OVERLAP_SECONDS)),
+            "reset": since is None,
+            "currency_symbol": cs,
+            "changed": {
+                "transactions": [_transaction_to_dict(t, cs) for t in txns],
+                "categories": [
+                    _category_to_dict(c)
+                    for c in changed(Category.objects.filter(Q(is_system=True) | Q(user=user)))
+                ],
+                "budgets": [_budget_to_dict(b) for b in compute_spent_for(budgets)],
+                "savings": [
+                    _saving_goal_to_dict(g)
+                    for g in changed(SavingsGoal.objects.filter(user=user)).prefetch_related("history")
+                ],
+                "split_expenses": [
+                    _split_expense_to_dict(ex)
+                    for ex in changed(Expense.objects.filter(group_id__in=group_ids)).prefetch_related("splits")
+                ],
+                "split_settlements": [
+                    _split_settlement_to_dict(st)
+                    for st in changed(Settlement.objects.filter(group_id__in=group_ids))
+                ],
+            },
+            "deleted": {},
+        }
+
+        for model, object_id, _ in tombstones:
+            data["deleted"].setdefault(model, []).append(object_id)
+
+        return JsonResponse(data)
+
+
+# ---------------------------------------------------------------------------
+# Batch writes (offline queue replay)
+# ---------------------------------------------------------------------------
+BATCH_MAX_OPERATIONS = 500
+
+
+def _batch_transaction(user, op):
+    lookup = {"pk": op["id"]} if op.get("id") else {"local_id": op.get("local_id") or None}
+    txn = Transaction.objects.filter(user=user, **lookup).first() if any(lookup.values()) else None
+    if txn is None:
+        raise _OperationError("Transaction not found.", 404)
+    return txn
+
+
+def _batch_update_transaction(user, op):
+    txn = _batch_transaction(user, op)
+    fields, errors = _clean_transaction_data(op.get("data") or {}, user, partial=True)
+    if errors:
+        raise _OperationError(next(iter(errors.values())))
+    for name, value in fields.items():
+        setattr(txn, name, value)
+    txn.save()
+    return {"status": 200, "id": txn.id}
+
+
+def _batch_delete_transaction(user, op):
+    txn = _batch_transaction(user, op)
+    txn_id = txn.id
+    txn.delete()
+    return {"status": 200, "id": txn_id}
+
+
+def _batch_budget(user, op):
+    try:
+        budget = Budget.objects.filter(pk=op.get("id"), user=user).first()
+    except (ValueError, TypeError):
+        budget = None
+    if budget is None:
+        raise _OperationError("Budget not found.", 404)
+    return budget
+
+
+def _batch_save_budget(user, op):
+    """Create (``op: create``, upserting on category and month) or edit the budget ``id``."""
+    data = op.get("data") or {}
+    budget = _batch_budget(user, op) if op["op"] == "update" else None
+
+    category = budget.category if budget else None
+    if budget is None or "category_id" in data:
+        try:
+            category = Category.objects.get(
+                Q(id=data.get("category_id")) & (Q(is_system=True) | Q(user=user))
+            )
+        except (Category.DoesNotExist, ValueError, TypeError):
+            raise _OperationError("Invalid category.")
+    try:
+        amount = Decimal(str(data.get("amount", budget.amount if budget else "0")))
+    except (InvalidOperation, ValueError):
+        raise _OperationError("Invalid amount.")
+
+    month_date = budget.month if budget else timezone.localdate().replace(day=1)
+    if data.get("month"):
+        try:
+            month_date = datetime.strptime(data["month"], "%Y-%m-%d").date().replace(day=1)
+        except (ValueError, TypeError):
+            pass
+
+    if budget is None:
+        budget, created = Budget.objects.update_or_create(
+            user=user, category=category, month=month_date,
+            defaults={"amount": amount},
+        )
+        return {"status": 201 if created else 200, "id": budget.id}
+
+    if Budget.objects.filter(user=user, category=category, month=month_date).exclude(pk=budget.pk).exists():
+        raise _OperationError("A budget for this category and month already exists.")
+    budget.category, budget.amount, budget.month = category, amount, month_date
+    budget.save()
+    return {"status": 200, "id": budget.id}
+
+
+def _batch_delete_budget(user, op):
+    deleted, _ = Budget.objects.filter(pk=op.get("id"), user=user).delete()
+    if not deleted:
+        raise _OperationError("Budget not found.", 404)
+    return {"status": 200, "id": op.get("id")}
+
+
+def _batch_goal(user, op):
+    lookup = {"pk": op["id"]} if op.get("id") else {"local_id": op.get("local_id") or None}
+    goal = SavingsGoal.objects.filter(user=user, **lookup).first() if any(lookup.values()) else None
+    if goal is None:
+        raise _OperationError("Goal not found.", 404)
+    return goal
+
+
+def _batch_save_goal(user, op):
+    """Create (``op: create``) or edit a savings goal; same fields as the savings endpoints."""
+    data = op.get("data") or {}
+    if op["op"] == "create":
+        local_id = op.get("local_id") or data.get("local_id")
+        existing = local_id and SavingsGoal.objects.filter(user=user, local_id=local_id).first()
+        if existing:
+            return {"status": 200, "id": existing.id, "already_existed": True}
+        goal = SavingsGoal(user=user, name="My Goal", local_id=local_id or None)
+        data = {"target_amount": "0", "current_amount": "0", **data}
+    else:
+        goal = _batch_goal(user, op)
+
+    try:
+        for name in ("target_amount", "current_amount"):
+            if name in data:
+                setattr(goal, name, Decimal(str(data[name])))
+    except (InvalidOperation, ValueError):
+        raise _OperationError("Invalid amount.")
+    for name in ("name", "icon", "color"):
+        if name in data:
+            setattr(goal, name, data[name])
+    if data.get("deadline"):
+        try:
+            goal.deadline = datetime.strptime(data["deadline"], "%Y-%m-%d").date()
+        except (ValueError, TypeError):
+            pass
+
+    created = goal.pk is None
+    goal.save()
+    return {"status": 201 if created else 200, "id": goal.id}
+
+
+def _batch_delete_goal(user, op):
+    goal = _batch_goal(user, op)
+    goal_id = goal.id
+    goal.delete()
+    return {"status": 200, "id": goal_id}
+
+
+def _batch_expense(user, op):
+    expense = (
+        Expense.objects.select_related("group", "paid_by")
+        .filter(pk=op.get("id"), group__members=user).first()
+    )
+    if expense is None:
+        raise _OperationError("Expense not found.", 404)
+    if user.id != (expense.created_by_id or expense.paid_by_id):
+        raise _OperationError("Permission denied. You can only edit your own entries.", 403)
+    return expense
+
+
+def _batch_create_expense(user, op):
+    data = op.get("data") or {}
+    membership = (
+        GroupMember.objects.select_related("group")
+        .filter(group_id=op.get("group_id") or data.get("group_id"), user=user).first()
+    )
+    if membership is None:
+        raise _OperationError("Group not found.", 404)
+    if not membership.is_accepted and membership.group.created_by_id != user.id:
+        raise _OperationError("You must accept the invitation first.", 403)
+
+    args = _parse_split_expense(data, user)
+    local_id = op.get("local_id") or data.get("local_id")
+    if local_id:
+        existing = Expense.objects.filter(group=membership.group, local_id=local_id).first()
+        if existing:
+            return {"status": 200, "id": existing.id, "already_existed": True}
+    expense = create_expense(group=membership.group, created_by=user, local_id=local_id, **args)
+    return {"status": 201, "id": expense.id}
+
+
+def _batch_update_expense(user, op):
+    from split_expense.services import update_expense
+
+    expense = _batch_expense(user, op)
+    args = _parse_split_expense(op.get("data") or {}, user, expense)
+    return {"status": 200, "id": update_expense(expense, **args).id}
+
+
+def _batch_delete_expense(user, op):
+    from split_expense.services import delete_expense
+
+    expense = _batch_expense(user, op)
+    expense_id = expense.id
+    delete_expense(expense)
+    return {"status": 200, "id": expense_id}
+
+
+# Reported for unexpected failures, whose text may expose database details.
+BATCH_INTERNAL_ERROR = {"status": 500, "error": "Could not apply this operation."}
+
+BATCH_HANDLERS = {
+    ("update", "transaction"): _batch_update_transaction,
+    ("delete", "transaction"): _batch_delete_transaction,
+    ("create", "budget"): _batch_save_budget,
+    ("update", "budget"): _batch_save_budget,
+    ("delete", "budget"): _batch_delete_budget,
+    ("create", "savings"): _batch_save_goal,
+    ("update", "savings"): _batch_save_goal,
+    ("delete", "savings"): _batch_delete_goal,
+    ("create", "split_expense"): _batch_create_expense,
+    ("update", "split_expense"): _batch_update_expense,
+    ("delete", "split_expense"): _batch_delete_expense,
+}
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class BatchAPIView(View):
+    """POST /api/batch/ — replay an ordered queue of offline writes.
+
+    Body: ``{"operations": [{"op": "create"|"update"|"delete",
+    "type": "transaction"|"budget"|"savings"|"split_expense",
+    "id": ..., "local_id": ..., "group_id": ..., "data": {...}}, ...]}``
+
+    Everything runs in one database transaction, with a savepoint per
+    operation so a failure is reported in ``results`` without undoing the
+    rest. Runs of consecutive transaction creates become one bulk_create.
+    Creates carrying a ``local_id`` that already exists are not repeated; a
+    repeat within the batch reports the first create's outcome.
+    """
+
+    @method_decorator(api_login_required)
+    def post(self, request):
+        user = request.api_user
+        payload = parse_json_body(request)
+        operations = payload.get("operations") if isinstance(payload, dict) else payload
+        if not isinstance(operations, list) or not operations:
+            return JsonResponse({"error": "operations must be a non-empty list."}, status=400)
+        if len(operations) > BATCH_MAX_OPERATIONS:
+            return JsonResponse(
+                {"error": f"At most {BATCH_MAX_OPERATIONS} operations per batch."}, status=400
+            )
+
+        results = [None] * len(operations)
+        pending = []  # (index, Transaction) awaiting bulk_create
+
+        # Local ids of transactions that already exist, looked up once.
+        local_ids = {
+            str((op.get("data") or {}).get("local_id") or op.get("local_id"))
+            for op in operations
+            if isinstance(op, dict) and op.get("op") == "create" and op.get("type") == "transaction"
+        }
+        known = dict(
+            Transaction.objects.filter(user=user, local_id__in=local_ids).values_list("local_id", "id")
+        )
+        first_create = {}  # local_id -> index of its first create in this batch
+
+        with db_transaction.atomic():
+            for index, op in enumerate(operations):
+                if not isinstance(op, dict):
+                    results[index] = {"status": 400, "error": "Invalid operation."}
+                    continue
+                if op.get("op") == "create" and op.get("type") == "transaction":
+                    results[index] = self._queue_transaction(user, op, index, pending, known, first_create)
+                    continue
+
+                self._flush(pending, results)
+                handler = BATCH_HANDLERS.get((op.get("op"), op.get("type")))
+                if handler is None:
+                    results[index] = {"status": 400, "error": "Unsupported operation."}
+                    continue
+                try:
+                    with db_transaction.atomic():
+                        results[index] = handler(user, op)
+                except _OperationError as e:
+                    results[index] = {"status": e.status, "error": e.message}
+                except ValidationError as e:
+                    results[index] = {"status": 400, "error": " ".join(e.messages)}
+                except Exception:
+                    logger.exception("Batch operation %s %s failed", op.get("op"), op.get("type"))
+                    results[index] = dict(BATCH_INTERNAL_ERROR)
+            self._flush(pending, results)
+
+        for index, op in enumerate(operations):
+            result = results[index]
+            if "duplicate_of" in result:
+                # Resolved only now that the first create has been flushed.
+                first = results[result.pop("duplicate_of")]
+                if first["status"] == 201:
+                    result.update(status=200, id=first["id"], already_existed=True)
+                else:
+                    result.update({k: v for k, v in first.items() if k not in ("index", "local_id")})
+            result["index"] = index
+            if isinstance(op, dict) and op.get("local_id"):
+                results[index]["local_id"] = op["local_id"]
+        return JsonResponse({"results": results})
+
+    @staticmethod
+    def _queue_transaction(user, op, index, pending, known, first_create):
+        data = dict(op.get("data") or {})
+        if op.get("local_id"):
+            data.setdefault("local_id", op["local_id"])
+        fields, errors = _clean_transaction_data(data, user)
+        if errors:
+            return {"status": 400, "errors": errors}
+
+        local_id = fields.get("local_id")
+        if local_id in known:
+            return {"status": 200, "id": known[local_id], "already_existed": True}
+        if local_id in first_create:
+            return {"duplicate_of": first_create[local_id]}
+        if local_id:
+            first_create[local_id] = index
+        pending.append((index, Transaction(user=user, **fields)))
+        return None
+
+    @staticmethod
+    def _flush(pending, results):
+        if not pending:
+            return
+        try:
+            with db_transaction.atomic():
+                created = bulk_create_transactions([txn for _, txn in pending])
+        except Exception:
+            logger.exception("Batch transaction create of %d rows failed", len(pending))
+            for index, _ in pending:
+                results[index] = dict(BATCH_INTERNAL_ERROR)
+        else:
+            for (index, _), txn in zip(pending, created):
+                results[index] = {"status": 201, "id": txn.id}
+        pending.clear()
@@ -1,36 +1,137 @@
+"""Push delivery through Firebase Cloud Messaging (FCM).
+
+``send_many`` is the entry point: it sends messages in batches of up to 500
+with ``messaging.send_each``, runs at most ``PUSH_MAX_CONCURRENCY`` batches at
+once, and deletes ``DeviceToken`` rows FCM reports as no longer registered.
+The Firebase app (and with it the messaging client's pooled HTTP session) is
+created once per process and reused by every send.
+
+The backend is chosen by ``settings.PUSH_BACKEND``; ``LocMemBackend`` records
+messages in memory for tests and local development.
+"""
+import logging
 import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
 import firebase_admin
 from firebase_admin import credentials, messaging
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# Hard limit of one FCM batch request.
+FCM_BATCH_LIMIT = 500
+
+PushMessage = namedtuple("PushMessage", "token title body data")
+
+# Per-message outcomes reported by a backend.
+SENT, FAILED, INVALID = "sent", "failed", "invalid"
+
+_app_lock = threading.Lock()
 
 def get_firebase_app():
-    if not firebase_admin._apps:
-        # Look for a service account file
-        cred_path = os.path.join(os.path.dirname(__file__), "firebase-adminsdk.json")
-        if os.path.exists(cred_path):
-            cred = credentials.Certificate(cred_path)
-            return firebase_admin.initialize_app(cred)
-        else:
-            return None
-    return firebase_admin.get_app()
+    with _app_lock:
+        if not firebase_admin._apps:
+            # Look for a service account file
+            cred_path = os.path.join(os.path.dirname(__file__), "firebase-adminsdk.json")
+            if os.path.exists(cred_path):
+                cred = credentials.Certificate(cred_path)
+                return firebase_admin.initialize_app(cred)
+            else:
+                return None
+        return firebase_admin.get_app()
+
+
+class FirebaseBackend:
+    """Sends through FCM's v1 API. Without a service account every message is FAILED."""
+
+    def send_batch(self, messages):
+        app = get_firebase_app()
+        if not app:
+            return [FAILED] * len(messages)
+        try:
+            response = messaging.send_each([
+                messaging.Message(
+                    notification=messaging.Notification(title=m.title, body=m.body),
+                    data=m.data or {},
+                    token=m.token,
+                )
+                for m in messages
+            ], app=app)
+        except Exception:
+            # Transport errors fail the whole batch; callers see it in the outcomes.
+            logger.exception("FCM batch send failed")
+            return [FAILED] * len(messages)
+        return [self._outcome(r) for r in response.responses]
+
+    @staticmethod
+    def _outcome(response):
+        if response.success:
+            return SENT
+        if isinstance(response.exception, (messaging.UnregisteredError, messaging.SenderIdMismatchError)):
+            return INVALID
+        return FAILED
+
+
+class LocMemBackend:
+    """Keeps sent messages in ``outbox``; tokens in ``invalid_tokens`` are reported
+    unregistered and tokens in ``failing_tokens`` fail."""
+    outbox = []
+    invalid_tokens = set()
+    failing_tokens = set()
+
+    def send_batch(self, messages):
+        results = []
+        for m in messages:
+            if m.token in self.invalid_tokens:
+                results.append(INVALID)
+            elif m.token in self.failing_tokens:
+                results.append(FAILED)
+            else:
+                self.outbox.append(m)
+                results.append(SENT)
+        return results
+
+
+def get_backend():
+    return import_string(settings.PUSH_BACKEND)()
+
+
+def send_many(messages):
+    """Send ``PushMessage``s; returns one outcome (SENT/FAILED/INVALID) per message, in order."""
+    messages = list(messages)
+    if not messages:
+        return []
+    backend = get_backend()
+    size = min(settings.PUSH_BATCH_SIZE, FCM_BATCH_LIMIT)
+    batches = [messages[i:i + size] for i in range(0, len(messages), size)]
+    if len(batches) == 1:
+        results = backend.send_batch(batches[0])
+    else:
+        with ThreadPoolExecutor(max_workers=settings.PUSH_MAX_CONCURRENCY) as pool:
+            results = [r for batch in pool.map(backend.send_batch, batches) for r in batch]
+
+    invalid = {m.token for m, r in zip(messages, results) if r == INVALID}
+    if invalid:
+        from accounts.models import DeviceToken
+        DeviceToken.objects.filter(token__in=invalid).delete()
+    return results
+
+
+def push_to_users(user_ids, title, body, data=None):
+    """Send one notification to every device of ``user_ids`` (one token query).
+
+    Returns the set of user ids reached on at least one device, so callers can
+    fall back to email for the rest.
+    """
+    from accounts.models import DeviceToken
+    tokens = list(DeviceToken.objects.filter(user_id__in=user_ids).values_list("user_id", "token"))
+    results = send_many(PushMessage(token, title, body, data) for _, token in tokens)
+    return {user_id for (user_id, _), result in zip(tokens, results) if result == SENT}
+
 
 def send_push_notification(token, title, body, data=None):
-    app = get_firebase_app()
-    if not app:
-        print("[DEBUG FCM] No firebase-adminsdk.json found, skipping push.")
-        return False
-        
-    try:
-        message = messaging.Message(
-            notification=messaging.Notification(
-                title=title,
-                body=body,
-            ),
-            data=data or {},
-            token=token,
-        )
-        response = messaging.send(message)
-        print(f"[DEBUG FCM] Successfully sent message: {response}")
-        return True
-    except Exception as e:
-        print(f"[DEBUG FCM] Failed to send push: {e}")
-        return False
+    return send_many([PushMessage(token, title, body, data)]) == [SENT]
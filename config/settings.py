@@ -59,6 +59,7 @@ INSTALLED_APPS = [
 # ---------------------------------------------------------------------------
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "api.middleware.APICompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -104,12 +105,28 @@ DATABASES = {
 ENABLE_CACHING = os.environ.get("ENABLE_CACHING", "False").lower() in ("true", "1", "yes")
 
 if ENABLE_CACHING:
+    # Per-process LRU in front of the shared DatabaseCache. The cache table
+    # lives in its own SQLite file (see core.routers.CacheRouter); create it
+    # with ``manage.py createcachetable --database cache``.
+    DATABASES["cache"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "cache.sqlite3",
+    }
     CACHES = {
         "default": {
+            "BACKEND": "core.cache_backends.TieredCache",
+            "TIMEOUT": 1800,  # 30 minutes default
+            "OPTIONS": {
+                "L2": "shared",
+                "MAX_ENTRIES": 5000,  # L1 entries per process
+                "L1_TIMEOUT": 60,  # seconds another process's write can go unseen
+            },
+        },
+        "shared": {
             "BACKEND": "django.core.cache.backends.db.DatabaseCache",
             "LOCATION": "montra_cache_table",
-            "TIMEOUT": 1800,  # 30 minutes default
-        }
+            "TIMEOUT": 1800,
+        },
     }
 else:
     CACHES = {
@@ -118,6 +135,8 @@ else:
         }
     }
 
+DATABASE_ROUTERS = ["core.routers.CacheRouter"]
+
 # ---------------------------------------------------------------------------
 # Auth
 # ---------------------------------------------------------------------------
@@ -132,6 +151,9 @@ LOGIN_URL = "/accounts/login/"
 LOGIN_REDIRECT_URL = "/"
 LOGOUT_REDIRECT_URL = "/accounts/login/"
 
+# API bearer tokens: minimum gap between writes of APIToken.last_used.
+API_TOKEN_TOUCH_INTERVAL = 300
+
 # ---------------------------------------------------------------------------
 # Email
 # ---------------------------------------------------------------------------
@@ -167,6 +189,55 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# ---------------------------------------------------------------------------
+# Report exports
+# ---------------------------------------------------------------------------
+# Threads per process rendering PDF exports; 0 leaves jobs for the
+# process_report_exports command.
+REPORT_EXPORT_WORKERS = int(os.environ.get("REPORT_EXPORT_WORKERS", "2"))
+# Seconds a running export may take before it is presumed dead (its thread or
+# process went away) and marked failed, so a fresh one can be queued.
+REPORT_EXPORT_TIMEOUT = int(os.environ.get("REPORT_EXPORT_TIMEOUT", "300"))
+
+# ---------------------------------------------------------------------------
+# Scheduled jobs (core.scheduler)
+# ---------------------------------------------------------------------------
+# Run the scheduler thread in web processes (the WSGI/ASGI entry points and
+# runserver; never other management commands). Jobs are leased through the
+# database, so any number of processes may run it; set to False to run
+# ``manage.py run_scheduler`` as a separate process instead.
+SCHEDULER_AUTOSTART = os.environ.get("SCHEDULER_AUTOSTART", "True").lower() in ("true", "1", "yes")
+
+# ---------------------------------------------------------------------------
+# Push notifications
+# ---------------------------------------------------------------------------
+# Threads per process draining the push outbox after commit; 0 leaves rows
+# for the process_push_outbox command.
+PUSH_OUTBOX_WORKERS = int(os.environ.get("PUSH_OUTBOX_WORKERS", "2"))
+# Deliveries per outbox row before it is marked failed, and seconds after
+# which a row claimed by a drainer that never finished may be claimed again.
+PUSH_MAX_ATTEMPTS = int(os.environ.get("PUSH_MAX_ATTEMPTS", "5"))
+PUSH_CLAIM_TIMEOUT = int(os.environ.get("PUSH_CLAIM_TIMEOUT", "600"))
+# Delivery backend used by config.firebase.send_many; LocMemBackend keeps
+# messages in memory for tests and local development.
+PUSH_BACKEND = os.environ.get("PUSH_BACKEND", "config.firebase.FirebaseBackend")
+# Messages per FCM batch request (FCM allows at most 500) and batches in flight.
+PUSH_BATCH_SIZE = int(os.environ.get("PUSH_BATCH_SIZE", "500"))
+PUSH_MAX_CONCURRENCY = int(os.environ.get("PUSH_MAX_CONCURRENCY", "2"))
+# Daily reminders: users per chunk and chunks sent concurrently.
+REMINDER_CHUNK_SIZE = int(os.environ.get("REMINDER_CHUNK_SIZE", "500"))
+REMINDER_WORKERS = int(os.environ.get("REMINDER_WORKERS", "4"))
+
+# ---------------------------------------------------------------------------
+# Mobile delta sync
+# ---------------------------------------------------------------------------
+# Deletion records older than this are pruned; clients whose sync token is
+# older get a full snapshot instead of a delta.
+SYNC_TOMBSTONE_RETENTION_DAYS = 90
+# The returned sync token is backed off by this much, so rows committed just
+# after a sync read but stamped before it are picked up by the next one.
+SYNC_TOKEN_OVERLAP_SECONDS = 30
+
 # ---------------------------------------------------------------------------
 # Pagination
 # ---------------------------------------------------------------------------
@@ -12,5 +12,7 @@ import os
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Lets CoreConfig start the job scheduler in web processes only.
+os.environ["ESPERE_WEB_PROCESS"] = "1"
 
 application = get_wsgi_application()
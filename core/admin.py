@@ -1,3 +1,8 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import ScheduledJob
+
+@admin.register(ScheduledJob)
+class ScheduledJobAdmin(admin.ModelAdmin):
+    list_display = ("name", "schedule", "next_run_at", "last_finished_at", "last_duration", "run_count", "failure_count", "lease_owner")
+    readonly_fields = ("lease_owner", "lease_expires_at", "run_count", "failure_count", "total_duration")
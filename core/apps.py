@@ -1,6 +1,34 @@
+import os
+import sys
+
 from django.apps import AppConfig
+from django.conf import settings
 
+# Set by config/wsgi.py and config/asgi.py before Django is set up.
+WEB_PROCESS_ENV = "ESPERE_WEB_PROCESS"
 
 class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "core"
+
+    def ready(self):
+        import core.signals  # noqa: F401
+
+        if settings.SCHEDULER_AUTOSTART and self._is_server():
+            from .scheduler import scheduler
+            scheduler.start()
+
+    @staticmethod
+    def _is_server():
+        """True only for a WSGI/ASGI entry point or the serving runserver process.
+
+        Anything else (migrate, test, shell, other commands and scripts)
+        never starts the scheduler; ``run_scheduler`` runs jobs explicitly.
+        """
+        if os.environ.get(WEB_PROCESS_ENV) == "1":
+            return True
+        args = sys.argv[1:2]
+        if os.path.basename(sys.argv[0]) in ("manage.py", "django-admin") and args == ["runserver"]:
+            # The autoreloader parent only watches files; its child serves.
+            return os.environ.get("RUN_MAIN") == "true" or "--noreload" in sys.argv
+        return False
@@ -0,0 +1,142 @@
+"""Two-tier cache backend: a per-process LRU (L1) in front of a shared cache (L2).
+
+Configured in ``settings.CACHES``::
+
+    "default": {
+        "BACKEND": "core.cache_backends.TieredCache",
+        "TIMEOUT": 1800,
+        "OPTIONS": {"L2": "shared", "MAX_ENTRIES": 5000, "L1_TIMEOUT": 60},
+    }
+
+Reads are served from L1 when possible and fall through to the L2 alias;
+writes go to both. Another process's writes only reach this L1 once its
+copy expires (at most ``L1_TIMEOUT`` seconds), which is why per-user data
+is cached under versioned keys (``core.utils.cache.user_cache_key``): a
+write moves the user to keys no process has cached yet.
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import BaseCache, DEFAULT_TIMEOUT
+
+_MISSING = object()
+
+
+class TieredCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._l2_alias = options.get("L2", "shared")
+        self._l1_timeout = options.get("L1_TIMEOUT", 60)
+        self._l1 = OrderedDict()  # made key -> (pickled value, expires at)
+        self._lock = threading.Lock()
+        self.l1_hits = self.l2_hits = self.misses = 0
+
+    @property
+    def l2(self):
+        return caches[self._l2_alias]
+
+    # -- L1 ------------------------------------------------------------------
+    def _l1_get(self, key):
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[1] <= time.monotonic():
+                del self._l1[key]
+                return _MISSING
+            self._l1.move_to_end(key)
+            self.l1_hits += 1
+        return pickle.loads(entry[0])
+
+    def _l1_set(self, key, value, timeout):
+        ttl = self._l1_timeout if timeout is None else min(timeout, self._l1_timeout)
+        if ttl <= 0:
+            self._l1_evict(key)
+            return
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._l1[key] = (pickled, time.monotonic() + ttl)
+            self._l1.move_to_end(key)
+            while len(self._l1) > self._max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_evict(self, key):
+        with self._lock:
+            self._l1.pop(key, None)
+
+    def evict_prefix(self, prefix, version=None):
+        """Drop this process's L1 entries whose key starts with ``prefix``.
+
+        Matches the made keys, so it relies on the default KEY_FUNCTION
+        (``prefix:version:key``).
+        """
+        made = self.make_key(prefix, version=version)
+        with self._lock:
+            for key in [k for k in self._l1 if k.startswith(made)]:
+                del self._l1[key]
+
+    def stats(self):
+        """Hit/miss counters for this process."""
+        return {
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "l1_entries": len(self._l1),
+        }
+
+    # -- Cache API -----------------------------------------------------------
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def get(self, key, default=None, version=None):
+        made = self.make_and_validate_key(key, version=version)
+        value = self._l1_get(made)
+        if value is not _MISSING:
+            return value
+        value = self.l2.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self.l2_hits += 1
+        self._l1_set(made, value, self._l1_timeout)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        self.l2.set(key, value, timeout, version=version)
+        self._l1_set(made, value, timeout)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made = self.make_and_validate_key(key, version=version)
+        timeout = self._timeout(timeout)
+        if not self.l2.add(key, value, timeout, version=version):
+            return False
+        self._l1_set(made, value, timeout)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        self._l1_evict(self.make_and_validate_key(key, version=version))
+        return self.l2.touch(key, self._timeout(timeout), version=version)
+
+    def delete(self, key, version=None):
+        self._l1_evict(self.make_and_validate_key(key, version=version))
+        return self.l2.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        if self._l1_get(self.make_and_validate_key(key, version=version)) is not _MISSING:
+            return True
+        return self.l2.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._l1_evict(self.make_and_validate_key(key, version=version))
+        return self.l2.incr(key, delta, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._l1.clear()
+        self.l2.clear()
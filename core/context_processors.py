@@ -1,11 +1,14 @@
 """
 Core context processors — inject global data into every template.
 """
+from django.utils.functional import SimpleLazyObject
+
 from accounts.models import UserProfile
+from core.utils.cache import get_data_version
 
 
 def global_context(request):
-    """Provide theme and currency to all templates."""
+    """Provide theme, currency and the cache data version to all templates."""
     ctx = {
         "current_currency": "USD",
         "currency_symbol": "$",
@@ -19,4 +22,6 @@ def global_context(request):
         ctx["current_currency"] = profile.currency
         ctx["currency_symbol"] = profile.get_currency_symbol()
         ctx["theme"] = profile.theme
+        # Only looked up by templates that vary a {% cache %} block on it.
+        ctx["data_version"] = SimpleLazyObject(lambda: get_data_version(request.user.id))
     return ctx
@@ -0,0 +1,35 @@
+"""Run scheduled jobs in a dedicated process (use when SCHEDULER_AUTOSTART is off)."""
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import ScheduledJob
+from core.scheduler import scheduler
+
+
+class Command(BaseCommand):
+    help = "Run registered scheduled jobs as they come due"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once", action="store_true",
+            help="Run the jobs that are due now and exit instead of looping.",
+        )
+        parser.add_argument("--list", action="store_true", help="Show each job's schedule and timings.")
+
+    def handle(self, *args, **options):
+        if options["list"]:
+            scheduler.sync()
+            for job in ScheduledJob.objects.filter(name__in=scheduler.jobs).order_by("name"):
+                average = f"{job.average_duration:.2f}s" if job.average_duration is not None else "-"
+                self.stdout.write(
+                    f"{job.name:<24} {job.schedule:<16} next {timezone.localtime(job.next_run_at):%Y-%m-%d %H:%M}  "
+                    f"runs {job.run_count} (failed {job.failure_count}, skipped {job.skip_count}), avg {average}"
+                )
+                if job.last_error:
+                    self.stdout.write(f"  last error: {job.last_error}")
+            return
+        if options["once"]:
+            ran = scheduler.run_pending()
+            self.stdout.write(self.style.SUCCESS(f"Ran {len(ran)} job(s): {', '.join(ran) or 'none due'}."))
+            return
+        scheduler.loop(on_error=lambda error: self.stderr.write(f"Scheduler tick failed: {error}"))
@@ -0,0 +1,43 @@
+# Generated by Django 6.1.2 on 2026-10-17 00:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("model", models.CharField(max_length=30)),
+                ("object_id", models.PositiveBigIntegerField()),
+                ("user_id", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("group_id", models.PositiveBigIntegerField(blank=True, null=True)),
+                ("deleted_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user_id", "deleted_at"],
+                        name="core_tombst_user_id_868f13_idx",
+                    ),
+                    models.Index(
+                        fields=["group_id", "deleted_at"],
+                        name="core_tombst_group_i_a9b832_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
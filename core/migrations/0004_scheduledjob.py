@@ -0,0 +1,41 @@
+# Generated by Django 6.1.2 on 2026-10-17 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0003_dataversion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ScheduledJob",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                ("schedule", models.CharField(max_length=100)),
+                ("next_run_at", models.DateTimeField()),
+                (
+                    "lease_owner",
+                    models.CharField(blank=True, default="", max_length=255),
+                ),
+                ("lease_expires_at", models.DateTimeField(blank=True, null=True)),
+                ("last_started_at", models.DateTimeField(blank=True, null=True)),
+                ("last_finished_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "last_duration",
+                    models.FloatField(blank=True, help_text="Seconds", null=True),
+                ),
+                ("last_error", models.TextField(blank=True, default="")),
+                ("run_count", models.PositiveIntegerField(default=0)),
+                ("failure_count", models.PositiveIntegerField(default=0)),
+                (
+                    "total_duration",
+                    models.FloatField(default=0, help_text="Seconds, across all runs"),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.1.2 on 2026-10-17 01:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0004_scheduledjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="scheduledjob",
+            name="last_skipped_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name="scheduledjob",
+            name="skip_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-17 01:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0005_scheduledjob_skips"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tombstone",
+            name="month",
+            field=models.DateField(blank=True, null=True),
+        ),
+    ]
@@ -15,3 +15,74 @@ class ContactMessage(models.Model):
 
     def __str__(self):
         return f"{self.get_type_display()} from {self.name}"
+
+
+class Tombstone(models.Model):
+    """Record of a deleted row, so delta sync can tell clients to drop it.
+
+    Owner references are plain ids rather than foreign keys: tombstones are
+    written while a user or group is being cascade-deleted and must outlive
+    it. Old rows are removed by the ``prune_tombstones`` command.
+    """
+    model = models.CharField(max_length=30)
+    object_id = models.PositiveBigIntegerField()
+    user_id = models.PositiveBigIntegerField(null=True, blank=True)
+    group_id = models.PositiveBigIntegerField(null=True, blank=True)
+    # First day of a deleted expense's month, whose budget spend changed.
+    month = models.DateField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["user_id", "deleted_at"]),
+            models.Index(fields=["group_id", "deleted_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id} deleted"
+
+
+class DataVersion(models.Model):
+    """Per-user counter bumped whenever data the user sees changes.
+
+    Cache keys fold the version in (see ``core.utils.cache``), so a write
+    invalidates everything cached for the user without deleting any keys.
+    Keyed by plain user id, like Tombstone, because bumps also happen while
+    a user is being cascade-deleted.
+    """
+    user_id = models.PositiveBigIntegerField(primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id} v{self.version}"
+
+
+class ScheduledJob(models.Model):
+    """State of one job registered with ``core.scheduler``.
+
+    The row is also the job's lease: a process claims a due run by setting
+    ``lease_owner``/``lease_expires_at`` in a conditional UPDATE, so only one
+    process runs it. A lease left behind by a crashed process expires.
+    """
+    name = models.CharField(max_length=100, primary_key=True)
+    schedule = models.CharField(max_length=100)
+    next_run_at = models.DateTimeField()
+    lease_owner = models.CharField(max_length=255, blank=True, default="")
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    last_started_at = models.DateTimeField(null=True, blank=True)
+    last_finished_at = models.DateTimeField(null=True, blank=True)
+    last_duration = models.FloatField(null=True, blank=True, help_text="Seconds")
+    last_error = models.TextField(blank=True, default="")
+    run_count = models.PositiveIntegerField(default=0)
+    failure_count = models.PositiveIntegerField(default=0)
+    # Runs dropped for being later than the job's grace period.
+    skip_count = models.PositiveIntegerField(default=0)
+    last_skipped_at = models.DateTimeField(null=True, blank=True)
+    total_duration = models.FloatField(default=0, help_text="Seconds, across all runs")
+
+    @property
+    def average_duration(self):
+        return self.total_duration / self.run_count if self.run_count else None
+
+    def __str__(self):
+        return f"{self.name} ({self.schedule})"
@@ -0,0 +1,29 @@
+"""Database routers."""
+from django.conf import settings
+
+
+class CacheRouter:
+    """Keep the DatabaseCache table in the ``cache`` database when one is configured.
+
+    A separate SQLite file means cache reads and writes never queue behind
+    transaction writes for the app database's lock.
+    """
+    app_label = "django_cache"
+
+    def _cache_db(self, model):
+        if model._meta.app_label == self.app_label and "cache" in settings.DATABASES:
+            return "cache"
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._cache_db(model)
+
+    def db_for_write(self, model, **hints):
+        return self._cache_db(model)
+
+    def allow_migrate(self, db, app_label, **hints):
+        if app_label == self.app_label and "cache" in settings.DATABASES:
+            return db == "cache"
+        if db == "cache":
+            return False
+        return None
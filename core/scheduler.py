@@ -0,0 +1,286 @@
+"""In-process job scheduler with cron-style schedules.
+
+Apps register jobs from their ``AppConfig.ready``::
+
+    from core.scheduler import scheduler
+
+    scheduler.register("daily_reminders", "0 10,22 * * *", send_reminders,
+                       grace=timedelta(hours=2))
+
+Every web process may run the scheduler thread, but each job's
+``ScheduledJob`` row doubles as a lease: a process only runs a due job after
+a conditional UPDATE claims it, so exactly one process runs each occurrence.
+The lease is renewed while the job runs and the run is only recorded by
+the process still holding it.
+A run that was missed while no process was up is caught up once (several
+missed occurrences collapse into one), unless it is older than the job's
+``grace``. Run, failure and skip counts and timings are kept on the row.
+
+Schedules are five-field cron expressions (minute hour day month weekday,
+weekday 0 = Sunday) evaluated in the local TIME_ZONE. Fields accept ``*``,
+numbers, ``a-b`` ranges, ``,`` lists and ``/n`` steps.
+"""
+import os
+import socket
+import threading
+import time
+from datetime import timedelta
+
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import ScheduledJob
+
+_FIELD_RANGES = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 6)]
+
+
+def _parse_field(field, low, high):
+    values = set()
+    for part in field.split(","):
+        part, _, step = part.partition("/")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = map(int, part.split("-"))
+        else:
+            start = end = int(part)
+            if step:
+                end = high
+        if not (low <= start <= end <= high):
+            raise ValueError(f"Cron field '{field}' is out of range {low}-{high}.")
+        values.update(range(start, end + 1, int(step) if step else 1))
+    return values
+
+
+class CronSchedule:
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression '{expression}' needs 5 fields.")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(f, low, high) for f, (low, high) in zip(fields, _FIELD_RANGES)
+        )
+        # Like cron, a restricted day-of-month and day-of-week match either.
+        self._any_day, self._any_weekday = fields[2] == "*", fields[4] == "*"
+
+    def _day_matches(self, dt):
+        day = dt.day in self.days
+        weekday = (dt.isoweekday() % 7) in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day and weekday
+        return day or weekday
+
+    def next_after(self, after):
+        """First matching minute strictly after ``after`` (aware datetime)."""
+        dt = timezone.localtime(after).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = dt + timedelta(days=366 * 5)
+        while dt < limit:
+            if dt.month not in self.months or not self._day_matches(dt):
+                dt = (dt + timedelta(days=1)).replace(hour=0, minute=0)
+            elif dt.hour not in self.hours:
+                dt = (dt + timedelta(hours=1)).replace(minute=0)
+            elif dt.minute not in self.minutes:
+                dt += timedelta(minutes=1)
+            else:
+                # Re-localize so a DST change on the way is reflected in the offset.
+                return timezone.localtime(dt)
+        raise ValueError(f"Cron expression '{self.expression}' never matches.")
+
+
+class Job:
+    def __init__(self, name, schedule, func, grace=None, lease=timedelta(minutes=30)):
+        self.name = name
+        self.schedule = CronSchedule(schedule)
+        self.func = func
+        self.grace = grace
+        self.lease = lease
+
+
+class _Heartbeat:
+    """Renews a running job's lease every third of its length, in a thread."""
+
+    def __init__(self, scheduler, job):
+        self.scheduler, self.job = scheduler, job
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"lease:{job.name}", daemon=True)
+
+    def _beat(self):
+        interval = self.job.lease.total_seconds() / 3
+        try:
+            while not self._stop.wait(interval):
+                try:
+                    renewed = self.scheduler._renew(self.job)
+                except Exception:
+                    continue  # try again next beat; the lease has slack
+                if not renewed:
+                    self.lost = True
+                    return
+        finally:
+            connection.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+class Scheduler:
+    def __init__(self):
+        self.jobs = {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._synced = False
+        self._thread = None
+        self.last_tick_error = ""
+
+    def register(self, name, schedule, func, **options):
+        """Run ``func()`` on the cron ``schedule``; see ``Job`` for the options."""
+        self.jobs[name] = Job(name, schedule, func, **options)
+        self._synced = False
+
+    def sync(self, now=None):
+        """Create rows for new jobs and reschedule jobs whose schedule changed."""
+        now = now or timezone.now()
+        jobs = list(self.jobs.values())
+        rows = {row.name: row for row in ScheduledJob.objects.filter(name__in=[job.name for job in jobs])}
+        for job in jobs:
+            row = rows.get(job.name)
+            if row is None:
+                ScheduledJob.objects.get_or_create(
+                    name=job.name,
+                    defaults={"schedule": job.schedule.expression, "next_run_at": job.schedule.next_after(now)},
+                )
+            elif row.schedule != job.schedule.expression:
+                ScheduledJob.objects.filter(name=job.name).update(
+                    schedule=job.schedule.expression, next_run_at=job.schedule.next_after(now)
+                )
+        self._synced = True
+
+    def _acquire(self, job, now):
+        """Take the job's lease if it is due and nobody holds it."""
+        return ScheduledJob.objects.filter(
+            Q(lease_expires_at__isnull=True) | Q(lease_expires_at__lte=now),
+            name=job.name, next_run_at__lte=now,
+        ).update(lease_owner=self.owner, lease_expires_at=now + job.lease)
+
+    def _renew(self, job):
+        """Extend our lease on ``job``; False if another process holds it now."""
+        return bool(ScheduledJob.objects.filter(name=job.name, lease_owner=self.owner).update(
+            lease_expires_at=timezone.now() + job.lease
+        ))
+
+    def run_job(self, job, now):
+        """Run a leased job and schedule its next occurrence.
+
+        The lease is renewed by a heartbeat while the job runs. A run that
+        outlasts its lease or loses it anyway is recorded as failed, and a
+        run that lost its lease leaves the schedule to the new holder.
+        Returns False if the run was skipped for being later than ``grace``.
+        """
+        row = ScheduledJob.objects.get(name=job.name)
+        if job.grace is not None and now - row.next_run_at > job.grace:
+            ScheduledJob.objects.filter(name=job.name, lease_owner=self.owner).update(
+                next_run_at=job.schedule.next_after(now),
+                skip_count=F("skip_count") + 1,
+                last_skipped_at=row.next_run_at,
+                lease_owner="",
+                lease_expires_at=None,
+            )
+            return False
+
+        started = time.monotonic()
+        error = ""
+        with _Heartbeat(self, job) as heartbeat:
+            try:
+                job.func()
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        duration = time.monotonic() - started
+        finished = timezone.now()
+        if heartbeat.lost:
+            error = error or "Lost the lease to another process while running."
+        elif duration > job.lease.total_seconds():
+            error = error or f"Ran {duration:.0f}s, longer than its {job.lease.total_seconds():.0f}s lease."
+
+        metrics = dict(
+            last_started_at=finished - timedelta(seconds=duration),
+            last_finished_at=finished,
+            last_duration=duration,
+            last_error=error,
+            run_count=F("run_count") + 1,
+            failure_count=F("failure_count") + (1 if error else 0),
+            total_duration=F("total_duration") + duration,
+        )
+        released = ScheduledJob.objects.filter(name=job.name, lease_owner=self.owner).update(
+            # The next occurrence after this run ends (runs never overlap).
+            next_run_at=job.schedule.next_after(now + timedelta(seconds=duration)),
+            lease_owner="",
+            lease_expires_at=None,
+            **metrics,
+        )
+        if not released:
+            metrics["last_error"] = error or "Lost the lease to another process while running."
+            metrics["failure_count"] = F("failure_count") + 1
+            ScheduledJob.objects.filter(name=job.name).update(**metrics)
+        return True
+
+    def run_pending(self, now=None):
+        """Run every job that is due and not leased elsewhere; returns their names."""
+        now = now or timezone.now()
+        if not self._synced:
+            self.sync(now)
+        ran = []
+        # Apps may still be registering jobs while the thread starts up.
+        for job in list(self.jobs.values()):
+            if self._acquire(job, now) and self.run_job(job, now):
+                ran.append(job.name)
+        return ran
+
+    def seconds_until_due(self, now=None, cap=60):
+        """How long the loop may sleep: until the next job is due, at most ``cap``.
+
+        A job leased by another process is not due again before its lease
+        expires.
+        """
+        now = now or timezone.now()
+        wake = [
+            lease_expires_at if lease_expires_at and lease_expires_at > now else next_run_at
+            for next_run_at, lease_expires_at in ScheduledJob.objects.filter(
+                name__in=list(self.jobs)
+            ).values_list("next_run_at", "lease_expires_at")
+        ]
+        if not wake:
+            return cap
+        return min(max((min(wake) - now).total_seconds(), 1), cap)
+
+    def loop(self, on_error=None):
+        """Tick forever. A failing tick (e.g. the database is down) is kept in
+        ``last_tick_error``, passed to ``on_error`` and retried a minute later."""
+        while True:
+            close_old_connections()
+            try:
+                self.run_pending()
+                delay = self.seconds_until_due()
+                self.last_tick_error = ""
+            except Exception as e:
+                self.last_tick_error = f"{type(e).__name__}: {e}"
+                if on_error is not None:
+                    on_error(self.last_tick_error)
+                delay = 60
+            finally:
+                close_old_connections()
+            time.sleep(delay)
+
+    def start(self):
+        """Run the loop in a daemon thread (once per process)."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self.loop, name="scheduler", daemon=True)
+            self._thread.start()
+
+
+scheduler = Scheduler()
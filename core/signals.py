@@ -0,0 +1,73 @@
+"""Signals that record deletions for the mobile delta sync and track split-ledger versions."""
+from django.db.models import F
+from django.db.models.signals import pre_save, pre_delete, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.utils.cache import invalidate_user_cache, bump_group_versions
+from split_expense.models import Group, Expense, Settlement, GroupMember
+from transactions.models import Transaction, Category, Budget, SavingsGoal
+from .models import Tombstone
+
+
+# Model -> key used in the sync payload.
+SYNC_MODELS = {
+    Transaction: "transactions",
+    Category: "categories",
+    Budget: "budgets",
+    SavingsGoal: "savings",
+    Expense: "split_expenses",
+    Settlement: "split_settlements",
+}
+
+
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Budget)
+@receiver(post_delete, sender=SavingsGoal)
+@receiver(post_delete, sender=Expense)
+@receiver(post_delete, sender=Settlement)
+def record_tombstone(sender, instance, **kwargs):
+    month = None
+    if sender is Transaction and instance.type == "expense":
+        month = timezone.localdate(instance.date).replace(day=1)
+    Tombstone.objects.create(
+        model=SYNC_MODELS[sender],
+        object_id=instance.pk,
+        user_id=getattr(instance, "user_id", None),
+        group_id=getattr(instance, "group_id", None),
+        month=month,
+    )
+
+
+@receiver(pre_delete, sender=Category)
+def touch_detached_transactions(sender, instance, **kwargs):
+    """SET_NULL bypasses save(), so bump the transactions it is about to detach."""
+    Transaction.objects.filter(category=instance).update(updated_at=timezone.now())
+
+
+@receiver([post_save, post_delete], sender=GroupMember)
+def invalidate_cache_on_ledger_change(sender, instance, **kwargs):
+    """A member's balances changed, so move them to a new data version."""
+    invalidate_user_cache(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=GroupMember)
+@receiver([post_save, post_delete], sender=Expense)
+@receiver([post_save, post_delete], sender=Settlement)
+def bump_group_version(sender, instance, **kwargs):
+    bump_group_versions(pk=instance.group_id)
+
+
+@receiver(pre_save, sender=Group)
+def bump_version_on_group_save(sender, instance, update_fields=None, **kwargs):
+    """A full save writes ``version`` back, so bump it in that same UPDATE
+    instead of after it, where a stale in-memory value could roll it back."""
+    if not instance._state.adding and update_fields is None:
+        instance.version = F("version") + 1
+
+
+@receiver(post_save, sender=Group)
+def bump_version_on_partial_group_save(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "version" not in update_fields:
+        bump_group_versions(pk=instance.pk)
@@ -1,3 +1,134 @@
-from django.test import TestCase
+import os
 
-# Create your tests here.
+from django.core.cache import caches
+from datetime import datetime, timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+TIERED_CACHES = {
+    'default': {
+        'BACKEND': 'core.cache_backends.TieredCache',
+        'OPTIONS': {'L2': 'shared', 'MAX_ENTRIES': 2, 'L1_TIMEOUT': 60},
+    },
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tiered-test'},
+}
+
+
+@override_settings(CACHES=TIERED_CACHES)
+class TieredCacheTest(TestCase):
+    def setUp(self):
+        self.cache = caches['default']
+        self.shared = caches['shared']
+        self.cache.clear()
+
+    def test_reads_fill_l1_from_l2(self):
+        before = self.cache.stats()
+        self.shared.set('k', {'a': 1})
+        self.assertEqual(self.cache.get('k'), {'a': 1})
+        self.shared.delete('k')
+        self.assertEqual(self.cache.get('k'), {'a': 1})  # served from L1
+        self.assertEqual(self.cache.get('missing', 'x'), 'x')
+        after = self.cache.stats()
+        self.assertEqual(
+            [after[k] - before[k] for k in ('l1_hits', 'l2_hits', 'misses')], [1, 1, 1]
+        )
+
+    def test_writes_go_to_both_tiers_and_l1_is_bounded(self):
+        for key in ('a', 'b', 'c'):
+            self.cache.set(key, key)
+        self.assertEqual(self.cache.stats()['l1_entries'], 2)
+        self.assertEqual(self.shared.get('a'), 'a')
+
+        self.cache.delete('c')
+        self.assertIsNone(self.cache.get('c'))
+        self.assertIsNone(self.shared.get('c'))
+
+    def test_evict_prefix_drops_only_local_copies(self):
+        self.cache.set('u:1:v1:dash', 1)
+        self.cache.set('u:2:v1:dash', 2)
+        self.cache.evict_prefix('u:1:')
+        self.assertEqual(self.cache.stats()['l1_entries'], 1)
+        self.assertEqual(self.cache.get('u:1:v1:dash'), 1)  # still in L2
+
+
+class SchedulerTest(TestCase):
+    def setUp(self):
+        from .scheduler import Scheduler
+        self.calls = []
+        self.scheduler = Scheduler()
+        self.scheduler.register("reminders", "0 10,22 * * *", lambda: self.calls.append(1), grace=timedelta(hours=2))
+        self.at = lambda *args: timezone.make_aware(datetime(2026, 3, *args))
+
+    def test_cron_next_run(self):
+        from .scheduler import CronSchedule
+        self.assertEqual(CronSchedule("0 10,22 * * *").next_after(self.at(5, 10, 0)), self.at(5, 22, 0))
+        self.assertEqual(CronSchedule("5 0 1 * *").next_after(self.at(5, 10, 0)), self.at(5, 10, 0).replace(month=4, day=1, hour=0, minute=5))
+        # Weekday 1 = Monday; 2026-03-09 is a Monday.
+        self.assertEqual(CronSchedule("*/15 9 * * 1").next_after(self.at(5, 10, 0)), self.at(9, 9, 0))
+        with self.assertRaises(ValueError):
+            CronSchedule("61 * * * *")
+
+    def test_one_process_runs_each_occurrence(self):
+        from .models import ScheduledJob
+        from .scheduler import Scheduler
+        self.scheduler.sync(self.at(5, 9, 0))
+        other = Scheduler()
+        other.jobs = self.scheduler.jobs
+        other._synced = True
+
+        self.assertEqual(self.scheduler.run_pending(self.at(5, 9, 30)), [])  # not due yet
+        self.assertEqual(self.scheduler.run_pending(self.at(5, 10, 0)), ["reminders"])
+        self.assertEqual(other.run_pending(self.at(5, 10, 0)), [])
+        self.assertEqual(len(self.calls), 1)
+
+        job = ScheduledJob.objects.get(name="reminders")
+        self.assertEqual((job.run_count, job.failure_count, job.lease_owner), (1, 0, ""))
+        self.assertEqual(job.next_run_at, self.at(5, 22, 0))
+        self.assertIsNotNone(job.last_duration)
+
+    def test_missed_runs_are_caught_up_once_within_grace(self):
+        from .models import ScheduledJob
+        self.scheduler.sync(self.at(5, 9, 0))
+
+        # Down from before 10:00 until 11:00: one catch-up run, then the 22:00 slot.
+        self.assertEqual(self.scheduler.run_pending(self.at(5, 11, 0)), ["reminders"])
+        self.assertEqual(ScheduledJob.objects.get(name="reminders").next_run_at, self.at(5, 22, 0))
+
+        # Down past the grace period: the 22:00 run is skipped, not sent at 03:00.
+        self.assertEqual(self.scheduler.run_pending(self.at(6, 3, 0)), [])
+        self.assertEqual(len(self.calls), 1)
+        job = ScheduledJob.objects.get(name="reminders")
+        self.assertEqual((job.next_run_at, job.skip_count, job.run_count), (self.at(6, 10, 0), 1, 1))
+        self.assertEqual(job.last_skipped_at, self.at(5, 22, 0))
+
+    def test_run_that_loses_its_lease_leaves_the_schedule_to_the_new_holder(self):
+        from .models import ScheduledJob
+        steal = lambda: ScheduledJob.objects.filter(name="stolen").update(lease_owner="other:1")
+        self.scheduler.register("stolen", "0 10 * * *", steal)
+        self.scheduler.sync(self.at(5, 9, 0))
+
+        self.scheduler.run_pending(self.at(5, 10, 0))
+
+        job = ScheduledJob.objects.get(name="stolen")
+        self.assertEqual((job.lease_owner, job.next_run_at), ("other:1", self.at(5, 10, 0)))
+        self.assertEqual(job.failure_count, 1)
+        self.assertIn("Lost the lease", job.last_error)
+
+
+class SchedulerAutostartTest(TestCase):
+    def is_server(self, argv, **env):
+        from unittest import mock
+        from .apps import CoreConfig
+
+        environ = {k: v for k, v in os.environ.items() if k not in ('ESPERE_WEB_PROCESS', 'RUN_MAIN')}
+        with mock.patch('sys.argv', argv), mock.patch.dict('os.environ', {**environ, **env}, clear=True):
+            return CoreConfig._is_server()
+
+    def test_only_server_processes_start_it(self):
+        self.assertTrue(self.is_server(['gunicorn'], ESPERE_WEB_PROCESS='1'))
+        self.assertTrue(self.is_server(['./manage.py', 'runserver'], RUN_MAIN='true'))
+        self.assertFalse(self.is_server(['/srv/app/manage.py', 'runserver']))
+        self.assertFalse(self.is_server(['/srv/app/manage.py', 'migrate']))
+        self.assertFalse(self.is_server(['./manage.py', 'test']))
+        self.assertFalse(self.is_server(['-c']))
@@ -1,20 +1,90 @@
-"""Cache utility definitions for Montra."""
+"""Cache utility definitions for Montra.
+
+Everything cached for a user is keyed on their data version, a counter that
+signals bump on each write to their transactions, budgets, categories,
+savings goals, profile or split ledger. Invalidation is therefore one
+increment; entries under old versions are never read again and expire.
+Split groups carry their own ``version`` for data shared by their members.
+"""
 from django.core.cache import cache
-from django.core.cache.utils import make_template_fragment_key
-from django.utils import timezone
+from django.db.models import F
+
+from core.models import DataVersion
+from split_expense.models import Group
+
+
+# DataVersion row for data every user sees, such as the system categories.
+SHARED_VERSION_ID = 0
+
+
+def get_data_version(user_id):
+    """The user's current data version (0 until their first write)."""
+    version = DataVersion.objects.filter(user_id=user_id).values_list("version", flat=True).first()
+    return version or 0
+
+
+def get_data_versions(*user_ids):
+    """Data versions for several ids in one query, in the order given."""
+    versions = dict(DataVersion.objects.filter(user_id__in=user_ids).values_list("user_id", "version"))
+    return [versions.get(user_id, 0) for user_id in user_ids]
+
+
+def bump_data_version(user_id):
+    """Move the user to a new data version."""
+    updated = DataVersion.objects.filter(user_id=user_id).update(version=F("version") + 1)
+    if not updated:
+        _, created = DataVersion.objects.get_or_create(user_id=user_id, defaults={"version": 1})
+        if not created:
+            DataVersion.objects.filter(user_id=user_id).update(version=F("version") + 1)
+
+
+def bump_data_versions(user_ids):
+    """``bump_data_version`` for several users in two queries."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    DataVersion.objects.bulk_create(
+        [DataVersion(user_id=user_id, version=0) for user_id in user_ids], ignore_conflicts=True
+    )
+    DataVersion.objects.filter(user_id__in=user_ids).update(version=F("version") + 1)
+
+
+def user_cache_key(user_id, *parts, version=None):
+    """Cache key for ``parts`` under the user's current data version.
+
+    Pass ``version`` when the caller has just read it, to save the lookup.
+    """
+    if version is None:
+        version = get_data_version(user_id)
+    return ":".join(["u", str(user_id), f"v{version}", *map(str, parts)])
+
 
 def invalidate_user_cache(user_id):
     """Invalidate all cached items for a specific user.
-    Since we don't have Redis wildcard matching for DB cache,
-    we explicitly delete known keys generated by {% cache %} tags.
+
+    Other processes stop reading the old entries as soon as they see the new
+    version; this process also frees its in-memory copies right away.
+    """
+    bump_data_version(user_id)
+    evict = getattr(cache, "evict_prefix", None)
+    if evict is not None:
+        evict(f"u:{user_id}:")
+
+
+def invalidate_users_cache(user_ids):
+    """``invalidate_user_cache`` for several users at once."""
+    user_ids = set(user_ids)
+    bump_data_versions(user_ids)
+    evict = getattr(cache, "evict_prefix", None)
+    if evict is not None:
+        for user_id in user_ids:
+            evict(f"u:{user_id}:")
+
+
+def bump_group_versions(**filters):
+    """Move the split groups matching ``filters`` to a new version.
+
+    ``Group.version`` plays the role of DataVersion for group payloads, which
+    every member sees.
     """
-    keys_to_delete = [
-        make_template_fragment_key("dashboard", [user_id]),
-    ]
-    
-    # Invalidate reports across recent years
-    current_year = timezone.now().year
-    for year in range(current_year - 5, current_year + 2):
-        keys_to_delete.append(make_template_fragment_key("reports", [user_id, year]))
-        
-    cache.delete_many(keys_to_delete)
+    Group.objects.filter(**filters).update(version=F("version") + 1)
@@ -9,8 +9,7 @@ from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth.models import User
 from .models import ContactMessage
-from accounts.models import DeviceToken
-from config.firebase import send_push_notification
+from config.firebase import push_to_users
 
 def assetlinks_view(request):
     """Serve the assetlinks.json file for Android App Links."""
@@ -84,16 +83,9 @@ class ContactSubmitAPIView(View):
 
             # Notify superadmins
             superadmins = User.objects.filter(is_superuser=True)
-            notified_via_push = False
-            
-            for admin in superadmins:
-                devices = DeviceToken.objects.filter(user=admin)
-                if devices.exists():
-                    for device in devices:
-                        title = f"New {contact_msg.get_type_display()}"
-                        body = f"From: {name}\n{message[:100]}..."
-                        if send_push_notification(device.token, title, body):
-                            notified_via_push = True
+            title = f"New {contact_msg.get_type_display()}"
+            body = f"From: {name}\n{message[:100]}..."
+            notified_via_push = bool(push_to_users(superadmins.values_list("id", flat=True), title, body))
 
             if not notified_via_push and superadmins.exists():
                 admin_emails = [admin.email for admin in superadmins if admin.email]
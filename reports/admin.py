@@ -1,3 +1,9 @@
 from django.contrib import admin
+from .models import ReportExport
 
-# Register your models here.
+
+@admin.register(ReportExport)
+class ReportExportAdmin(admin.ModelAdmin):
+    list_display = ["user", "period", "as_of", "status", "created_at", "finished_at"]
+    list_filter = ["status", "period"]
+    readonly_fields = ["data_version", "error"]
@@ -0,0 +1,34 @@
+"""Render pending PDF report exports outside the web process."""
+import time
+
+from django.core.management.base import BaseCommand
+
+from reports.models import ReportExport
+from reports.services import fail_stuck_exports, run_report_export
+
+
+class Command(BaseCommand):
+    help = "Render queued PDF report exports (use when REPORT_EXPORT_WORKERS = 0)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop", action="store_true",
+            help="Keep polling for new jobs instead of exiting when the queue is empty.",
+        )
+        parser.add_argument("--interval", type=float, default=2.0, help="Polling interval in seconds.")
+
+    def handle(self, *args, **options):
+        while True:
+            stuck = fail_stuck_exports()
+            if stuck:
+                self.stdout.write(self.style.WARNING(f"Failed {stuck} export(s) stuck past the timeout."))
+            pending = list(
+                ReportExport.objects.filter(status="pending")
+                .order_by("created_at").values_list("pk", flat=True)
+            )
+            rendered = sum(1 for pk in pending if run_report_export(pk))
+            if rendered:
+                self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} report export(s)."))
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
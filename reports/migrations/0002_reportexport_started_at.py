@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-17 01:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("reports", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reportexport",
+            name="started_at",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,3 +1,38 @@
+"""Reports models — background PDF export jobs."""
+import uuid
+
+from django.contrib.auth.models import User
 from django.db import models
 
-# Create your models here.
+
+class ReportExport(models.Model):
+    """A PDF report rendered off the request thread and stored under MEDIA_ROOT.
+
+    Finished exports are reused for the same (user, period, as_of, data_version),
+    so repeat downloads of an unchanged period serve the stored file.
+    """
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="report_exports")
+    period = models.CharField(max_length=20)
+    as_of = models.DateField(help_text="The day relative periods were resolved against")
+    data_version = models.CharField(max_length=64)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    file = models.FileField(upload_to="reports/%Y/%m/", blank=True)
+    error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [models.Index(fields=["user", "period", "as_of", "data_version"])]
+
+    def __str__(self):
+        return f"{self.user.username} {self.period} report ({self.status})"
@@ -0,0 +1,379 @@
+"""PDF rendering for the financial report export.
+
+Fonts, paragraph styles and table styles are built once per process by
+``get_pdf_theme()``; ``ReportBuilder`` assembles a document from them.
+The transactions section is streamed one page-sized table at a time, so
+statements of any length render in bounded memory.
+"""
+import io
+import logging
+import os
+import threading
+from collections import deque
+
+from django.conf import settings
+from django.db.models import Sum
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import (
+    SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, HRFlowable, Flowable,
+)
+
+from transactions.models import Transaction
+from transactions.services import rollup_totals
+from .services import filter_by_period, period_month_range
+
+logger = logging.getLogger(__name__)
+
+
+# Project theme colors (Montra Bold Light)
+BG_COLOR = "#FFFFFF"       # Main page background
+SURFACE = "#F4F4F5"        # Card / Table background
+PRIMARY = "#0F0F0F"        # App Black
+BORDER = "#E4E4E7"         # Borders / dividers
+TEXT_DARK = "#18181B"      # Main dark text
+TEXT_MUTED = "#71717A"     # Muted text
+INCOME_COLOR = "#C8E64A"   # App Green
+EXPENSE_COLOR = "#EF4444"  # Modern Red
+ACCENT = "#C8E64A"         # App Green
+
+# 3 summary columns spanning ~6.67 inches
+SUMMARY_COL_WIDTHS = [2.22 * inch] * 3
+# Transaction columns optimized to fit ~6.67 inches
+TXN_COL_WIDTHS = [1.05 * inch, 0.8 * inch, 0.8 * inch, 1.62 * inch, 1.0 * inch, 1.4 * inch]
+TXN_HEADER = ["Date", "Time", "Type", "Category", "Amount", "Payment"]
+
+
+def _register_fonts():
+    """Register NotoSans once; fall back to the built-in Helvetica faces."""
+    registered = pdfmetrics.getRegisteredFontNames()
+    if "NotoSans" in registered and "NotoSans-Bold" in registered:
+        return "NotoSans", "NotoSans-Bold"
+    try:
+        font_dir = os.path.join(settings.BASE_DIR, "static", "fonts")
+        pdfmetrics.registerFont(TTFont("NotoSans", os.path.join(font_dir, "NotoSans-Regular.ttf")))
+        pdfmetrics.registerFont(TTFont("NotoSans-Bold", os.path.join(font_dir, "NotoSans-Bold.ttf")))
+        return "NotoSans", "NotoSans-Bold"
+    except Exception as e:
+        logger.warning("PDF fonts unavailable, using Helvetica: %s", e)
+        return "Helvetica", "Helvetica-Bold"
+
+
+class PDFTheme:
+    """Fonts and prebuilt styles shared by every report in the process."""
+
+    def __init__(self):
+        self.font_regular, self.font_bold = _register_fonts()
+        styles = getSampleStyleSheet()
+
+        self.title = ParagraphStyle(
+            "MontraTitle", parent=styles["Title"],
+            fontSize=24, textColor=colors.HexColor(PRIMARY),
+            fontName=self.font_bold,
+            spaceAfter=6,
+            alignment=TA_LEFT,
+        )
+        self.subtitle = ParagraphStyle(
+            "MontraSubtitle", parent=styles["Normal"],
+            fontSize=10, textColor=colors.HexColor("#A1A1AA"),
+            fontName=self.font_regular,
+            spaceAfter=2,
+            alignment=TA_LEFT,
+        )
+        self.heading = ParagraphStyle(
+            "MontraHeading", parent=styles["Heading2"],
+            fontSize=13, textColor=colors.HexColor(TEXT_DARK),
+            fontName=self.font_bold,
+            spaceBefore=20, spaceAfter=8,
+        )
+        self.normal = ParagraphStyle(
+            "NormalDark", parent=styles["Normal"],
+            textColor=colors.HexColor(TEXT_DARK),
+            fontName=self.font_regular,
+            fontSize=10,
+            spaceAfter=2,
+        )
+        self.footer = ParagraphStyle(
+            "Footer", parent=styles["Normal"],
+            fontSize=9, textColor=colors.HexColor(TEXT_MUTED),
+            alignment=TA_CENTER,
+        )
+
+        self.summary_table = TableStyle([
+            ("BACKGROUND", (0, 0), (-1, -1), colors.HexColor(PRIMARY)),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor("#D4D4D8")),
+            ("FONTNAME", (0, 0), (-1, 0), self.font_bold),
+            ("FONTSIZE", (0, 0), (-1, 0), 10),
+            ("FONTNAME", (0, 1), (-1, 1), self.font_bold),
+            ("FONTSIZE", (0, 1), (-1, 1), 16),
+            ("TEXTCOLOR", (0, 1), (0, 1), colors.HexColor(INCOME_COLOR)),
+            ("TEXTCOLOR", (1, 1), (1, 1), colors.HexColor(EXPENSE_COLOR)),
+            ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("TOPPADDING", (0, 0), (-1, -1), 12),
+            ("BOTTOMPADDING", (0, 0), (-1, -1), 14),
+            ("ROUNDEDCORNERS", [6, 6, 6, 6]),
+        ])
+        # The net savings cell is the only per-report variation.
+        self.savings_positive = TableStyle(
+            [("TEXTCOLOR", (2, 1), (2, 1), colors.HexColor(INCOME_COLOR))],
+            parent=self.summary_table,
+        )
+        self.savings_negative = TableStyle(
+            [("TEXTCOLOR", (2, 1), (2, 1), colors.HexColor(EXPENSE_COLOR))],
+            parent=self.summary_table,
+        )
+
+        self.transactions_table = TableStyle([
+            # Header row
+            ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor(PRIMARY)),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.HexColor(ACCENT)),
+            ("FONTNAME", (0, 0), (-1, 0), self.font_bold),
+            ("FONTSIZE", (0, 0), (-1, 0), 9.5),
+            ("TOPPADDING", (0, 0), (-1, 0), 8),
+            ("BOTTOMPADDING", (0, 0), (-1, 0), 8),
+
+            # Alignments
+            ("ALIGN", (0, 0), (3, -1), "LEFT"),
+            ("ALIGN", (4, 0), (4, -1), "RIGHT"),
+            ("ALIGN", (5, 0), (5, -1), "LEFT"),
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+
+            # Body rows
+            ("TEXTCOLOR", (0, 1), (-1, -1), colors.HexColor(TEXT_DARK)),
+            ("FONTNAME", (0, 1), (-1, -1), self.font_regular),
+            ("FONTSIZE", (0, 1), (-1, -1), 9),
+            ("TOPPADDING", (0, 1), (-1, -1), 6),
+            ("BOTTOMPADDING", (0, 1), (-1, -1), 8),
+
+            # Backgrounds
+            ("BACKGROUND", (0, 1), (-1, -1), colors.HexColor(BG_COLOR)),
+
+            # Grid
+            ("LINEBELOW", (0, 0), (-1, -2), 0.5, colors.HexColor(BORDER)),
+            ("LINEBELOW", (0, -1), (-1, -1), 1.5, colors.HexColor(PRIMARY)),
+        ])
+
+        self.rule_color = colors.HexColor(PRIMARY)
+        self.border_color = colors.HexColor(BORDER)
+        self.page_color = colors.HexColor(BG_COLOR)
+
+
+_theme = None
+_theme_lock = threading.Lock()
+
+
+def get_pdf_theme():
+    """Process-wide PDFTheme, built on first use."""
+    global _theme
+    with _theme_lock:
+        if _theme is None:
+            _theme = PDFTheme()
+        return _theme
+
+
+class TransactionPages(Flowable):
+    """Transactions table that pulls rows from an iterator one page at a time.
+
+    Each time the frame asks it to split, it builds a ``Table`` (header row
+    included) holding just as many rows as fit in the remaining space,
+    followed by a fresh ``TransactionPages`` over the same iterator for the
+    next page. Only that page's rows are ever held, and only the public
+    ``Flowable`` wrap/split/draw contract is used.
+    """
+
+    def __init__(self, rows, theme):
+        super().__init__()
+        self.theme = theme
+        self._rows = iter(rows)
+        self._pending = deque()
+        self._started = False
+        self._empty = None
+        self._header_height = self._row_height = None
+
+    def _continuation(self):
+        rest = TransactionPages(self._rows, self.theme)
+        rest._pending = self._pending
+        rest._started = True
+        rest._header_height, rest._row_height = self._header_height, self._row_height
+        return rest
+
+    def _has_more(self):
+        if not self._pending:
+            row = next(self._rows, None)
+            if row is None:
+                return False
+            self._pending.append(row)
+        return True
+
+    def _table(self, rows):
+        table = Table([TXN_HEADER, *rows], colWidths=TXN_COL_WIDTHS, repeatRows=1)
+        table.setStyle(self.theme.transactions_table)
+        return table
+
+    def _measure(self, availWidth):
+        """Header and row heights, from a header-only and a one-row table."""
+        if self._row_height is None:
+            self._header_height = self._table([]).wrap(availWidth, 0)[1]
+            with_row = self._table([self._pending[0]]).wrap(availWidth, 0)[1]
+            self._row_height = with_row - self._header_height
+
+    def wrap(self, availWidth, availHeight):
+        # Never claim to fit: the frame must call split() to place rows,
+        # except for an empty statement, which still gets its header row.
+        if not self._started and not self._has_more():
+            self._empty = self._table([])
+            return self._empty.wrap(availWidth, availHeight)
+        return availWidth, availHeight + 1
+
+    def draw(self):
+        if self._empty is not None:
+            self._empty.drawOn(self.canv, 0, 0)
+
+    def split(self, availWidth, availHeight):
+        if not self._has_more():
+            return []
+        self._measure(availWidth)
+        capacity = int((availHeight - self._header_height) // self._row_height)
+        if capacity < 1:
+            return []
+
+        rows = list(self._pending)
+        self._pending.clear()
+        while len(rows) < capacity:
+            row = next(self._rows, None)
+            if row is None:
+                break
+            rows.append(row)
+
+        table = self._table(rows)
+        # Guard against taller-than-measured rows: push the overflow back.
+        while len(rows) > 1 and table.wrap(availWidth, availHeight)[1] > availHeight:
+            self._pending.appendleft(rows.pop())
+            table = self._table(rows)
+
+        self._started = True
+        return [table, self._continuation()] if self._has_more() else [table]
+
+
+class ReportBuilder:
+    """Collects report sections and renders them with the shared theme."""
+
+    def __init__(self, theme=None):
+        self.theme = theme or get_pdf_theme()
+        self.elements = []
+
+    def header(self, name, today):
+        t = self.theme
+        self.elements += [
+            Paragraph("Espere.", t.title),
+            Paragraph("Financial Report", t.subtitle),
+            Spacer(1, 0.15 * inch),
+            HRFlowable(width="100%", thickness=2, color=t.rule_color, spaceAfter=12),
+            Paragraph(f"Prepared for: <b>{name}</b>", t.normal),
+            Paragraph(f"Generated on: {today.strftime('%B %d, %Y')}", t.subtitle),
+            Spacer(1, 0.25 * inch),
+        ]
+
+    def heading(self, text):
+        self.elements.append(Paragraph(text, self.theme.heading))
+
+    def summary(self, income, expense, sym):
+        t = self.theme
+        savings = income - expense
+        table = Table([
+            ["Income", "Expenses", "Net Savings"],
+            [f"{sym}{income:,.2f}", f"{sym}{expense:,.2f}", f"{sym}{savings:,.2f}"],
+        ], colWidths=SUMMARY_COL_WIDTHS)
+        table.setStyle(t.savings_positive if savings >= 0 else t.savings_negative)
+        self.elements += [table, Spacer(1, 0.3 * inch)]
+
+    def transactions(self, rows):
+        """Add the transactions section; ``rows`` is any iterable of formatted cells."""
+        self.elements.append(TransactionPages(rows, self.theme))
+
+    def footer(self, today):
+        self.elements += [
+            Spacer(1, 0.4 * inch),
+            HRFlowable(width="100%", thickness=1.0, color=self.theme.border_color, spaceAfter=8),
+            Paragraph(
+                f"Espere Financial Tracker · Generated {today.strftime('%b %d, %Y')}",
+                self.theme.footer,
+            ),
+        ]
+
+    def _draw_page(self, canvas, doc):
+        canvas.saveState()
+        canvas.setFillColor(self.theme.page_color)
+        # Draw a rectangle filling the entire A4 canvas
+        canvas.rect(0, 0, A4[0], A4[1], fill=1, stroke=0)
+        canvas.restoreState()
+
+    def build(self):
+        """Render the collected elements and return the PDF bytes."""
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(
+            buffer, pagesize=A4,
+            topMargin=1.0 * inch, bottomMargin=1.0 * inch,
+            leftMargin=0.8 * inch, rightMargin=0.8 * inch,
+        )
+        doc.build(self.elements, onFirstPage=self._draw_page, onLaterPages=self._draw_page)
+        return buffer.getvalue()
+
+
+def render_report_pdf(user, period="1m", today=None):
+    """Build the financial report for ``user`` and return the PDF bytes."""
+    if today is None:
+        today = timezone.localdate()
+
+    report = ReportBuilder()
+    report.header(user.get_full_name() or user.username, today)
+
+    # --- Period-based filtering ---
+    txns = Transaction.objects.filter(user=user)
+    txns, period_label = filter_by_period(txns, period, today)
+
+    # Get User's Currency Symbol
+    sym = "$"
+    if hasattr(user, 'userprofile'):
+        sym = user.userprofile.get_currency_symbol()
+
+    months = period_month_range(period, today)
+    if months is None:
+        income = txns.filter(type="income").aggregate(t=Sum("amount"))["t"] or 0
+        expense = txns.filter(type="expense").aggregate(t=Sum("amount"))["t"] or 0
+    else:
+        income, expense = rollup_totals(user, *months)
+
+    report.heading(f"Summary — {period_label}")
+    report.summary(income, expense, sym)
+
+    # --- Transactions table ---
+    report.heading(f"Transactions — {period_label}")
+    report.transactions(_transaction_rows(txns.order_by("-date"), sym))
+
+    report.footer(today)
+    return report.build()
+
+
+def _transaction_rows(txns, sym, chunk_size=2000):
+    """Stream formatted table rows for ``txns`` without loading model instances."""
+    payment_labels = dict(Transaction.PAYMENT_CHOICES)
+    rows = txns.values_list(
+        "date", "type", "category__name", "amount", "payment_method",
+    ).iterator(chunk_size=chunk_size)
+    for dt, txn_type, category, amount, payment_method in rows:
+        yield [
+            dt.strftime("%b %d, %Y"),
+            dt.strftime("%I:%M %p"),
+            txn_type.title(),
+            category or "—",
+            f"{sym}{amount:,.2f}",
+            payment_labels.get(payment_method, payment_method),
+        ]
@@ -0,0 +1,328 @@
+"""Reports services — yearly report, period helpers and background PDF export jobs."""
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from itertools import accumulate
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models import Sum, Q
+from django.utils import timezone
+
+from core.utils.cache import get_data_version
+from transactions.models import Transaction, MonthlyRollup, YearlySummary
+from transactions.services import shift_month
+from .models import ReportExport
+
+
+MONTH_LABELS = [date(2000, m, 1).strftime("%b") for m in range(1, 13)]
+
+
+def build_yearly_report(user, year, top=10):
+    """Everything the yearly report shows, shared by the web page and the API.
+
+    Two grouped MonthlyRollup queries (by month and by category); every
+    series is then shaped in one pass, with the savings trend as a running
+    sum. Values are plain floats/lists so callers can serialize directly.
+    """
+    rollups = MonthlyRollup.objects.filter(user=user, year=year)
+
+    income, expense = [0.0] * 12, [0.0] * 12
+    for row in (
+        rollups.values("month").annotate(
+            income=Sum("total", filter=Q(type="income")),
+            expense=Sum("total", filter=Q(type="expense")),
+        ).order_by()
+    ):
+        income[row["month"] - 1] = float(row["income"] or 0)
+        expense[row["month"] - 1] = float(row["expense"] or 0)
+    savings = [i - e for i, e in zip(income, expense)]
+
+    categories = [
+        {
+            "name": c["category__name"] or "Other",
+            "icon": c["category__icon"] or "category",
+            "color": c["category__color"] or "#C8E64A",
+            "total": float(c["total"] or 0),
+        }
+        for c in (
+            rollups.filter(type="expense")
+            .values("category__name", "category__icon", "category__color")
+            .annotate(total=Sum("total"))
+            .order_by("-total")[:top]
+        )
+    ]
+    max_total = categories[0]["total"] if categories else 1
+    for c in categories:
+        c["pct"] = round(c["total"] / max_total * 100, 1) if max_total > 0 else 0
+
+    year_income, year_expense = sum(income), sum(expense)
+    return {
+        "year": year,
+        "annual_income": year_income,
+        "annual_expenses": year_expense,
+        "annual_net": year_income - year_expense,
+        "monthly_summary": [
+            {
+                "month": label, "income": i, "expense": e, "expenses": e,
+                "savings": net, "net": net,
+            }
+            for label, i, e, net in zip(MONTH_LABELS, income, expense, savings)
+        ],
+        "top_categories": categories,
+        "bar_labels": MONTH_LABELS,
+        "bar_income": income,
+        "bar_expense": expense,
+        "pie_labels": [c["name"] for c in categories],
+        "pie_values": [c["total"] for c in categories],
+        "pie_colors": [c["color"] for c in categories],
+        "pie_icons": [c["icon"] for c in categories],
+        "savings_trend": [round(v, 2) for v in accumulate(savings)],
+    }
+
+
+MAX_COMPARE_YEARS = 10
+
+
+def parse_compare_years(raw, today=None):
+    """Parse ``?years=2023,2024`` into a sorted list; defaults to the last three years.
+
+    Raises ValueError on malformed input or more than MAX_COMPARE_YEARS years.
+    """
+    if not raw:
+        year = (today or timezone.localdate()).year
+        return [year - 2, year - 1, year]
+    message = f"Give between 1 and {MAX_COMPARE_YEARS} comma-separated years."
+    try:
+        years = sorted({int(part) for part in raw.split(",") if part.strip()})
+    except ValueError:
+        raise ValueError(message)
+    if not years or len(years) > MAX_COMPARE_YEARS or not all(1900 < y < 10000 for y in years):
+        raise ValueError(message)
+    return years
+
+
+def compare_years(user, years):
+    """Year-over-year totals and monthly series for ``years``.
+
+    Totals come from the YearlySummary rows (one per year); the monthly
+    income/expense series are a single grouped MonthlyRollup query across
+    all requested years.
+    """
+    summaries = {
+        s.year: s for s in YearlySummary.objects.filter(user=user, year__in=years)
+    }
+    monthly = {y: ([0.0] * 12, [0.0] * 12) for y in years}
+    for row in (
+        MonthlyRollup.objects.filter(user=user, year__in=years)
+        .values("year", "month")
+        .annotate(
+            income=Sum("total", filter=Q(type="income")),
+            expense=Sum("total", filter=Q(type="expense")),
+        ).order_by()
+    ):
+        income, expense = monthly[row["year"]]
+        income[row["month"] - 1] = float(row["income"] or 0)
+        expense[row["month"] - 1] = float(row["expense"] or 0)
+
+    def change(current, previous):
+        return round((current - previous) / previous * 100, 1) if previous else None
+
+    rows, previous = [], None
+    for year in years:
+        summary = summaries.get(year)
+        income = float(summary.income) if summary else 0.0
+        expense = float(summary.expense) if summary else 0.0
+        rows.append({
+            "year": year,
+            "income": income,
+            "expense": expense,
+            "net": income - expense,
+            "count": summary.count if summary else 0,
+            "income_change": change(income, previous["income"]) if previous else None,
+            "expense_change": change(expense, previous["expense"]) if previous else None,
+            "monthly_income": monthly[year][0],
+            "monthly_expense": monthly[year][1],
+        })
+        previous = rows[-1]
+
+    return {"years": rows, "labels": MONTH_LABELS}
+
+
+def filter_by_period(qs, period, today=None, start_date=None, end_date=None):
+    """Filter a transaction queryset by a period string."""
+    if today is None:
+        today = timezone.localdate()
+    
+    if period == "current_month" or period == "1m":
+        start = today.replace(day=1)
+        return qs.filter(date__date__gte=start), f"{today.strftime('%B %Y')}"
+    elif period == "last_month":
+        # First day of this month - 1 day = last day of last month
+        last_month_end = today.replace(day=1) - timedelta(days=1)
+        last_month_start = last_month_end.replace(day=1)
+        return qs.filter(date__date__gte=last_month_start, date__date__lte=last_month_end), last_month_start.strftime('%B %Y')
+    elif period == "3m":
+        start = (today - timedelta(days=90)).replace(day=1)
+        return qs.filter(date__date__gte=start), "Last 3 Months"
+    elif period == "6m":
+        start = (today - timedelta(days=180)).replace(day=1)
+        return qs.filter(date__date__gte=start), "Last 6 Months"
+    elif period == "1y":
+        start = today.replace(month=1, day=1)
+        return qs.filter(date__date__gte=start), f"Year {today.year}"
+    elif period == "custom" and start_date and end_date:
+        return qs.filter(date__date__gte=start_date, date__date__lte=end_date), f"{start_date} to {end_date}"
+    else:  # "all"
+        return qs, "All Time"
+
+
+def period_month_range(period, today=None, start_date=None, end_date=None):
+    """Month bounds ``(start, end)`` matching ``filter_by_period``.
+
+    Every period except ``custom`` starts on a month boundary, so its totals
+    can be read from MonthlyRollup. Returns None when a scan is required.
+    """
+    if today is None:
+        today = timezone.localdate()
+    month_start = today.replace(day=1)
+
+    if period == "current_month" or period == "1m":
+        return month_start, None
+    elif period == "last_month":
+        return shift_month(month_start, -1), month_start
+    elif period == "3m":
+        return (today - timedelta(days=90)).replace(day=1), None
+    elif period == "6m":
+        return (today - timedelta(days=180)).replace(day=1), None
+    elif period == "1y":
+        return today.replace(month=1, day=1), None
+    elif period == "custom" and start_date and end_date:
+        return None
+    else:  # "all"
+        return None, None
+
+
+# ---------------------------------------------------------------------------
+# Background PDF exports
+# ---------------------------------------------------------------------------
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """Process-wide worker pool, created on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.REPORT_EXPORT_WORKERS,
+                thread_name_prefix="report-export",
+            )
+        return _executor
+
+
+def report_data_version(user):
+    """Fingerprint of everything a report for ``user`` is rendered from."""
+    profile = getattr(user, "userprofile", None)
+    raw = "|".join([
+        str(get_data_version(user.id)),
+        profile.currency if profile else "",
+        user.get_full_name() or user.username,
+    ])
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def request_report_export(user, period, today=None):
+    """Return the export job for this period, queuing a new one if needed.
+
+    A job for the same (user, period, day, data version) that is queued,
+    running or done is reused; a done job whose file went missing is re-run,
+    and one stuck running past REPORT_EXPORT_TIMEOUT is failed and replaced.
+    """
+    if today is None:
+        today = timezone.localdate()
+    version = report_data_version(user)
+    fail_stuck_exports(user=user)
+    job = (
+        ReportExport.objects.filter(user=user, period=period, as_of=today, data_version=version)
+        .exclude(status="failed")
+        .first()
+    )
+    if job is not None:
+        if job.status != "done" or job.file.storage.exists(job.file.name):
+            return job
+        job.delete()
+
+    job = ReportExport.objects.create(user=user, period=period, as_of=today, data_version=version)
+    enqueue_report_export(job)
+    return job
+
+
+def enqueue_report_export(job):
+    """Hand the job to the in-process pool once the row is committed.
+
+    With ``REPORT_EXPORT_WORKERS = 0`` jobs stay pending until the
+    ``process_report_exports`` command picks them up.
+    """
+    if settings.REPORT_EXPORT_WORKERS > 0:
+        transaction.on_commit(lambda: _get_executor().submit(_run_in_thread, job.pk))
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        run_report_export(job_id)
+    finally:
+        close_old_connections()
+
+
+def fail_stuck_exports(**filters):
+    """Fail running jobs (matching ``filters``) older than REPORT_EXPORT_TIMEOUT.
+
+    Their worker died mid-render, so without this the job would be reused
+    and polled forever. Returns how many were failed.
+    """
+    now = timezone.now()
+    return ReportExport.objects.filter(
+        status="running", started_at__lt=now - timedelta(seconds=settings.REPORT_EXPORT_TIMEOUT), **filters
+    ).update(status="failed", error="Export timed out.", finished_at=now)
+
+
+def run_report_export(job_id):
+    """Render a pending job to MEDIA_ROOT. Returns False if it was already claimed."""
+    from .pdf import render_report_pdf
+
+    claimed = ReportExport.objects.filter(pk=job_id, status="pending").update(
+        status="running", started_at=timezone.now()
+    )
+    if not claimed:
+        return False
+    job = ReportExport.objects.select_related("user", "user__userprofile").get(pk=job_id)
+    try:
+        pdf = render_report_pdf(job.user, job.period, job.as_of)
+        job.file.save(f"espere_report_{job.period}_{job.pk.hex[:8]}.pdf", ContentFile(pdf), save=False)
+        job.status = "done"
+    except Exception as e:
+        job.status = "failed"
+        job.error = f"{type(e).__name__}: {e}"
+    job.finished_at = timezone.now()
+    job.save(update_fields=["file", "status", "error", "finished_at"])
+
+    if job.status == "done":
+        _prune_superseded_exports(job)
+    return True
+
+
+def _prune_superseded_exports(job):
+    """Drop older finished exports of the same period along with their files."""
+    stale = ReportExport.objects.filter(
+        user_id=job.user_id, period=job.period, status__in=("done", "failed"),
+        created_at__lt=job.created_at,
+    )
+    for old in stale:
+        if old.file:
+            old.file.delete(save=False)
+    stale.delete()
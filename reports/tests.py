@@ -1,3 +1,233 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.http import StreamingHttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from transactions.models import Category, Transaction
+from .models import ReportExport
+from .services import request_report_export, run_report_export
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, REPORT_EXPORT_WORKERS=0)
+class ReportExportTest(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password')
+        Transaction.objects.create(user=self.user, amount=Decimal('12.50'), type='expense')
+
+    def test_job_is_rendered_and_reused(self):
+        today = date(2026, 3, 15)
+        job = request_report_export(self.user, 'all', today)
+        self.assertEqual(job.status, 'pending')
+        self.assertTrue(run_report_export(job.pk))
+        self.assertFalse(run_report_export(job.pk))  # already claimed
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'done')
+        with job.file.open('rb') as fh:
+            self.assertTrue(fh.read(5).startswith(b'%PDF'))
+
+        self.assertEqual(request_report_export(self.user, 'all', today).pk, job.pk)
+
+    def test_new_data_queues_new_job(self):
+        today = date(2026, 3, 15)
+        first = request_report_export(self.user, 'all', today)
+        run_report_export(first.pk)
+        Transaction.objects.create(user=self.user, amount=Decimal('3.00'), type='income')
+
+        second = request_report_export(self.user, 'all', today)
+        self.assertNotEqual(second.pk, first.pk)
+        run_report_export(second.pk)
+        self.assertFalse(ReportExport.objects.filter(pk=first.pk).exists())
+
+    def test_stuck_running_job_is_failed_and_replaced(self):
+        today = date(2026, 3, 15)
+        stuck = request_report_export(self.user, 'all', today)
+        ReportExport.objects.filter(pk=stuck.pk).update(
+            status='running', started_at=timezone.now() - timedelta(hours=1)
+        )
+
+        fresh = request_report_export(self.user, 'all', today)
+        self.assertNotEqual(fresh.pk, stuck.pk)
+        stuck.refresh_from_db()
+        self.assertEqual((stuck.status, stuck.error), ('failed', 'Export timed out.'))
+
+    def test_views_poll_then_download(self):
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse('reports:export_pdf'), {'period': '1m'})
+        self.assertEqual(resp.status_code, 202)
+        job_id = resp.json()['id']
+
+        run_report_export(job_id)
+        status = self.client.get(reverse('reports:export_status', args=[job_id])).json()
+        self.assertEqual(status['status'], 'done')
+
+        resp = self.client.get(status['download_url'])
+        self.assertEqual(resp['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(resp.streaming_content).startswith(b'%PDF'))
+
+
+class PDFThemeTest(TestCase):
+    def test_theme_is_built_once(self):
+        from .pdf import get_pdf_theme, ReportBuilder
+
+        theme = get_pdf_theme()
+        self.assertIs(get_pdf_theme(), theme)
+        self.assertIs(ReportBuilder().theme, theme)
+
+    def test_builder_renders_pdf(self):
+        from .pdf import ReportBuilder
+
+        report = ReportBuilder()
+        report.header('Alice', date(2026, 3, 15))
+        report.summary(Decimal('10'), Decimal('25'), '$')
+        report.transactions([['Mar 15, 2026', '10:00 AM', 'Expense', '—', '$25.00', 'Cash']])
+        self.assertTrue(report.build().startswith(b'%PDF'))
+
+    def test_transactions_flow_across_pages(self):
+        from .pdf import ReportBuilder
+
+        row = ['Mar 15, 2026', '10:00 AM', 'Expense', 'Food', '$25.00', 'Cash']
+        short, long = ReportBuilder(), ReportBuilder()
+        short.transactions(iter([row]))
+        long.transactions(iter([row] * 200))
+        self.assertEqual(short.build().count(b'/Type /Page\n'), 1)
+        self.assertGreater(long.build().count(b'/Type /Page\n'), 5)
+
+    def test_empty_statement_renders_header_only(self):
+        from .pdf import ReportBuilder
+
+        report = ReportBuilder()
+        report.transactions(iter([]))
+        self.assertEqual(report.build().count(b'/Type /Page\n'), 1)
+
+
+class TransactionPagesTest(TestCase):
+    WIDTH, HEIGHT = 450, 700
+
+    def test_split_fills_each_page_and_pulls_rows_lazily(self):
+        from .pdf import TransactionPages, get_pdf_theme
+
+        pulled = 0
+
+        def rows(n):
+            nonlocal pulled
+            for i in range(n):
+                pulled += 1
+                yield [f'Mar {i % 28 + 1}, 2026', '10:00 AM', 'Expense', 'Food', f'${i}.00', 'Cash']
+
+        flowable = TransactionPages(rows(2000), get_pdf_theme())
+        header = flowable._table([]).wrap(self.WIDTH, 0)[1]
+        row = flowable._table([['x'] * 6]).wrap(self.WIDTH, 0)[1] - header
+        capacity = int((self.HEIGHT - header) // row)
+
+        per_page = []
+        while flowable is not None:
+            parts = flowable.split(self.WIDTH, self.HEIGHT)
+            table_height = parts[0].wrap(self.WIDTH, self.HEIGHT)[1]
+            self.assertLessEqual(table_height, self.HEIGHT)
+            per_page.append(round((table_height - header) / row))
+            # Only this page's rows (plus one peeked row) have been read.
+            self.assertLessEqual(pulled, sum(per_page) + 1)
+            flowable = parts[1] if len(parts) > 1 else None
+
+        self.assertEqual(sum(per_page), 2000)
+        self.assertEqual(len(per_page), -(-2000 // capacity))
+        self.assertEqual(set(per_page[:-1]), {capacity})
+
+    def test_nothing_fits_below_one_row(self):
+        from .pdf import TransactionPages, get_pdf_theme
+
+        row = ['Mar 15, 2026', '10:00 AM', 'Expense', 'Food', '$25.00', 'Cash']
+        self.assertEqual(TransactionPages(iter([row]), get_pdf_theme()).split(self.WIDTH, 20), [])
+
+
+class ExportCSVTest(TestCase):
+    def test_streams_rows_with_labels(self):
+        user = User.objects.create_user(username='alice', password='password')
+        food = Category.objects.create(name='Food', user=user)
+        tz = timezone.get_current_timezone()
+        Transaction.objects.create(
+            user=user, amount=Decimal('12.50'), type='expense', category=food,
+            payment_method='upi', notes='lunch', date=datetime(2026, 3, 15, 12, tzinfo=tz),
+        )
+        Transaction.objects.create(
+            user=user, amount=Decimal('40.00'), type='income',
+            payment_method='bank', date=datetime(2026, 3, 14, 12, tzinfo=tz),
+        )
+
+        self.client.force_login(user)
+        resp = self.client.get(reverse('reports:export_csv'))
+        self.assertIsInstance(resp, StreamingHttpResponse)
+        lines = b''.join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'Date,Time,Type,Category,Amount,Payment Method,Notes')
+        food_row, income_row = (line.split(',') for line in lines[1:])
+        self.assertEqual(food_row[2:], ['Expense', 'Food', '12.50', 'UPI / Mobile Payment', 'lunch'])
+        self.assertEqual(income_row[2:], ['Income', '—', '40.00', 'Bank Transfer', ''])
+
+
+class YearlyReportTest(TestCase):
+    def test_series_are_shaped_from_rollups(self):
+        from .services import build_yearly_report
+
+        user = User.objects.create_user(username='bob', password='password')
+        for month, kind, amount in [(1, 'income', '100'), (1, 'expense', '40'), (3, 'expense', '30')]:
+            Transaction.objects.create(
+                user=user, type=kind, amount=Decimal(amount),
+                date=datetime(2025, month, 10, tzinfo=timezone.get_current_timezone()),
+            )
+
+        with self.assertNumQueries(2):
+            report = build_yearly_report(user, 2025)
+        self.assertEqual(report['bar_income'][0], 100.0)
+        self.assertEqual(report['bar_expense'][:3], [40.0, 0.0, 30.0])
+        self.assertEqual(report['savings_trend'][:3], [60.0, 60.0, 30.0])
+        self.assertEqual(report['annual_net'], 30.0)
+        self.assertEqual(report['pie_values'], [70.0])
+        self.assertEqual(report['top_categories'][0]['pct'], 100.0)
+
+
+class CompareYearsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='carol', password='password')
+        tz = timezone.get_current_timezone()
+        for year, kind, amount in [(2024, 'expense', '50'), (2025, 'expense', '75'), (2025, 'income', '200')]:
+            Transaction.objects.create(
+                user=self.user, type=kind, amount=Decimal(amount), date=datetime(year, 6, 1, tzinfo=tz),
+            )
+
+    def test_yearly_summary_tracks_writes(self):
+        from transactions.models import YearlySummary
+
+        txn = Transaction.objects.filter(user=self.user, date__year=2024).get()
+        txn.date = datetime(2023, 6, 1, tzinfo=timezone.get_current_timezone())
+        txn.save()
+        summaries = {s.year: s for s in YearlySummary.objects.filter(user=self.user)}
+        self.assertEqual(sorted(summaries), [2023, 2025])
+        self.assertEqual(summaries[2025].income, Decimal('200'))
+        self.assertEqual(summaries[2025].count, 2)
+
+    def test_compare_view_and_api(self):
+        from .services import compare_years
+
+        with self.assertNumQueries(2):
+            result = compare_years(self.user, [2024, 2025])
+        self.assertEqual([r['net'] for r in result['years']], [-50.0, 125.0])
+        self.assertEqual(result['years'][1]['expense_change'], 50.0)
+        self.assertEqual(result['years'][1]['monthly_expense'][5], 75.0)
+
+        self.client.force_login(self.user)
+        resp = self.client.get(reverse('reports:compare'), {'years': '2024,2025'})
+        self.assertContains(resp, 'Year over Year')
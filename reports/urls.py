@@ -6,6 +6,9 @@ app_name = "reports"
 
 urlpatterns = [
     path("", views.ReportsView.as_view(), name="reports"),
+    path("compare/", views.ReportCompareView.as_view(), name="compare"),
     path("export/csv/", views.ExportCSVView.as_view(), name="export_csv"),
     path("export/pdf/", views.ExportPDFView.as_view(), name="export_pdf"),
+    path("export/pdf/<uuid:pk>/", views.ExportStatusView.as_view(), name="export_status"),
+    path("export/pdf/<uuid:pk>/download/", views.ExportDownloadView.as_view(), name="export_download"),
 ]
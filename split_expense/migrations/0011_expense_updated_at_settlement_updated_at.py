@@ -0,0 +1,22 @@
+# Generated by Django 6.1.2 on 2026-10-17 00:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("split_expense", "0010_groupmember_invited_by_alter_group_members"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="expense",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="settlement",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
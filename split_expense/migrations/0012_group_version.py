@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-17 00:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("split_expense", "0011_expense_updated_at_settlement_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="group",
+            name="version",
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+    ]
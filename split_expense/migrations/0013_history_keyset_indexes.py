@@ -0,0 +1,28 @@
+# Generated by Django 6.1.2 on 2026-10-17 00:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("split_expense", "0012_group_version"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="expense",
+            index=models.Index(
+                fields=["group", "-date", "-created_at", "-id"],
+                name="split_expen_group_i_6cded8_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="settlement",
+            index=models.Index(
+                fields=["group", "-date", "-created_at", "-id"],
+                name="split_expen_group_i_34d5e0_idx",
+            ),
+        ),
+    ]
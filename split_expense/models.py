@@ -48,6 +48,8 @@ class Group(models.Model):
     color = models.CharField(max_length=20, default="#C8E64A")
     icon = models.CharField(max_length=50, default="groups")
     local_id = models.CharField(max_length=100, null=True, blank=True, db_index=True)
+    # Bumped on any change to what members see (core.utils.cache.bump_group_versions).
+    version = models.PositiveBigIntegerField(default=0)
 
     def __str__(self):
         return self.name
@@ -119,8 +121,13 @@ class Expense(models.Model):
     split_type = models.CharField(max_length=20, choices=SPLIT_CHOICES, default='equal')
     date = models.DateTimeField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     local_id = models.CharField(max_length=100, null=True, blank=True, db_index=True)
 
+    class Meta:
+        # Serves the per-group newest-first history and its keyset cursor.
+        indexes = [models.Index(fields=["group", "-date", "-created_at", "-id"])]
+
     def __str__(self):
         return f"{self.description} ({self.amount}) paid by {self.paid_by.username}"
 
@@ -145,7 +152,11 @@ class Settlement(models.Model):
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     date = models.DateTimeField(default=timezone.now)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     local_id = models.CharField(max_length=100, null=True, blank=True, db_index=True)
 
+    class Meta:
+        indexes = [models.Index(fields=["group", "-date", "-created_at", "-id"])]
+
     def __str__(self):
         return f"{self.paid_by.username} paid {self.paid_to.username} {self.amount} in {self.group.name}"
@@ -1,8 +1,9 @@
 from decimal import Decimal
 from django.db import transaction, models
-from django.db.models import Q
+from django.db.models import Q, F, Case, When, Value, DecimalField
 from django.core.exceptions import ValidationError
 from django.contrib.auth.models import User
+from core.utils.cache import invalidate_users_cache
 from .models import (
     Group, GroupMember, Expense, ExpenseSplit, Settlement, 
     GroupInvitation, Friendship, FriendRequest, ExternalFriendInvitation
@@ -124,13 +125,10 @@ def _send_friend_request_notification(friend_request):
     subject = "New Friend Request"
     body = f"{sender.username} wants to be your friend on Espere."
     
-    from accounts.models import DeviceToken
-    from config.firebase import send_push_notification
+    from accounts.services import queue_push
     
-    # Push
-    tokens = DeviceToken.objects.filter(user=receiver)
-    for dt in tokens:
-        send_push_notification(token=dt.token, title=subject, body=body, data={"action": "open_friends"})
+    # Push (delivered after commit)
+    queue_push([receiver], subject, body, data={"action": "open_friends"})
 
 def invite_user_to_group(group, identifier, inviter, request=None):
     """
@@ -184,26 +182,13 @@ def _send_group_invitation_notification(group, invited_user, request=None):
     subject = "New Group Invitation"
     body = f"{sender.username} invited you to join the group '{group.name}'."
     
-    from accounts.models import DeviceToken, Notification
-    from config.firebase import send_push_notification
+    from accounts.services import notify_users
     
-    # In-app record
-    Notification.objects.create(
-        user=invited_user,
-        title=subject,
-        message=body,
+    # In-app record + push (delivered after commit)
+    notify_users(
+        [invited_user], subject, body,
         data={"action": "open_split_invitations", "group_id": str(group.id)}
     )
-    
-    # Push
-    tokens = DeviceToken.objects.filter(user=invited_user)
-    for dt in tokens:
-        send_push_notification(
-            token=dt.token, 
-            title=subject, 
-            body=body, 
-            data={"action": "open_split_invitations", "group_id": str(group.id)}
-        )
 
 def _send_external_group_invitation_email(group, invite, inviter, request=None):
     """Send email to non-app user."""
@@ -229,6 +214,69 @@ def _send_external_group_invitation_email(group, invite, inviter, request=None):
         [invite.email], html_message=html_message
     )
 
+def _ledger_delta(amounts):
+    """CASE expression yielding each member's delta from ``amounts`` (user id -> Decimal)."""
+    return Case(
+        *[When(user_id=user_id, then=Value(delta)) for user_id, delta in amounts.items()],
+        default=Value(Decimal('0')),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+def apply_ledger_deltas(group, paid=None, owed=None, create_missing=True):
+    """
+    Adds per-user deltas to the group's virtual ledger in a single UPDATE.
+
+    ``paid`` and ``owed`` map user ids to the amount to add to total_paid and
+    total_owed (negative to reverse); net_balance moves by paid - owed.
+    Ledger rows missing for any of the users are created first (unless
+    ``create_missing`` is False), so the cost is a constant number of queries
+    whatever the group size. ``update()`` skips
+    the GroupMember signals, so the members' caches are invalidated here.
+    """
+    paid = paid or {}
+    owed = owed or {}
+    user_ids = set(paid) | set(owed)
+    if not user_ids:
+        return
+
+    if create_missing:
+        existing = set(
+            GroupMember.objects.filter(group=group, user_id__in=user_ids).values_list('user_id', flat=True)
+        )
+        missing = user_ids - existing
+        if missing:
+            GroupMember.objects.bulk_create([GroupMember(group=group, user_id=user_id) for user_id in missing])
+
+    net = {
+        user_id: paid.get(user_id, Decimal('0')) - owed.get(user_id, Decimal('0'))
+        for user_id in user_ids
+    }
+    changes = {'net_balance': F('net_balance') + _ledger_delta(net)}
+    if paid:
+        changes['total_paid'] = F('total_paid') + _ledger_delta(paid)
+    if owed:
+        changes['total_owed'] = F('total_owed') + _ledger_delta(owed)
+    GroupMember.objects.filter(group=group, user_id__in=user_ids).update(**changes)
+
+    invalidate_users_cache(user_ids)
+
+def _expense_owed(splits):
+    """Sums split amounts per user id."""
+    owed = {}
+    for split in splits:
+        owed[split.user_id] = owed.get(split.user_id, Decimal('0')) + split.amount_owed
+    return owed
+
+def _reverse_expense(expense):
+    """Undoes an expense's ledger impact (one query for the splits, one UPDATE)."""
+    splits = expense.splits.only('user_id', 'amount_owed')
+    apply_ledger_deltas(
+        expense.group,
+        paid={expense.paid_by_id: -expense.amount},
+        owed={user_id: -amount for user_id, amount in _expense_owed(splits).items()},
+        create_missing=False,
+    )
+
 @transaction.atomic
 def create_expense(group, paid_by, amount, description, split_type, splits_data=None, local_id=None, created_by=None, date=None):
     """
@@ -319,19 +367,8 @@ def create_expense(group, paid_by, amount, description, split_type, splits_data=
         
     ExpenseSplit.objects.bulk_create(splits_to_create)
     
-    # 3. Update the Virtual Ledger (GroupMember balances)
-    # Update paid_by (total_paid)
-    payer, _ = GroupMember.objects.get_or_create(group=group, user=paid_by)
-    payer.total_paid += amount
-    payer.net_balance += amount
-    payer.save(update_fields=['total_paid', 'net_balance'])
-    
-    # Update all who owe
-    for split in splits_to_create:
-        member_ledger, _ = GroupMember.objects.get_or_create(group=group, user=split.user)
-        member_ledger.total_owed += split.amount_owed
-        member_ledger.net_balance -= split.amount_owed
-        member_ledger.save(update_fields=['total_owed', 'net_balance'])
+    # 3. Update the Virtual Ledger (GroupMember balances) in one statement
+    apply_ledger_deltas(group, paid={paid_by.id: amount}, owed=_expense_owed(splits_to_create))
 
     # 4. Notifications
     _send_expense_notification(expense)
@@ -339,7 +376,14 @@ def create_expense(group, paid_by, amount, description, split_type, splits_data=
     return expense
 
 def _send_expense_notification(expense):
-    """Sends push and email notifications to group members about a new expense."""
+    """
+    Notifies the other group members about a new expense.
+
+    In-app notifications and push outbox rows are bulk-inserted in the
+    caller's transaction; the pushes are sent once it commits.
+    """
+    from accounts.services import notify_users
+
     group = expense.group
     paid_by = expense.paid_by
     members = group.members.exclude(id=paid_by.id)
@@ -347,38 +391,14 @@ def _send_expense_notification(expense):
     subject = f"New Expense in {group.name}"
     body = f"{paid_by.username} added '{expense.description}' of {expense.amount} in {group.name}."
     
-    from accounts.models import DeviceToken, Notification
-    from config.firebase import send_push_notification
-    from django.core.mail import send_mail
-    from django.conf import settings
-    from django.template.loader import render_to_string
-    
-    for member in members:
-        # Create in-app notification
-        Notification.objects.create(
-            user=member,
-            title=subject,
-            message=body,
-            data={
-                "action": "open_split_group",
-                "group_id": str(group.id),
-                "expense_id": str(expense.id)
-            }
-        )
-
-        # Push
-        tokens = DeviceToken.objects.filter(user=member)
-        for dt in tokens:
-            send_push_notification(
-                token=dt.token,
-                title=subject,
-                body=body,
-                data={
-                    "action": "open_split_group",
-                    "group_id": str(group.id),
-                    "expense_id": str(expense.id)
-                }
-            )
+    notify_users(
+        members, subject, body,
+        data={
+            "action": "open_split_group",
+            "group_id": str(group.id),
+            "expense_id": str(expense.id)
+        }
+    )
 
 @transaction.atomic
 def leave_group(group, user):
@@ -409,12 +429,16 @@ def leave_group(group, user):
             
     member.delete()
 
-def calculate_simplified_debts(group):
+def calculate_simplified_debts(group, members=None):
     """
     Returns a list of simplified transactions to settle all group debts.
     Format: [{'from': User, 'to': User, 'amount': Decimal}]
+
+    Pass the group's already-loaded GroupMember rows (with users) as
+    ``members`` to skip re-querying them.
     """
-    members = GroupMember.objects.filter(group=group).select_related('user')
+    if members is None:
+        members = GroupMember.objects.filter(group=group).select_related('user')
     
     debtors = []   # People who owe money (net_balance < 0)
     creditors = [] # People who are owed money (net_balance > 0)
@@ -474,17 +498,9 @@ def create_settlement(group, paid_by, paid_to, amount, local_id=None):
     )
     
     # Adjust balances
-    # The person paying is reducing their debt (they are "owed" back what they pay)
-    payer_ledger, _ = GroupMember.objects.get_or_create(group=group, user=paid_by)
-    payer_ledger.total_paid += amount
-    payer_ledger.net_balance += amount
-    payer_ledger.save(update_fields=['total_paid', 'net_balance'])
-    
-    # The person receiving is getting money (they "owe" the system what they receive)
-    receiver_ledger, _ = GroupMember.objects.get_or_create(group=group, user=paid_to)
-    receiver_ledger.total_owed += amount
-    receiver_ledger.net_balance -= amount
-    receiver_ledger.save(update_fields=['total_owed', 'net_balance'])
+    # The person paying is reducing their debt (they are "owed" back what they pay);
+    # the person receiving "owes" the system what they receive
+    apply_ledger_deltas(group, paid={paid_by.id: amount}, owed={paid_to.id: amount})
     
     return settlement
 
@@ -493,23 +509,10 @@ def delete_expense(expense):
     """
     Reverses the ledger impact of an expense and deletes it.
     """
-    group = expense.group
-    amount = expense.amount
-    
-    # 1. Reverse the payer's total_paid and net_balance
-    payer_ledger = GroupMember.objects.get(group=group, user=expense.paid_by)
-    payer_ledger.total_paid -= amount
-    payer_ledger.net_balance -= amount
-    payer_ledger.save(update_fields=['total_paid', 'net_balance'])
-    
-    # 2. Reverse each split's impact on total_owed and net_balance
-    for split in expense.splits.select_related('user'):
-        member_ledger = GroupMember.objects.get(group=group, user=split.user)
-        member_ledger.total_owed -= split.amount_owed
-        member_ledger.net_balance += split.amount_owed
-        member_ledger.save(update_fields=['total_owed', 'net_balance'])
-    
-    # 3. Delete the expense (cascades to ExpenseSplit)
+    # 1. Reverse the payer's and each split's impact on the ledger
+    _reverse_expense(expense)
+    
+    # 2. Delete the expense (cascades to ExpenseSplit)
     expense.delete()
 
 @transaction.atomic
@@ -521,18 +524,7 @@ def update_expense(expense, paid_by, amount, description, split_type, splits_dat
     group = expense.group
     
     # 1. Reverse the old expense's ledger impact
-    old_amount = expense.amount
-    
-    payer_ledger = GroupMember.objects.get(group=group, user=expense.paid_by)
-    payer_ledger.total_paid -= old_amount
-    payer_ledger.net_balance -= old_amount
-    payer_ledger.save(update_fields=['total_paid', 'net_balance'])
-    
-    for split in expense.splits.select_related('user'):
-        member_ledger = GroupMember.objects.get(group=group, user=split.user)
-        member_ledger.total_owed -= split.amount_owed
-        member_ledger.net_balance += split.amount_owed
-        member_ledger.save(update_fields=['total_owed', 'net_balance'])
+    _reverse_expense(expense)
     
     # 2. Delete the old expense
     expense.delete()
@@ -1,5 +1,6 @@
 from decimal import Decimal
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from config.firebase import LocMemBackend
 from django.contrib.auth.models import User
 from .models import Group, GroupMember, Expense, Settlement
 from .services import create_expense, calculate_simplified_debts, create_settlement
@@ -206,3 +207,107 @@ class SplitServicesTest(TestCase):
         with self.assertRaises(ValidationError):
             remove_member(self.group, self.user2)
 
+
+    def test_ledger_queries_do_not_grow_with_group_size(self):
+        """Expense create/delete cost the same ledger queries for 3 or 10 members."""
+        from unittest import mock
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from .services import delete_expense
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as ctx, \
+                    mock.patch('split_expense.services._send_expense_notification'):
+                expense = create_expense(
+                    group=self.group, paid_by=self.user1, amount=Decimal('100.00'),
+                    description='Snacks', split_type='equal'
+                )
+                delete_expense(expense)
+            return len(ctx.captured_queries)
+
+        small = count_queries()
+        for i in range(7):
+            user = User.objects.create_user(username=f'extra{i}', password='password')
+            GroupMember.objects.create(group=self.group, user=user)
+        self.assertEqual(count_queries(), small)
+        self.assertFalse(GroupMember.objects.filter(group=self.group).exclude(net_balance=0).exists())
+
+
+
+@override_settings(PUSH_OUTBOX_WORKERS=0, PUSH_BACKEND='config.firebase.LocMemBackend')
+class ExpenseNotificationOutboxTest(TestCase):
+    def setUp(self):
+        from accounts.models import DeviceToken
+        self.alice = User.objects.create_user(username='alice', password='password')
+        self.bob = User.objects.create_user(username='bob', password='password')
+        self.carol = User.objects.create_user(username='carol', password='password')
+        self.group = Group.objects.create(name='Trip', created_by=self.alice)
+        for user in (self.alice, self.bob, self.carol):
+            GroupMember.objects.create(group=self.group, user=user)
+            DeviceToken.objects.create(user=user, token=f'token-{user.username}')
+        LocMemBackend.outbox = []
+        LocMemBackend.invalid_tokens = set()
+        LocMemBackend.failing_tokens = set()
+
+    def test_pushes_are_queued_and_sent_after_the_expense(self):
+        from accounts.models import Notification, PushOutbox
+        from accounts.services import drain_push_outbox
+
+        expense = create_expense(
+            group=self.group, paid_by=self.alice, amount=Decimal('90.00'),
+            description='Fuel', split_type='equal'
+        )
+        # Nothing is sent while the expense is being written.
+        self.assertEqual(LocMemBackend.outbox, [])
+        self.assertEqual(PushOutbox.objects.filter(status='pending').count(), 2)
+        self.assertEqual(Notification.objects.count(), 2)
+
+        self.assertEqual(drain_push_outbox(), 2)
+        self.assertEqual(drain_push_outbox(), 0)
+
+        self.assertEqual(sorted(m.token for m in LocMemBackend.outbox), ['token-bob', 'token-carol'])
+        self.assertEqual(LocMemBackend.outbox[0].title, 'New Expense in Trip')
+        self.assertEqual(LocMemBackend.outbox[0].data['expense_id'], str(expense.id))
+        self.assertEqual(PushOutbox.objects.filter(status='sent').count(), 2)
+
+    @override_settings(PUSH_MAX_ATTEMPTS=2)
+    def test_failed_pushes_are_retried_then_given_up(self):
+        from accounts.models import PushOutbox
+        from accounts.services import drain_push_outbox
+
+        LocMemBackend.failing_tokens = {'token-bob'}
+        LocMemBackend.invalid_tokens = {'token-carol'}
+        create_expense(
+            group=self.group, paid_by=self.alice, amount=Decimal('90.00'),
+            description='Fuel', split_type='equal'
+        )
+
+        drain_push_outbox()
+        bob = PushOutbox.objects.get(user=self.bob)
+        carol = PushOutbox.objects.get(user=self.carol)
+        self.assertEqual((bob.status, bob.attempts), ('pending', 1))
+        # Carol's only device was unregistered and pruned; retrying can't help.
+        self.assertEqual(carol.status, 'failed')
+
+        drain_push_outbox()
+        bob.refresh_from_db()
+        self.assertEqual((bob.status, bob.attempts), ('failed', 2))
+        self.assertEqual(LocMemBackend.outbox, [])
+
+    def test_rows_stranded_by_a_dead_drainer_are_reclaimed(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from accounts.models import PushOutbox
+        from accounts.services import drain_push_outbox
+
+        create_expense(
+            group=self.group, paid_by=self.alice, amount=Decimal('90.00'),
+            description='Fuel', split_type='equal'
+        )
+        PushOutbox.objects.filter(user=self.bob).update(status='sending', claimed_at=timezone.now())
+        PushOutbox.objects.filter(user=self.carol).update(
+            status='sending', claimed_at=timezone.now() - timedelta(hours=1)
+        )
+
+        self.assertEqual(drain_push_outbox(), 1)
+        self.assertEqual([m.token for m in LocMemBackend.outbox], ['token-carol'])
@@ -2,6 +2,7 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.views import View
 from django.views.generic import ListView, CreateView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.paginator import Paginator
 from django.contrib import messages
 from django.urls import reverse
 from .models import Group, GroupMember, Expense, Settlement, Friendship, FriendRequest, ExternalFriendInvitation
@@ -182,11 +183,13 @@ class GroupDetailView(LoginRequiredMixin, DetailView):
             messages.error(self.request, "You are not a member of this group.")
             return context # Will handle redirect or error in get() later usually, but simplifying here.
             
-        context['expenses'] = group.expenses.all().order_by('-created_at')
-        context['members'] = GroupMember.objects.filter(group=group).select_related('user')
+        context['expenses'] = Paginator(
+            group.expenses.select_related('paid_by').order_by('-date', '-created_at', '-id'), 20
+        ).get_page(self.request.GET.get('page'))
+        context['members'] = list(GroupMember.objects.filter(group=group).select_related('user'))
         from .models import GroupInvitation
         context['pending_invitations'] = GroupInvitation.objects.filter(group=group)
-        context['simplified_debts'] = calculate_simplified_debts(group)
+        context['simplified_debts'] = calculate_simplified_debts(group, context['members'])
         
         try:
             context['my_ledger'] = GroupMember.objects.get(group=group, user=self.request.user)
@@ -418,9 +421,8 @@ class SendReminderView(LoginRequiredMixin, View):
         email_body_text = f"Hi {user_to_remind.username},\n\nJust a quick reminder regarding your balance in '{group.name}'.\n\nPlease settle up when you can!"
         push_body_text = f"Just a reminder regarding your balance of {amount_owed}. Please settle up!"
         
-        pushed = False
-        from accounts.models import DeviceToken, Notification
-        from config.firebase import send_push_notification
+        from accounts.models import Notification
+        from config.firebase import push_to_users
         
         # Create in-app notification
         Notification.objects.create(
@@ -434,21 +436,16 @@ class SendReminderView(LoginRequiredMixin, View):
             }
         )
 
-        tokens = DeviceToken.objects.filter(user=user_to_remind)
-        if tokens.exists():
-            for dt in tokens:
-                success = send_push_notification(
-                    token=dt.token, 
-                    title=subject, 
-                    body=push_body_text,
-                    data={
-                        "action": "open_split_group",
-                        "group_id": str(group.id),
-                        "group_name": group.name,
-                    }
-                )
-                if success:
-                    pushed = True
+        pushed = bool(push_to_users(
+            [user_to_remind.id],
+            title=subject,
+            body=push_body_text,
+            data={
+                "action": "open_split_group",
+                "group_id": str(group.id),
+                "group_name": group.name,
+            }
+        ))
 
         print(f"[DEBUG FCM WEB] Push notification successful: {pushed}")
         if not pushed:
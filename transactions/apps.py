@@ -6,3 +6,8 @@ class TransactionsConfig(AppConfig):
 
     def ready(self):
         import transactions.signals
+        from core.scheduler import scheduler
+        from .services import carry_forward_current_month
+
+        # Shortly after midnight on the 1st; always caught up if missed.
+        scheduler.register("carry_forward_budgets", "5 0 1 * *", carry_forward_current_month)
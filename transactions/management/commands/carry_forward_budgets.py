@@ -0,0 +1,31 @@
+"""Copy last month's budgets into a new month for every user ahead of time."""
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from transactions.services import carry_forward_budgets
+
+
+class Command(BaseCommand):
+    help = "Carry budgets forward into a month for users who have none yet (run at month start)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--month", help="Target month as YYYY-MM (default: the current month).",
+        )
+        parser.add_argument(
+            "--user", type=int, action="append", dest="user_ids",
+            help="Only carry forward for this user id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        month = timezone.localdate().replace(day=1)
+        if options["month"]:
+            try:
+                month = datetime.strptime(options["month"], "%Y-%m").date()
+            except ValueError:
+                raise CommandError("--month must look like YYYY-MM")
+
+        copied = carry_forward_budgets(month, options["user_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Carried {copied} budgets forward into {month:%B %Y}."))
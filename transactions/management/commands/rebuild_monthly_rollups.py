@@ -0,0 +1,18 @@
+"""Rebuild the MonthlyRollup and YearlySummary tables from Transaction rows."""
+from django.core.management.base import BaseCommand
+
+from transactions.services import rebuild_monthly_rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild per-user monthly rollups and yearly summaries from scratch"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user", type=int, action="append", dest="user_ids",
+            help="Only rebuild for this user id (can be repeated).",
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_monthly_rollups(options["user_ids"])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} monthly rollup rows."))
@@ -0,0 +1,26 @@
+# Generated by Django 6.1.2 on 2026-10-17 00:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transactions", "0013_budget_updated_at_category_updated_at_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="savingsgoal",
+            name="local_id",
+            field=models.CharField(
+                blank=True, db_index=True, max_length=100, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="local_id",
+            field=models.CharField(
+                blank=True, db_index=True, max_length=100, null=True
+            ),
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 6.1.2 on 2026-10-17 00:32
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def populate_summaries(apps, schema_editor):
+    MonthlyRollup = apps.get_model("transactions", "MonthlyRollup")
+    YearlySummary = apps.get_model("transactions", "YearlySummary")
+    rows = (
+        MonthlyRollup.objects.values("user_id", "year")
+        .annotate(
+            income=Coalesce(Sum("total", filter=Q(type="income")), Value(Decimal("0"))),
+            expense=Coalesce(
+                Sum("total", filter=Q(type="expense")), Value(Decimal("0"))
+            ),
+            count=Sum("count"),
+        )
+        .order_by()
+    )
+    YearlySummary.objects.bulk_create(
+        (YearlySummary(**row) for row in rows), batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("transactions", "0014_local_id"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="YearlySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                (
+                    "income",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                (
+                    "expense",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=14),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="yearly_summaries",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "yearly summaries",
+                "ordering": ["year"],
+                "unique_together": {("user", "year")},
+            },
+        ),
+        migrations.RunPython(populate_summaries, migrations.RunPython.noop),
+    ]
@@ -30,6 +30,7 @@ class Category(models.Model):
     is_system = models.BooleanField(default=False)
     type = models.CharField(max_length=7, choices=TYPE_CHOICES, default="expense")
     user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name_plural = "categories"
@@ -62,9 +63,16 @@ class Transaction(models.Model):
     notes = models.TextField(blank=True, default="")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    local_id = models.CharField(max_length=100, null=True, blank=True, db_index=True)
 
     class Meta:
         ordering = ["-date", "-created_at"]
+        indexes = [
+            # Serves the per-user newest-first listing and its keyset cursor.
+            models.Index(fields=["user", "-date", "-created_at", "-id"]),
+            # Serves delta sync (``updated_at >= since``).
+            models.Index(fields=["user", "updated_at"]),
+        ]
 
     def __str__(self):
         return f"{self.type}: {self.amount} — {self.category}"
@@ -76,6 +84,7 @@ class Budget(models.Model):
     amount = models.DecimalField(max_digits=12, decimal_places=2)
     month = models.DateField(help_text="The month this budget was last updated or applies to")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ["user", "category", "month"]
@@ -85,16 +94,22 @@ class Budget(models.Model):
         return f"Budget: {self.category} — {self.amount}"
 
     def get_spent(self):
-        """Get total spent in this category for the budget's specific month."""
-        from django.db.models import Sum
-        total = Transaction.objects.filter(
-            user=self.user,
-            category=self.category,
-            type="expense",
-            date__year=self.month.year,
-            date__month=self.month.month,
-        ).aggregate(total=Sum("amount"))["total"]
-        return total or 0
+        """Get total spent in this category for the budget's specific month.
+
+        The result is kept on the instance; ``services.compute_spent_for``
+        fills it for a whole list of budgets in one query.
+        """
+        if not hasattr(self, "_spent"):
+            from django.db.models import Sum
+            total = Transaction.objects.filter(
+                user_id=self.user_id,
+                category_id=self.category_id,
+                type="expense",
+                date__year=self.month.year,
+                date__month=self.month.month,
+            ).aggregate(total=Sum("amount"))["total"]
+            self._spent = total or 0
+        return self._spent
 
     def get_percentage(self):
         spent = float(self.get_spent())
@@ -124,6 +139,8 @@ class SavingsGoal(models.Model):
     deadline = models.DateField(null=True, blank=True)
     is_completed = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    local_id = models.CharField(max_length=100, null=True, blank=True, db_index=True)
 
     class Meta:
         ordering = ["is_completed", "-created_at"]
@@ -164,3 +181,47 @@ class SavingsTransaction(models.Model):
 
     def __str__(self):
         return f"{self.goal.name}: +{self.amount} on {self.date.date()}"
+
+
+class MonthlyRollup(models.Model):
+    """Materialized per-user monthly totals, one row per (year, month, type, category).
+
+    Kept current by the Transaction signals; rebuild with
+    ``manage.py rebuild_monthly_rollups``. Months are in local time, matching
+    the ``date__year`` / ``date__month`` lookups used elsewhere.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="monthly_rollups")
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    type = models.CharField(max_length=7, choices=Transaction.TYPE_CHOICES)
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, blank=True)
+    total = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ["user", "year", "month", "type", "category"]
+        indexes = [models.Index(fields=["user", "year", "month"])]
+
+    def __str__(self):
+        return f"{self.user_id} {self.year}-{self.month:02d} {self.type}: {self.total}"
+
+
+class YearlySummary(models.Model):
+    """Per-user income/expense totals for a calendar year.
+
+    Maintained alongside MonthlyRollup by ``services.apply_rollup_delta`` so
+    multi-year comparisons read one row per year.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="yearly_summaries")
+    year = models.PositiveSmallIntegerField()
+    income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    expense = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ["user", "year"]
+        ordering = ["year"]
+        verbose_name_plural = "yearly summaries"
+
+    def __str__(self):
+        return f"{self.user_id} {self.year}: +{self.income} / -{self.expense}"
@@ -0,0 +1,336 @@
+"""Transactions services — aggregation helpers shared by the web views and the API."""
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction as db_transaction
+from django.db.models import Sum, Q, F, Count, Max
+from django.db.models.functions import Coalesce, TruncDate, ExtractYear, ExtractMonth
+from django.utils import timezone
+
+from core.utils.cache import invalidate_user_cache
+from .models import Transaction, Budget, MonthlyRollup, YearlySummary
+
+
+INCOME = Q(type="income")
+EXPENSE = Q(type="expense")
+
+
+def shift_month(d, months):
+    """Return the first day of the month ``months`` away from ``d``."""
+    index = d.year * 12 + d.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def local_midnight(d):
+    """Aware datetime for the start of local day ``d``."""
+    return timezone.make_aware(datetime.combine(d, time.min))
+
+
+def as_local_date(value):
+    """Normalize a Trunc* result (date or aware datetime) to a local date."""
+    if isinstance(value, datetime):
+        if timezone.is_aware(value):
+            value = timezone.localtime(value)
+        return value.date()
+    return value
+
+
+def month_range_q(start=None, end=None):
+    """Q over MonthlyRollup (year, month) for months in [start, end)."""
+    q = Q()
+    if start is not None:
+        q &= Q(year__gt=start.year) | Q(year=start.year, month__gte=start.month)
+    if end is not None:
+        q &= Q(year__lt=end.year) | Q(year=end.year, month__lt=end.month)
+    return q
+
+
+# ---------------------------------------------------------------------------
+# Monthly rollups
+# ---------------------------------------------------------------------------
+def rollup_key(txn):
+    """The MonthlyRollup bucket a transaction falls into."""
+    local = timezone.localtime(txn.date) if timezone.is_aware(txn.date) else txn.date
+    return (txn.user_id, local.year, local.month, txn.type, txn.category_id)
+
+
+def apply_rollup_delta(key, amount, count):
+    """Add ``amount`` / ``count`` to the rollup bucket ``key``.
+
+    Empty buckets are removed; missing buckets are only created for positive
+    counts so that cascading deletes never leave negative rows behind.
+    """
+    user_id, year, month, type_, category_id = key
+    bucket = MonthlyRollup.objects.filter(
+        user_id=user_id, year=year, month=month, type=type_, category_id=category_id,
+    )
+    with db_transaction.atomic():
+        updated = bucket.update(total=F("total") + amount, count=F("count") + count)
+        if not updated and count > 0:
+            MonthlyRollup.objects.create(
+                user_id=user_id, year=year, month=month, type=type_,
+                category_id=category_id, total=amount, count=count,
+            )
+        elif count < 0:
+            bucket.filter(count__lte=0).delete()
+        apply_yearly_delta(user_id, year, type_, amount, count)
+
+
+def apply_yearly_delta(user_id, year, type_, amount, count):
+    """Fold a rollup delta into the user's YearlySummary row for ``year``."""
+    summary = YearlySummary.objects.filter(user_id=user_id, year=year)
+    updated = summary.update(**{type_: F(type_) + amount}, count=F("count") + count)
+    if not updated and count > 0:
+        YearlySummary.objects.create(user_id=user_id, year=year, count=count, **{type_: amount})
+    elif count < 0:
+        summary.filter(count__lte=0).delete()
+
+
+def bulk_create_transactions(txns, batch_size=500):
+    """``bulk_create`` for Transaction that keeps the save-signal side effects.
+
+    bulk_create sends no post_save, so rollup deltas are summed per bucket
+    and applied once each, and every affected user's cache is invalidated.
+    """
+    created = Transaction.objects.bulk_create(txns, batch_size=batch_size)
+    deltas = {}
+    for txn in created:
+        amount, count = deltas.get(rollup_key(txn), (Decimal("0"), 0))
+        deltas[rollup_key(txn)] = (amount + Decimal(str(txn.amount)), count + 1)
+    for key, (amount, count) in deltas.items():
+        apply_rollup_delta(key, amount, count)
+    for user_id in {txn.user_id for txn in created}:
+        invalidate_user_cache(user_id)
+    return created
+
+
+def rebuild_monthly_rollups(user_ids=None):
+    """Recompute MonthlyRollup from scratch, optionally only for ``user_ids``.
+
+    Returns the number of rollup rows written.
+    """
+    txns = Transaction.objects.all()
+    rollups = MonthlyRollup.objects.all()
+    if user_ids is not None:
+        txns = txns.filter(user_id__in=user_ids)
+        rollups = rollups.filter(user_id__in=user_ids)
+
+    rows = (
+        txns.annotate(year=ExtractYear("date"), month=ExtractMonth("date"))
+        .values("user_id", "year", "month", "type", "category_id")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    with db_transaction.atomic():
+        rollups.delete()
+        created = MonthlyRollup.objects.bulk_create(
+            [MonthlyRollup(**row) for row in rows], batch_size=500
+        )
+        rebuild_yearly_summaries(user_ids)
+    return len(created)
+
+
+def rebuild_yearly_summaries(user_ids=None):
+    """Recompute YearlySummary from MonthlyRollup, optionally only for ``user_ids``."""
+    rollups = MonthlyRollup.objects.all()
+    summaries = YearlySummary.objects.all()
+    if user_ids is not None:
+        rollups = rollups.filter(user_id__in=user_ids)
+        summaries = summaries.filter(user_id__in=user_ids)
+
+    rows = (
+        rollups.values("user_id", "year")
+        .annotate(
+            income=Coalesce(Sum("total", filter=INCOME), Decimal("0")),
+            expense=Coalesce(Sum("total", filter=EXPENSE), Decimal("0")),
+            count=Sum("count"),
+        )
+        .order_by()
+    )
+    with db_transaction.atomic():
+        summaries.delete()
+        YearlySummary.objects.bulk_create(
+            [YearlySummary(**row) for row in rows], batch_size=500
+        )
+
+
+def rollup_totals(user, start=None, end=None):
+    """Income and expense totals for months in [start, end) from MonthlyRollup."""
+    totals = MonthlyRollup.objects.filter(month_range_q(start, end), user=user).aggregate(
+        income=Sum("total", filter=INCOME),
+        expense=Sum("total", filter=EXPENSE),
+    )
+    return totals["income"] or Decimal("0"), totals["expense"] or Decimal("0")
+
+
+# ---------------------------------------------------------------------------
+# Budgets
+# ---------------------------------------------------------------------------
+def compute_spent_for(budgets):
+    """Fill in ``get_spent()`` for many budgets with one MonthlyRollup query.
+
+    Each budget's spend is its (user, month, category) expense bucket, so
+    the buckets for every budget are fetched together and stored on the
+    instances. Returns the budgets as a list.
+    """
+    budgets = list(budgets)
+    if not budgets:
+        return budgets
+
+    months = [b.month for b in budgets]
+    buckets = MonthlyRollup.objects.filter(
+        month_range_q(min(months).replace(day=1), shift_month(max(months), 1)),
+        user_id__in={b.user_id for b in budgets},
+        category_id__in={b.category_id for b in budgets},
+        type="expense",
+    ).values_list("user_id", "year", "month", "category_id", "total")
+    totals = {key[:4]: key[4] for key in buckets}
+
+    for b in budgets:
+        b._spent = totals.get((b.user_id, b.month.year, b.month.month, b.category_id)) or 0
+    return budgets
+
+
+def carry_forward_budgets(month, user_ids=None):
+    """Copy each user's most recent budgets into ``month`` if it has none.
+
+    One query finds, per user, the latest earlier month with budgets (users
+    who already budgeted ``month`` are skipped); the source budgets are then
+    read and inserted with ``bulk_create(ignore_conflicts=True)`` in chunks
+    of 200 users, so a concurrent carry-forward or edit just loses the race
+    on the unique (user, category, month) constraint. Returns the number of
+    rows attempted.
+    """
+    month = month.replace(day=1)
+    next_month = shift_month(month, 1)
+    budgets = Budget.objects.all()
+    if user_ids is not None:
+        budgets = budgets.filter(user_id__in=user_ids)
+
+    already = budgets.filter(month__gte=month, month__lt=next_month).values("user_id")
+    latest = dict(
+        budgets.filter(month__lt=month).exclude(user_id__in=already)
+        .values("user_id").annotate(last=Max("month")).values_list("user_id", "last")
+    )
+    if not latest:
+        return 0
+
+    pending = list(latest.items())
+    copied = 0
+    for start in range(0, len(pending), 200):
+        source = Q()
+        for user_id, last in pending[start:start + 200]:
+            source |= Q(user_id=user_id, month__year=last.year, month__month=last.month)
+        copies = [
+            Budget(user_id=user_id, category_id=category_id, amount=amount, month=month)
+            for user_id, category_id, amount in (
+                budgets.filter(source).values_list("user_id", "category_id", "amount")
+            )
+        ]
+        Budget.objects.bulk_create(copies, batch_size=500, ignore_conflicts=True)
+        copied += len(copies)
+
+    for user_id in latest:
+        invalidate_user_cache(user_id)
+    return copied
+
+
+def carry_forward_current_month():
+    """Scheduled job (see TransactionsConfig.ready): carry budgets into this month."""
+    return carry_forward_budgets(timezone.localdate().replace(day=1))
+
+
+# ---------------------------------------------------------------------------
+# Dashboard
+# ---------------------------------------------------------------------------
+def get_dashboard_summary(user, today=None, months=6, days=30):
+    """Collect every dashboard figure and chart series for ``user``.
+
+    Replaces the per-month and per-day ``aggregate`` loops with a handful of
+    grouped queries. Totals, the month series (bar chart, current and previous
+    month) and the category pie read MonthlyRollup; only the ``TruncDate``
+    spending trend scans Transaction, bounded to the last ``days`` days.
+    """
+    if today is None:
+        today = timezone.localdate()
+    month_start = today.replace(day=1)
+
+    rollups = MonthlyRollup.objects.filter(user=user)
+
+    # --- All-time totals ---
+    all_income, all_expenses = rollup_totals(user)
+
+    # --- Monthly income vs expense (bar chart + month totals) ---
+    # Always cover the previous month so insights need no extra query.
+    series_start = shift_month(month_start, -max(months - 1, 1))
+    by_month = {
+        date(row["year"], row["month"], 1): row
+        for row in (
+            rollups.filter(month_range_q(series_start))
+            .values("year", "month")
+            .annotate(
+                income=Sum("total", filter=INCOME),
+                expense=Sum("total", filter=EXPENSE),
+            )
+            .order_by()
+        )
+    }
+
+    def month_total(start, key):
+        row = by_month.get(start)
+        return (row and row[key]) or Decimal("0")
+
+    bar_labels, bar_income, bar_expense = [], [], []
+    for i in range(months - 1, -1, -1):
+        m = shift_month(month_start, -i)
+        bar_labels.append(m.strftime("%b"))
+        bar_income.append(float(month_total(m, "income")))
+        bar_expense.append(float(month_total(m, "expense")))
+
+    income = month_total(month_start, "income")
+    expenses = month_total(month_start, "expense")
+    prev_expenses = month_total(shift_month(month_start, -1), "expense")
+
+    # --- Spending trend (line chart) ---
+    trend_start = today - timedelta(days=days - 1)
+    by_day = {
+        as_local_date(row["day"]): row["total"]
+        for row in (
+            Transaction.objects.filter(
+                user=user, type="expense", date__gte=local_midnight(trend_start)
+            )
+            .annotate(day=TruncDate("date"))
+            .values("day")
+            .annotate(total=Sum("amount"))
+            .order_by()
+        )
+    }
+    line_labels, line_values = [], []
+    for i in range(days - 1, -1, -1):
+        d = today - timedelta(days=i)
+        line_labels.append(d.strftime("%d"))
+        line_values.append(float(by_day.get(d) or 0))
+
+    # --- Expenses by category (pie chart) ---
+    cat_data = (
+        rollups.filter(type="expense", year=month_start.year, month=month_start.month)
+        .values("category__name", "category__color")
+        .annotate(total=Sum("total"))
+        .order_by("-total")[:8]
+    )
+
+    return {
+        "total_balance": all_income - all_expenses,
+        "monthly_income": income,
+        "monthly_expenses": expenses,
+        "monthly_savings": income - expenses,
+        "prev_month_expenses": prev_expenses,
+        "pie_labels": [d["category__name"] or "Other" for d in cat_data],
+        "pie_values": [float(d["total"]) for d in cat_data],
+        "pie_colors": [d["category__color"] or "#6366f1" for d in cat_data],
+        "bar_labels": bar_labels,
+        "bar_income": bar_income,
+        "bar_expense": bar_expense,
+        "line_labels": line_labels,
+        "line_values": line_values,
+    }
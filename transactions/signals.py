@@ -1,9 +1,12 @@
-"""Signals for cache invalidation."""
-from django.db.models.signals import post_save, post_delete
+"""Signals for cache invalidation and monthly rollup maintenance."""
+from decimal import Decimal
+
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
 from django.dispatch import receiver
 
-from .models import Transaction, Category, Budget, SavingsGoal
-from core.utils.cache import invalidate_user_cache
+from .models import Transaction, Category, Budget, SavingsGoal, MonthlyRollup
+from .services import rollup_key, apply_rollup_delta, rebuild_monthly_rollups
+from core.utils.cache import invalidate_user_cache, SHARED_VERSION_ID
 
 
 @receiver([post_save, post_delete], sender=Transaction)
@@ -14,3 +17,55 @@ def invalidate_cache_on_change(sender, instance, **kwargs):
     """Invalidate the user's cache whenever relevant models change."""
     if hasattr(instance, 'user') and instance.user:
         invalidate_user_cache(instance.user.id)
+    elif sender is Category:
+        invalidate_user_cache(SHARED_VERSION_ID)
+
+
+@receiver(pre_save, sender=Transaction)
+def remember_rollup_bucket(sender, instance, raw=False, **kwargs):
+    """Capture the stored bucket and amount before an update overwrites them."""
+    instance._rollup_previous = None
+    if raw or instance.pk is None:
+        return
+    previous = Transaction.objects.filter(pk=instance.pk).first()
+    if previous is not None:
+        instance._rollup_previous = (rollup_key(previous), previous.amount)
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollup_on_save(sender, instance, created, raw=False, **kwargs):
+    """Move the transaction's amount into its (possibly new) rollup bucket."""
+    if raw:
+        return
+    key, amount = rollup_key(instance), Decimal(str(instance.amount))
+    previous = getattr(instance, "_rollup_previous", None)
+    if previous is None:
+        apply_rollup_delta(key, amount, 1)
+    elif previous[0] == key:
+        if amount != previous[1]:
+            apply_rollup_delta(key, amount - previous[1], 0)
+    else:
+        apply_rollup_delta(previous[0], -previous[1], -1)
+        apply_rollup_delta(key, amount, 1)
+    instance._rollup_previous = None
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollup_on_delete(sender, instance, **kwargs):
+    apply_rollup_delta(rollup_key(instance), -instance.amount, -1)
+
+
+@receiver(pre_delete, sender=Category)
+def remember_rollup_users(sender, instance, **kwargs):
+    """Transactions are detached with SET_NULL (no signals), so note who to rebuild."""
+    instance._rollup_user_ids = list(
+        MonthlyRollup.objects.filter(category=instance)
+        .values_list("user_id", flat=True).distinct()
+    )
+
+
+@receiver(post_delete, sender=Category)
+def rebuild_rollups_on_category_delete(sender, instance, **kwargs):
+    user_ids = getattr(instance, "_rollup_user_ids", None)
+    if user_ids:
+        rebuild_monthly_rollups(user_ids)
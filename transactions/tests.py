@@ -1,3 +1,165 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.utils import timezone
+
+from .models import Transaction, Category, Budget, MonthlyRollup
+from .services import (
+    carry_forward_budgets, compute_spent_for, get_dashboard_summary, rebuild_monthly_rollups, shift_month,
+)
+
+
+def _at(d, hour=12):
+    return timezone.make_aware(datetime.combine(d, time(hour)))
+
+
+class DashboardSummaryTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alice', password='password')
+        self.food = Category.objects.create(name='Food', color='#FF0000', user=self.user)
+        self.today = date(2026, 3, 15)
+
+    def _txn(self, amount, type, d, category=None):
+        return Transaction.objects.create(
+            user=self.user, amount=Decimal(amount), type=type,
+            category=category, date=_at(d),
+        )
+
+    def test_shift_month(self):
+        self.assertEqual(shift_month(date(2026, 1, 20), -1), date(2025, 12, 1))
+        self.assertEqual(shift_month(date(2026, 11, 1), 2), date(2027, 1, 1))
+        self.assertEqual(shift_month(date(2026, 3, 31), -14), date(2025, 1, 1))
+
+    def test_summary_totals_and_series(self):
+        self._txn('1000.00', 'income', date(2026, 3, 1))
+        self._txn('200.00', 'expense', date(2026, 3, 15), self.food)
+        self._txn('50.00', 'expense', date(2026, 3, 14))
+        self._txn('300.00', 'expense', date(2026, 2, 10), self.food)
+        self._txn('500.00', 'income', date(2025, 6, 1))  # outside the 6-month window
+
+        with self.assertNumQueries(4):
+            summary = get_dashboard_summary(self.user, self.today)
+
+        self.assertEqual(summary['total_balance'], Decimal('950.00'))
+        self.assertEqual(summary['monthly_income'], Decimal('1000.00'))
+        self.assertEqual(summary['monthly_expenses'], Decimal('250.00'))
+        self.assertEqual(summary['prev_month_expenses'], Decimal('300.00'))
+
+        self.assertEqual(summary['bar_labels'], ['Oct', 'Nov', 'Dec', 'Jan', 'Feb', 'Mar'])
+        self.assertEqual(summary['bar_income'], [0, 0, 0, 0, 0, 1000.0])
+        self.assertEqual(summary['bar_expense'], [0, 0, 0, 0, 300.0, 250.0])
+
+        self.assertEqual(len(summary['line_values']), 30)
+        self.assertEqual(summary['line_values'][-1], 200.0)
+        self.assertEqual(summary['line_values'][-2], 50.0)
+        self.assertEqual(sum(summary['line_values']), 250.0)  # Feb 10 is outside 30 days
+
+        self.assertEqual(summary['pie_labels'], ['Food', 'Other'])
+        self.assertEqual(summary['pie_values'], [200.0, 50.0])
+
+
+class MonthlyRollupTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='bob', password='password')
+        self.food = Category.objects.create(name='Food', user=self.user)
+        self.rent = Category.objects.create(name='Rent', user=self.user)
+
+    def _rollups(self):
+        return {
+            (r.year, r.month, r.type, r.category_id): (r.total, r.count)
+            for r in MonthlyRollup.objects.filter(user=self.user)
+        }
+
+    def test_incremental_create_update_delete(self):
+        txn = Transaction.objects.create(
+            user=self.user, amount=Decimal('100.00'), type='expense',
+            category=self.food, date=_at(date(2026, 1, 10)),
+        )
+        Transaction.objects.create(
+            user=self.user, amount=Decimal('40.00'), type='expense',
+            category=self.food, date=_at(date(2026, 1, 20)),
+        )
+        self.assertEqual(self._rollups(), {
+            (2026, 1, 'expense', self.food.id): (Decimal('140.00'), 2),
+        })
+
+        txn.amount = Decimal('60.00')
+        txn.save()
+        self.assertEqual(self._rollups()[(2026, 1, 'expense', self.food.id)], (Decimal('100.00'), 2))
+
+        txn.category = self.rent
+        txn.date = _at(date(2026, 2, 1))
+        txn.save()
+        self.assertEqual(self._rollups(), {
+            (2026, 1, 'expense', self.food.id): (Decimal('40.00'), 1),
+            (2026, 2, 'expense', self.rent.id): (Decimal('60.00'), 1),
+        })
+
+        txn.delete()
+        self.assertEqual(self._rollups(), {
+            (2026, 1, 'expense', self.food.id): (Decimal('40.00'), 1),
+        })
+
+    def test_category_delete_moves_totals_to_uncategorized(self):
+        Transaction.objects.create(
+            user=self.user, amount=Decimal('25.00'), type='expense',
+            category=self.food, date=_at(date(2026, 1, 10)),
+        )
+        self.food.delete()
+        self.assertEqual(self._rollups(), {(2026, 1, 'expense', None): (Decimal('25.00'), 1)})
+
+    def test_rebuild_matches_incremental(self):
+        for i, amount in enumerate(['10.00', '20.00', '30.00']):
+            Transaction.objects.create(
+                user=self.user, amount=Decimal(amount), type='income' if i else 'expense',
+                category=self.food, date=_at(date(2025, 12 - i, 5)),
+            )
+        incremental = self._rollups()
+        MonthlyRollup.objects.all().delete()
+        self.assertEqual(rebuild_monthly_rollups(), 3)
+        self.assertEqual(self._rollups(), incremental)
+
+
+class BudgetSpentTest(TestCase):
+    def test_compute_spent_for_matches_get_spent(self):
+        user = User.objects.create_user(username='alice', password='password')
+        food = Category.objects.create(name='Food', user=user)
+        rent = Category.objects.create(name='Rent', user=user)
+        when = timezone.make_aware(datetime(2026, 3, 10, 12))
+        Transaction.objects.create(user=user, amount=Decimal('30'), type='expense', category=food, date=when)
+        Transaction.objects.create(user=user, amount=Decimal('12'), type='expense', category=food, date=when)
+        Transaction.objects.create(user=user, amount=Decimal('99'), type='income', category=food, date=when)
+
+        budgets = [
+            Budget.objects.create(user=user, category=food, amount=Decimal('40'), month=date(2026, 3, 1)),
+            Budget.objects.create(user=user, category=rent, amount=Decimal('500'), month=date(2026, 3, 1)),
+            Budget.objects.create(user=user, category=food, amount=Decimal('40'), month=date(2026, 4, 1)),
+        ]
+        expected = [Budget.objects.get(pk=b.pk).get_spent() for b in budgets]
+
+        with self.assertNumQueries(2):  # budgets + one rollup query
+            budgets = compute_spent_for(Budget.objects.filter(pk__in=[b.pk for b in budgets]).order_by('pk'))
+            self.assertEqual([b.get_spent() for b in budgets], expected)
+            self.assertEqual([b.is_exceeded() for b in budgets], [True, False, False])
+        self.assertEqual(expected, [Decimal('42'), 0, 0])
+
+    def test_carry_forward_copies_latest_month_once(self):
+        alice = User.objects.create_user(username='alice', password='password')
+        bob = User.objects.create_user(username='bob', password='password')
+        food = Category.objects.create(name='Food', is_system=True)
+        rent = Category.objects.create(name='Rent', is_system=True)
+        Budget.objects.create(user=alice, category=food, amount=Decimal('10'), month=date(2026, 1, 1))
+        Budget.objects.create(user=alice, category=food, amount=Decimal('40'), month=date(2026, 2, 1))
+        Budget.objects.create(user=alice, category=rent, amount=Decimal('500'), month=date(2026, 2, 1))
+        Budget.objects.create(user=bob, category=food, amount=Decimal('20'), month=date(2026, 2, 1))
+        Budget.objects.create(user=bob, category=rent, amount=Decimal('90'), month=date(2026, 4, 1))
 
-# Create your tests here.
+        self.assertEqual(carry_forward_budgets(date(2026, 4, 1)), 2)
+        self.assertEqual(carry_forward_budgets(date(2026, 4, 1)), 0)
+        april = Budget.objects.filter(month=date(2026, 4, 1))
+        self.assertEqual(
+            sorted(april.values_list('user__username', 'category__name', 'amount')),
+            [('alice', 'Food', Decimal('40')), ('alice', 'Rent', Decimal('500')), ('bob', 'Rent', Decimal('90'))],
+        )
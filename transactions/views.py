@@ -16,6 +16,7 @@ from django.contrib import messages
 
 from .models import Transaction, Category, Budget, SavingsGoal
 from .forms import TransactionForm, CategoryForm, BudgetForm, SavingsGoalForm
+from .services import get_dashboard_summary, rollup_totals, shift_month, compute_spent_for
 
 
 # ---------------------------------------------------------------------------
@@ -30,79 +31,38 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         today = timezone.localdate()
         month_start = today.replace(day=1)
 
-        # --- Current month stats ---
-        month_txns = Transaction.objects.filter(
-            user=user, date__year=today.year, date__month=today.month
-        )
-
-        income = month_txns.filter(type="income").aggregate(t=Sum("amount"))["t"] or Decimal("0")
-        expenses = month_txns.filter(type="expense").aggregate(t=Sum("amount"))["t"] or Decimal("0")
-
-        # All-time balance
-        all_income = Transaction.objects.filter(user=user, type="income").aggregate(t=Sum("amount"))["t"] or Decimal("0")
-        all_expenses = Transaction.objects.filter(user=user, type="expense").aggregate(t=Sum("amount"))["t"] or Decimal("0")
-        total_balance = all_income - all_expenses
+        summary = get_dashboard_summary(user, today)
 
         # Recent transactions
         recent = Transaction.objects.filter(user=user)[:5]
 
-        # --- Chart data: Expenses by category (pie) ---
-        cat_data = (
-            month_txns.filter(type="expense")
-            .values("category__name", "category__color")
-            .annotate(total=Sum("amount"))
-            .order_by("-total")[:8]
-        )
-        pie_labels = [d["category__name"] or "Other" for d in cat_data]
-        pie_values = [float(d["total"]) for d in cat_data]
-        pie_colors = [d["category__color"] or "#6366f1" for d in cat_data]
-
-        # --- Chart data: Monthly income vs expense (bar — last 6 months) ---
-        bar_labels, bar_income, bar_expense = [], [], []
-        for i in range(5, -1, -1):
-            m = (today.month - i - 1) % 12 + 1
-            y = today.year - ((today.month - i - 1) < 0)
-            if today.month - i <= 0:
-                y = today.year - 1
-                m = 12 + (today.month - i)
-            month_label = date(y, m, 1).strftime("%b")
-            bar_labels.append(month_label)
-            mtxns = Transaction.objects.filter(user=user, date__year=y, date__month=m)
-            bar_income.append(float(mtxns.filter(type="income").aggregate(t=Sum("amount"))["t"] or 0))
-            bar_expense.append(float(mtxns.filter(type="expense").aggregate(t=Sum("amount"))["t"] or 0))
-
-        # --- Chart data: Spending trend (line — last 30 days) ---
-        line_labels, line_values = [], []
-        for i in range(29, -1, -1):
-            d = today - timedelta(days=i)
-            daily = Transaction.objects.filter(
-                user=user, type="expense", date__date=d
-            ).aggregate(t=Sum("amount"))["t"] or 0
-            line_labels.append(d.strftime("%d"))
-            line_values.append(float(daily))
-
         # --- Financial insights ---
-        insights = self._generate_insights(user, today, income, expenses)
+        insights = self._generate_insights(
+            user, today, summary["monthly_income"], summary["monthly_expenses"],
+            prev_expenses=summary["prev_month_expenses"],
+        )
 
         # --- Budget warnings ---
-        budgets = Budget.objects.filter(user=user, month=month_start)
+        budgets = compute_spent_for(
+            Budget.objects.filter(user=user, month=month_start).select_related("category")
+        )
         budget_warnings = [b for b in budgets if b.is_exceeded()]
 
         ctx.update({
             "greeting": self._get_greeting(),
-            "total_balance": total_balance,
-            "monthly_income": income,
-            "monthly_expenses": expenses,
-            "monthly_savings": income - expenses,
+            "total_balance": summary["total_balance"],
+            "monthly_income": summary["monthly_income"],
+            "monthly_expenses": summary["monthly_expenses"],
+            "monthly_savings": summary["monthly_savings"],
             "recent_transactions": recent,
-            "pie_labels": json.dumps(pie_labels),
-            "pie_values": json.dumps(pie_values),
-            "pie_colors": json.dumps(pie_colors),
-            "bar_labels": json.dumps(bar_labels),
-            "bar_income": json.dumps(bar_income),
-            "bar_expense": json.dumps(bar_expense),
-            "line_labels": json.dumps(line_labels),
-            "line_values": json.dumps(line_values),
+            "pie_labels": json.dumps(summary["pie_labels"]),
+            "pie_values": json.dumps(summary["pie_values"]),
+            "pie_colors": json.dumps(summary["pie_colors"]),
+            "bar_labels": json.dumps(summary["bar_labels"]),
+            "bar_income": json.dumps(summary["bar_income"]),
+            "bar_expense": json.dumps(summary["bar_expense"]),
+            "line_labels": json.dumps(summary["line_labels"]),
+            "line_values": json.dumps(summary["line_values"]),
             "budget_warnings": budget_warnings,
             "insights": insights,
         })
@@ -120,15 +80,13 @@ class DashboardView(LoginRequiredMixin, TemplateView):
             return "Evening"
         return "Night"
 
-    def _generate_insights(self, user, today, current_income, current_expenses):
+    def _generate_insights(self, user, today, current_income, current_expenses, prev_expenses=None):
         """Generate smart financial insight messages."""
         insights = []
         # Compare with last month
-        prev_start = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
-        prev_end = today.replace(day=1) - timedelta(days=1)
-        prev_expenses = Transaction.objects.filter(
-            user=user, type="expense", date__date__gte=prev_start, date__date__lte=prev_end
-        ).aggregate(t=Sum("amount"))["t"] or Decimal("0")
+        if prev_expenses is None:
+            month_start = today.replace(day=1)
+            _, prev_expenses = rollup_totals(user, shift_month(month_start, -1), month_start)
 
         if prev_expenses > 0 and current_expenses > 0:
             change = ((current_expenses - prev_expenses) / prev_expenses) * 100
@@ -360,7 +318,12 @@ class BudgetListView(LoginRequiredMixin, ListView):
     context_object_name = "budgets"
 
     def get_queryset(self):
-        return Budget.objects.filter(user=self.request.user)
+        return Budget.objects.filter(user=self.request.user).select_related("category")
+
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        ctx["budgets"] = compute_spent_for(ctx["budgets"])
+        return ctx
 
 
 class BudgetCreateView(LoginRequiredMixin, CreateView):